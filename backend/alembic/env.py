@@ -15,6 +15,7 @@ from app.models.user import User
 from app.models.post import Post
 from app.models.comment import Comment
 from app.models.vote import Vote
+from app.models.outbox import OutboxEvent
 
 config = context.config
 
@@ -26,6 +27,13 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# Created by raw SQL in migrations and deliberately not mapped on the models.
+UNMAPPED_OBJECTS = {"search_vector", "idx_posts_search_vector"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (reflected and name in UNMAPPED_OBJECTS)
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
@@ -35,6 +43,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -46,6 +55,7 @@ def do_run_migrations(connection: Connection) -> None:
         connection=connection,
         target_metadata=target_metadata,
         compare_type=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
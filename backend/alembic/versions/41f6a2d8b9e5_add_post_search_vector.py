@@ -0,0 +1,41 @@
+"""add full text search vector on posts
+
+Revision ID: 41f6a2d8b9e5
+Revises: e27b9f4c8d13
+Create Date: 2026-10-18 12:33:50.602817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '41f6a2d8b9e5'
+down_revision: Union[str, Sequence[str], None] = 'e27b9f4c8d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Title ranks above text (weights A and B); kept current by Postgres.
+    op.execute(
+        "ALTER TABLE posts ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(text, '')), 'B')"
+        ") STORED"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_posts_search_vector "
+        "ON posts USING GIN (search_vector)"
+    )
+
+def downgrade() -> None:
+    op.execute(
+        "DROP INDEX IF EXISTS idx_posts_search_vector"
+    )
+    op.execute(
+        "ALTER TABLE posts DROP COLUMN IF EXISTS search_vector"
+    )
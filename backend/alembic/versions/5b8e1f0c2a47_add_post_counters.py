@@ -0,0 +1,40 @@
+"""add denormalized post counters
+
+Revision ID: 5b8e1f0c2a47
+Revises: cd0374f8720d
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e1f0c2a47'
+down_revision: Union[str, Sequence[str], None] = 'cd0374f8720d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('upvotes', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('downvotes', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('posts', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the existing votes/comments rows.
+    op.execute(
+        "UPDATE posts SET "
+        "upvotes = (SELECT COUNT(*) FROM votes WHERE votes.post_id = posts.id AND votes.value = 1), "
+        "downvotes = (SELECT COUNT(*) FROM votes WHERE votes.post_id = posts.id AND votes.value = -1), "
+        "comment_count = (SELECT COUNT(*) FROM comments WHERE comments.post_id = posts.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('posts', 'comment_count')
+    op.drop_column('posts', 'downvotes')
+    op.drop_column('posts', 'upvotes')
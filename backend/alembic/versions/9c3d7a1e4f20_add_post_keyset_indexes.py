@@ -0,0 +1,38 @@
+"""add keyset pagination indexes on posts
+
+Revision ID: 9c3d7a1e4f20
+Revises: 5b8e1f0c2a47
+Create Date: 2026-10-18 11:02:19.774051
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3d7a1e4f20'
+down_revision: Union[str, Sequence[str], None] = '5b8e1f0c2a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Match the (sort key DESC, id DESC) order used by cursor pagination.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_posts_created_at_id "
+        "ON posts (created_at DESC, id DESC)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_posts_points_id "
+        "ON posts (points DESC, id DESC)"
+    )
+
+def downgrade() -> None:
+    op.execute(
+        "DROP INDEX IF EXISTS idx_posts_points_id"
+    )
+    op.execute(
+        "DROP INDEX IF EXISTS idx_posts_created_at_id"
+    )
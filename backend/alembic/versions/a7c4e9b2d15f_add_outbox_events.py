@@ -0,0 +1,48 @@
+"""add outbox events
+
+Revision ID: a7c4e9b2d15f
+Revises: f3a6d2c8e1b4
+Create Date: 2026-10-18 19:42:07.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c4e9b2d15f'
+down_revision: Union[str, Sequence[str], None] = 'f3a6d2c8e1b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS outbox_events ("
+        "id BIGSERIAL PRIMARY KEY, "
+        "topic VARCHAR(50) NOT NULL, "
+        "key VARCHAR(100), "
+        "payload JSON NOT NULL, "
+        "attempts INTEGER NOT NULL DEFAULT 0, "
+        "last_error TEXT, "
+        "created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), "
+        "available_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), "
+        "failed_at TIMESTAMP WITH TIME ZONE)"
+    )
+    # The worker's claim query: pending events in id order, and "is there
+    # an earlier pending event with this key" for per-key ordering.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_outbox_events_pending "
+        "ON outbox_events (id) WHERE failed_at IS NULL"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_outbox_events_pending_key "
+        "ON outbox_events (key, id) WHERE failed_at IS NULL"
+    )
+
+def downgrade() -> None:
+    op.execute(
+        "DROP TABLE IF EXISTS outbox_events"
+    )
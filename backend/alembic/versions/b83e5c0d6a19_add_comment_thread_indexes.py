@@ -0,0 +1,39 @@
+"""add comment thread indexes
+
+Revision ID: b83e5c0d6a19
+Revises: 41f6a2d8b9e5
+Create Date: 2026-10-18 13:20:44.905163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83e5c0d6a19'
+down_revision: Union[str, Sequence[str], None] = '41f6a2d8b9e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Top-level page of a post, and the replies of one comment, both in
+    # (created_at, id) order.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_comments_post_parent_created "
+        "ON comments (post_id, parent_id, created_at, id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_comments_parent_created "
+        "ON comments (parent_id, created_at, id)"
+    )
+
+def downgrade() -> None:
+    op.execute(
+        "DROP INDEX IF EXISTS idx_comments_parent_created"
+    )
+    op.execute(
+        "DROP INDEX IF EXISTS idx_comments_post_parent_created"
+    )
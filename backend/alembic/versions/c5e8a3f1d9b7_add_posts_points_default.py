@@ -0,0 +1,30 @@
+"""add posts points server default
+
+Revision ID: c5e8a3f1d9b7
+Revises: a7c4e9b2d15f
+Create Date: 2026-10-18 21:06:53.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8a3f1d9b7'
+down_revision: Union[str, Sequence[str], None] = 'a7c4e9b2d15f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Like the other counters, so inserts that don't name it (bulk_import's
+    # COPY) start at 0 instead of violating NOT NULL.
+    op.alter_column('posts', 'points', server_default='0')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('posts', 'points', server_default=None)
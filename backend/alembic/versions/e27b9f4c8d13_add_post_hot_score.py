@@ -0,0 +1,42 @@
+"""add hot_score to posts
+
+Revision ID: e27b9f4c8d13
+Revises: 9c3d7a1e4f20
+Create Date: 2026-10-18 11:47:05.126390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e27b9f4c8d13'
+down_revision: Union[str, Sequence[str], None] = '9c3d7a1e4f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('posts', sa.Column('hot_score', sa.Float(), server_default='0', nullable=False))
+
+    # Same formula as app.services.ranking.hot_score with the default
+    # HOT_GRAVITY / HOT_AGE_OFFSET_HOURS; the refresher takes over from here.
+    op.execute(
+        "UPDATE posts SET hot_score = points / "
+        "power(extract(epoch FROM now() - created_at) / 3600 + 2, 1.8)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_posts_hot_score_id "
+        "ON posts (hot_score DESC, id DESC)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "DROP INDEX IF EXISTS idx_posts_hot_score_id"
+    )
+    op.drop_column('posts', 'hot_score')
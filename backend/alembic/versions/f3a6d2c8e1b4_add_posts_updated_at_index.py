@@ -0,0 +1,31 @@
+"""add posts updated_at index
+
+Revision ID: f3a6d2c8e1b4
+Revises: b83e5c0d6a19
+Create Date: 2026-10-18 16:05:12.331807
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a6d2c8e1b4'
+down_revision: Union[str, Sequence[str], None] = 'b83e5c0d6a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # max(updated_at) is the listings' ETag version stamp.
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_posts_updated_at "
+        "ON posts (updated_at)"
+    )
+
+def downgrade() -> None:
+    op.execute(
+        "DROP INDEX IF EXISTS idx_posts_updated_at"
+    )
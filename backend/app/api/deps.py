@@ -1,18 +1,19 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, read_session
+from app.core.last_write import LAST_WRITE_HEADER, create_last_write_marker, wrote_recently
 from app.core.security import decode_access_token
 from app.models.user import User
+from app.services.user import UserPrincipal, get_user_principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-):
+def get_token_user_id(token: str = Depends(oauth2_scheme)) -> int:
     try:
         user_id = decode_access_token(token)
     except ValueError:
@@ -20,9 +21,15 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
         )
+    return int(user_id)
 
+
+async def get_current_user(
+    user_id: int = Depends(get_token_user_id),
+    db: AsyncSession = Depends(get_db),
+):
     result = await db.execute(
-        select(User).where(User.id == int(user_id))
+        select(User).where(User.id == user_id)
     )
     user = result.scalar_one_or_none()
 
@@ -30,3 +37,66 @@ async def get_current_user(
         raise HTTPException(status_code=401, detail="User not found")
 
     return user
+
+
+async def get_current_principal(
+    request: Request,
+    user_id: int = Depends(get_token_user_id),
+    db: AsyncSession = Depends(get_db),
+) -> UserPrincipal:
+    """
+    Like get_current_user, but served from the principal cache, so handlers
+    that only need id/username usually skip the database.
+    """
+    principal = await get_user_principal(db, user_id)
+    # Hand back the connection a cache miss checked out; the handler's own
+    # queries take one again only if they need it.
+    await db.commit()
+
+    if not principal:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    if not principal.is_active:
+        raise HTTPException(status_code=403, detail="Inactive user")
+
+    if request.method not in ("GET", "HEAD"):
+        # LastWriteMiddleware hands this to the client, whose reads then
+        # see its own post/vote/comment even when the replicas lag.
+        request.state.last_write = create_last_write_marker(principal.id)
+    return principal
+
+
+async def get_admin_principal(
+    user: UserPrincipal = Depends(get_current_principal),
+) -> UserPrincipal:
+    admins = {name.strip() for name in settings.ADMIN_USERNAMES.split(",") if name.strip()}
+    if user.username not in admins:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return user
+
+
+def reads_own_writes(
+    request: Request,
+    token: str | None = Depends(optional_oauth2_scheme),
+) -> bool:
+    """
+    Whether the caller sent the X-Last-Write marker of a recent write of
+    theirs and so must read from the primary. Anonymous callers and bad
+    tokens never do.
+    """
+    marker = request.headers.get(LAST_WRITE_HEADER)
+    if not token or not marker:
+        return False
+    try:
+        user_id = int(decode_access_token(token))
+    except (ValueError, TypeError):
+        return False
+    return wrote_recently(marker, user_id)
+
+
+async def get_read_db(primary: bool = Depends(reads_own_writes)):
+    """
+    Session for read-only endpoints, on a read replica when configured.
+    """
+    async with read_session(primary=primary) as session:
+        yield session
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_admin_principal
+from app.services.export import export_posts, export_comments
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(get_admin_principal)],
+)
+
+NDJSON = "application/x-ndjson"
+
+
+@router.get("/export/posts")
+async def export_all_posts(
+    after_id: int = Query(0, ge=0, description="Resume after this post id"),
+):
+    return StreamingResponse(export_posts(after_id=after_id), media_type=NDJSON)
+
+
+@router.get("/export/comments")
+async def export_all_comments(
+    since: datetime | None = Query(None, description="created_at >= since"),
+    until: datetime | None = Query(None, description="created_at < until"),
+    after_id: int = Query(0, ge=0, description="Resume after this comment id"),
+):
+    return StreamingResponse(
+        export_comments(since=since, until=until, after_id=after_id),
+        media_type=NDJSON,
+    )
@@ -4,16 +4,28 @@ from sqlalchemy import select
 
 from app.core.database import get_db
 from app.core.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
     create_access_token,
 )
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, Token
+from app.utils.worker_pool import PoolSaturated
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+
+def _server_busy() -> HTTPException:
+    # The password pool is shedding load; the client should back off briefly.
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, try again",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/signup", response_model=Token)
 async def signup(
     payload: UserCreate,
@@ -25,10 +37,18 @@ async def signup(
     if result.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Username already exists")
 
+    # Hand the connection back to the pool while bcrypt runs.
+    await db.commit()
+
+    try:
+        password_hash = await hash_password_async(payload.password)
+    except PoolSaturated:
+        raise _server_busy()
+
     user = User(
         username=payload.username,
         email=payload.email,
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
     )
 
     db.add(user)
@@ -49,12 +69,27 @@ async def login(
     )
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(payload.password, user.password_hash):
+    # Hand the connection back to the pool while bcrypt runs.
+    await db.commit()
+
+    try:
+        verified = user is not None and await verify_password_async(payload.password, user.password_hash)
+    except PoolSaturated:
+        raise _server_busy()
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
         )
 
+    if password_needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await hash_password_async(payload.password)
+            await db.commit()
+        except PoolSaturated:
+            # The login itself succeeded; the rehash can wait for the next one.
+            pass
+
     token = create_access_token(str(user.id))
     return {"access_token": token}
 
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, delete, update, func
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.limiter import rate_limit
-from app.api.deps import get_current_user
+from app.api.deps import get_current_principal, get_read_db
+from app.services.user import UserPrincipal
+from app.services import front_page, live
+from app.services.comment import get_comment_tree
+from app.services.post import get_post_stamp
+from app.utils.fast_json import json_response
+from app.utils.http_cache import make_etag, if_none_match, not_modified, set_cache_headers
 from app.models.comment import Comment
 from app.models.post import Post
 from app.models.user import User
@@ -22,12 +29,8 @@ async def add_comment(
     post_id: int,
     payload: CommentCreate,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: UserPrincipal = Depends(get_current_principal),
 ):
-    post = await db.get(Post, post_id)
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-
     if payload.parent_id:
         parent = await db.get(Comment, payload.parent_id)
         if not parent or parent.post_id != post_id:
@@ -40,11 +43,21 @@ async def add_comment(
         parent_id=payload.parent_id,
     )
 
+    # Incremented in SQL, not read-modify-write, so concurrent comments
+    # can't overwrite each other's count. No row means no post.
+    comment_count = await _move_comment_count(db, post_id, 1)
+    if comment_count is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
     db.add(comment)
+    if settings.OUTBOX_ENABLED:
+        await db.flush()
+        live.queue_comment_changed(db, comment.id, post_id, comment_count=comment_count)
     await db.commit()
     await db.refresh(comment)
+    front_page.post_changed(post_id)
 
-    return CommentOut(
+    comment_out = CommentOut(
         id=comment.id,
         content=comment.content,        
         author_id=comment.author_id,
@@ -54,54 +67,97 @@ async def add_comment(
         created_at=comment.created_at,
         children=[],
     )
+    if not settings.OUTBOX_ENABLED:
+        live.comment_changed(comment_out)
+        live.post_changed(post_id, comment_count=comment_count)
+    return comment_out
 
 
-def build_comment_tree(
-    comments: list[tuple[Comment, str]]
-) -> list[CommentOut]:
-    comment_map: dict[int, CommentOut] = {}
-    roots: list[CommentOut] = []
-
-    for comment, username in comments:
-        comment_map[comment.id] = CommentOut(
-            id=comment.id,
-            content=comment.content,
-            author_id=comment.author_id,
-            author_name=username,
-            post_id=comment.post_id,
-            parent_id=comment.parent_id,
-            created_at=comment.created_at,
-            children=[],
-        )
-        
-    for comment, _ in comments:
-        node = comment_map[comment.id]
-        if comment.parent_id:
-            parent = comment_map.get(comment.parent_id)
-            if parent:
-                parent.children.append(node)
-        else:
-            roots.append(node)
+async def _move_comment_count(db: AsyncSession, post_id: int, delta: int) -> int | None:
+    """
+    Returns the post's new comment_count, or None if there is no such post.
+    """
+    result = await db.execute(
+        update(Post)
+        .where(Post.id == post_id)
+        .values(comment_count=Post.comment_count + delta)
+        .returning(Post.comment_count)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none()
 
-    return roots
+
+async def _comment_page(response: Response, parent=None, etag: str | None = None, **kwargs) -> list[CommentOut]:
+    try:
+        comments, next_cursor = await get_comment_tree(**kwargs, fast=settings.FAST_JSON_ENABLED)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # An empty page of replies can mean the parent doesn't exist; only then
+    # is it worth the extra lookup.
+    if not comments and parent is not None and not await parent():
+        raise HTTPException(status_code=404, detail="Comment not found")
+    if settings.FAST_JSON_ENABLED:
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        response = json_response(comments, headers)
+        return set_cache_headers(response, etag) if etag else response
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if etag:
+        set_cache_headers(response, etag)
+    return comments
 
 
 @router.get("/posts/{post_id}", response_model=list[CommentOut])
 async def get_comments(
     post_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    max_depth: int = Query(10, ge=1, le=50),
+    top_level_limit: int = Query(50, ge=1, le=200),
+    replies_limit: int = Query(20, ge=1, le=200, description="Replies loaded per comment below the top level"),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the previous page"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(
-        select(
-            Comment,
-            User.username.label("username"),
-        )
-        .where(Comment.post_id == post_id)
-        .join(User, User.id == Comment.author_id)
-        .order_by(Comment.created_at.asc())
+    # The thread's version is the post's: every comment change touches it.
+    etag = None
+    stamp = await get_post_stamp(db, post_id)
+    if stamp is not None:
+        etag = make_etag("comments", post_id, max_depth, top_level_limit, replies_limit, cursor, stamp)
+        if if_none_match(request, etag):
+            return not_modified(etag)
+
+    return await _comment_page(
+        response,
+        etag=etag,
+        db=db,
+        post_id=post_id,
+        max_depth=max_depth,
+        limit=top_level_limit,
+        replies_limit=replies_limit,
+        cursor=cursor,
+    )
+
+
+@router.get("/{comment_id}/replies", response_model=list[CommentOut])
+async def get_replies(
+    comment_id: int,
+    response: Response,
+    max_depth: int = Query(10, ge=1, le=50),
+    limit: int = Query(50, ge=1, le=200),
+    replies_limit: int = Query(20, ge=1, le=200, description="Replies loaded per comment below the top level"),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the previous page"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await _comment_page(
+        response,
+        parent=lambda: db.get(Comment, comment_id),
+        db=db,
+        parent_id=comment_id,
+        max_depth=max_depth,
+        limit=limit,
+        replies_limit=replies_limit,
+        cursor=cursor,
     )
-    comments = result.all()
-    return build_comment_tree(comments)
 
 
 @router.put("/{comment_id}", response_model=CommentOut)
@@ -110,7 +166,7 @@ async def update_comment(
     comment_id: int,
     payload: CommentUpdate,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: UserPrincipal = Depends(get_current_principal),
 ):
     result = await db.execute(
         select(
@@ -128,9 +184,17 @@ async def update_comment(
         raise HTTPException(status_code=403, detail="Forbidden")
 
     comment.content = payload.content
+    # Moves the post's updated_at, which versions its comment thread.
+    await db.execute(
+        update(Post)
+        .where(Post.id == comment.post_id)
+        .values(updated_at=func.now())
+    )
+    if settings.OUTBOX_ENABLED:
+        live.queue_comment_changed(db, comment.id, comment.post_id)
     await db.commit()
     await db.refresh(comment)
-    return CommentOut(    
+    comment_out = CommentOut(    
         id=comment.id,
         author_id=comment.author_id,
         author_name=user.username,
@@ -140,3 +204,48 @@ async def update_comment(
         children=[],
         created_at=comment.created_at
     )
+    if not settings.OUTBOX_ENABLED:
+        live.comment_changed(comment_out)
+    return comment_out
+
+
+@router.delete("/{comment_id}", status_code=204)
+@rate_limit(action="delete_comment", limit=4, window_seconds=1 * 60)
+async def delete_comment(
+    comment_id: int,
+    db: AsyncSession = Depends(get_db),
+    user: UserPrincipal = Depends(get_current_principal),
+):
+    comment = await db.get(Comment, comment_id)
+    if not comment:
+        raise HTTPException(status_code=404, detail="Comment not found")
+
+    if comment.author_id != user.id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    # Replies go with their parent; collect the whole subtree so the
+    # post's comment_count drops by the right amount.
+    subtree = (
+        select(Comment.id)
+        .where(Comment.id == comment_id)
+        .cte("subtree", recursive=True)
+    )
+    subtree = subtree.union_all(
+        select(Comment.id).where(Comment.parent_id == subtree.c.id)
+    )
+    result = await db.execute(select(subtree.c.id))
+    ids = result.scalars().all()
+
+    post_id = comment.post_id
+    await db.execute(
+        delete(Comment)
+        .where(Comment.id.in_(ids))
+        .execution_options(synchronize_session=False)
+    )
+    comment_count = await _move_comment_count(db, post_id, -len(ids))
+    if settings.OUTBOX_ENABLED:
+        live.queue_post_changed(db, post_id, comment_count=comment_count)
+    await db.commit()
+    front_page.post_changed(post_id)
+    if not settings.OUTBOX_ENABLED:
+        live.post_changed(post_id, comment_count=comment_count)
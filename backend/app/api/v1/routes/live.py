@@ -0,0 +1,130 @@
+import json
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.live import get_broker
+from app.services import live
+from app.utils.live import LiveBroker, Subscriber
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+# Close code for a client dropped for falling behind ("try again later").
+LAGGING = 1013
+
+
+def _parse_topics(raw: str | list[str] | None) -> list[str]:
+    """
+    Raises ValueError for unknown topics or more than LIVE_MAX_TOPICS.
+    """
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    if not isinstance(raw, list) or not all(isinstance(topic, str) for topic in raw):
+        raise ValueError("Topics must be a list of strings")
+    topics = [topic.strip() for topic in raw if topic.strip()]
+    bad = [topic for topic in topics if not live.is_topic(topic)]
+    if bad:
+        raise ValueError(f"Unknown topics: {', '.join(bad)}")
+    if len(set(topics)) > settings.LIVE_MAX_TOPICS:
+        raise ValueError(f"At most {settings.LIVE_MAX_TOPICS} topics")
+    return topics
+
+
+@router.websocket("/ws")
+async def live_ws(websocket: WebSocket, topics: str | None = None):
+    """
+    Send {"subscribe": [...]} / {"unsubscribe": [...]} to change topics;
+    updates arrive as {"topic": ..., "events": [...]}.
+    """
+    broker = get_broker()
+    await websocket.accept()
+    if not broker.running:
+        await websocket.close(code=LAGGING, reason="Live updates are unavailable")
+        return
+
+    subscriber = broker.subscriber()
+    try:
+        for topic in _parse_topics(topics):
+            broker.subscribe(subscriber, topic)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+
+    async def send_updates():
+        while (message := await subscriber.get()) is not None:
+            await websocket.send_text(message)
+        await websocket.send_json({"type": "lagging"})
+        await websocket.close(code=LAGGING, reason="Too far behind; reload")
+
+    async def receive_commands():
+        while True:
+            text = await websocket.receive_text()
+            try:
+                command = json.loads(text)
+                if not isinstance(command, dict):
+                    raise ValueError("Expected a JSON object")
+                subscribe = _parse_topics(command.get("subscribe"))
+                unsubscribe = _parse_topics(command.get("unsubscribe"))
+                if len(subscriber.topics | set(subscribe)) > settings.LIVE_MAX_TOPICS:
+                    raise ValueError(f"At most {settings.LIVE_MAX_TOPICS} topics")
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            for topic in subscribe:
+                broker.subscribe(subscriber, topic)
+            for topic in unsubscribe:
+                broker.unsubscribe(subscriber, topic)
+
+    tasks = [asyncio.create_task(send_updates()), asyncio.create_task(receive_commands())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        broker.unsubscribe(subscriber)
+
+
+async def _event_stream(broker: LiveBroker, subscriber: Subscriber):
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber.get(), settings.LIVE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle stream.
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                yield "event: lagging\ndata: {}\n\n"
+                return
+            yield f"data: {message}\n\n"
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+@router.get("/sse")
+async def live_sse(topics: str = Query(..., description="Comma-separated, e.g. front_page,post:12")):
+    broker = get_broker()
+    if not broker.running:
+        raise HTTPException(status_code=503, detail="Live updates are unavailable")
+    try:
+        names = _parse_topics(topics)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    subscriber = broker.subscriber()
+    for topic in names:
+        broker.subscribe(subscriber, topic)
+    return StreamingResponse(
+        _event_stream(broker, subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
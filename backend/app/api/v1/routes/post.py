@@ -1,14 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, case
 from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.limiter import rate_limit
-from app.api.deps import get_current_user
+from app.api.deps import get_current_principal, get_read_db, reads_own_writes
+from app.services.user import UserPrincipal
 from app.models import User, Post, Vote, Comment
-from app.schemas.post import PostCreate, PostOut
-from app.services.post import get_posts_data
+from app.schemas.post import PostCreate, PostOut, PostDetailOut
+from app.services.post import (
+    get_posts_data,
+    get_posts_page,
+    get_posts_by_ids,
+    get_post_detail,
+    get_listing_stamp,
+    get_post_stamp,
+    parse_fields,
+    parse_ids,
+    shape_posts,
+)
+from app.services.vote import cast_vote, PostNotFound
+from app.services import front_page, live, search
+from app.utils.fast_json import json_response
+from app.utils.http_cache import make_etag, if_none_match, not_modified, set_cache_headers
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
@@ -17,7 +33,7 @@ router = APIRouter(prefix="/posts", tags=["posts"])
 async def create_post(
     payload: PostCreate,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: UserPrincipal = Depends(get_current_principal),
 ):
     if not payload.url and not payload.text:
         raise HTTPException(status_code=400, detail="url or text required")
@@ -30,8 +46,16 @@ async def create_post(
     )
 
     db.add(post)
+    if settings.OUTBOX_ENABLED:
+        await db.flush()
+        live.queue_post_created(db, post.id)
     await db.commit()
     await db.refresh(post)
+    # This process's own memory, so it can't wait for a worker that may
+    # run elsewhere; it costs no I/O.
+    front_page.post_created()
+    if not settings.OUTBOX_ENABLED:
+        live.post_created(post.id)
     return PostOut(
         id=post.id,
         author_id=post.author_id,
@@ -40,21 +64,97 @@ async def create_post(
         points=post.points,
         text=post.text,
         url=post.url,
-        upvotes=0,
-        downvotes=0,
-        comment_count=0,
+        upvotes=post.upvotes,
+        downvotes=post.downvotes,
+        comment_count=post.comment_count,
         created_at=post.created_at
     )
 
 
+def _cursor_headers(next_cursor: str | None) -> dict | None:
+    return {"X-Next-Cursor": next_cursor} if next_cursor else None
+
+
+Shape = tuple[tuple[str, ...] | None, int | None]
+NO_SHAPE: Shape = (None, None)
+
+
+def post_shape(
+    fields: str | None = Query(None, description="Comma-separated PostOut fields to return"),
+    truncate_text: int | None = Query(None, ge=1, description="Cut `text` to this many characters"),
+) -> Shape:
+    # Shaped pages aren't PostOuts, so they always go out through the
+    # fast JSON path, bypassing the response_model.
+    try:
+        return parse_fields(fields), truncate_text
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _posts_page(
+    response: Response,
+    etag: str | None = None,
+    shape: Shape = NO_SHAPE,
+    **kwargs,
+) -> list[PostOut]:
+    fast = settings.FAST_JSON_ENABLED or shape != NO_SHAPE
+    try:
+        posts, next_cursor = await get_posts_page(**kwargs, fast=fast)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if fast:
+        response = json_response(shape_posts(posts, *shape), _cursor_headers(next_cursor))
+        return set_cache_headers(response, etag) if etag else response
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if etag:
+        set_cache_headers(response, etag)
+    return posts
+
+
 @router.get("/", response_model=list[PostOut])
 async def list_posts(
+    request: Request,
+    response: Response,
     sort: str = Query("new", enum=["new", "top", "best"]),
     limit: int = Query(20, le=50),
     offset: int = 0,
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the previous page"),
+    paginate: str = Query("offset", enum=["offset", "cursor"]),
+    shape: Shape = Depends(post_shape),
+    db: AsyncSession = Depends(get_read_db),
+    own_writes: bool = Depends(reads_own_writes),
 ):
+    fields, truncate_text = shape
+
+    # The shared cache may predate the caller's own write.
+    if not cursor and paginate == "offset" and front_page.is_cacheable(offset) and not own_writes:
+        body, etag = await front_page.get_front_page(
+            sort=sort, limit=limit, offset=offset, fields=fields, truncate_text=truncate_text,
+        )
+        if if_none_match(request, etag):
+            return not_modified(etag)
+        return set_cache_headers(Response(content=body, media_type="application/json"), etag)
+
+    # Cheap version check first; the page query only runs when the
+    # client's copy is out of date.
+    stamp = await get_listing_stamp(db, sort)
+    if cursor or paginate == "cursor":
+        etag = front_page.listing_etag(stamp, sort, limit, cursor=cursor, fields=fields, truncate_text=truncate_text)
+        if if_none_match(request, etag):
+            return not_modified(etag)
+        return await _posts_page(response, etag, shape, sort=sort, limit=limit, cursor=cursor, db=db)
+
+    etag = front_page.listing_etag(stamp, sort, limit, offset, fields=fields, truncate_text=truncate_text)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+
+    if settings.FAST_JSON_ENABLED or shape != NO_SHAPE:
+        posts = await get_posts_data(sort=sort, limit=limit, offset=offset, post_ids=[], db=db, fast=True)
+        return set_cache_headers(json_response(shape_posts(posts, fields, truncate_text)), etag)
+
     posts = await get_posts_data(sort=sort,limit=limit, offset=offset, post_ids=[], db=db)
+    set_cache_headers(response, etag)
     return posts
 
 
@@ -64,62 +164,105 @@ async def vote_post(
     post_id: int,
     value: int = Query(..., ge=-1, le=1),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: UserPrincipal = Depends(get_current_principal),
 ):
-    post = await db.get(Post, post_id)
-    if not post:
+    try:
+        points, changed = await cast_vote(db, user.id, post_id, value)
+    except PostNotFound:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    result = await db.execute(
-        select(Vote).where(
-            Vote.user_id == user.id,
-            Vote.post_id == post_id,
-        )
-    )
-    vote = result.scalar_one_or_none()
-
-    if value == 0:
-        if vote:
-            post.points -= vote.value
-            await db.delete(vote)
-            await db.commit()
-        return {"post_id": post_id, "points": post.points}
-
-    if vote:
-        if vote.value == value:
-            # idempotent: same vote again
-            return {"post_id": post_id, "points": post.points}
-        post.points -= vote.value
-        vote.value = value
-    else:
-        vote = Vote(user_id=user.id, post_id=post_id, value=value)
-        db.add(vote)
-
-    post.points += value
-    await db.commit()
+    if changed:
+        front_page.post_changed(post_id, reorders=True)
+        if not settings.OUTBOX_ENABLED:
+            live.post_changed(post_id, points=points)
 
-    return {"post_id": post_id, "points": post.points}
+    return {"post_id": post_id, "points": points}
 
 
 @router.get("/search", response_model=list[PostOut])
 async def search_posts(
+    response: Response,
     q: str = Query(..., min_length=1),
-    sort: str = Query("new", enum=["new", "top", "best"]),
+    sort: str = Query("new", enum=["new", "relevance", "top", "best"]),
     limit: int = Query(20, le=50),
     offset: int = 0,
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = Query(None, description="X-Next-Cursor of the previous page"),
+    paginate: str = Query("offset", enum=["offset", "cursor"]),
+    shape: Shape = Depends(post_shape),
+    db: AsyncSession = Depends(get_read_db),
+):
+    fast = settings.FAST_JSON_ENABLED or shape != NO_SHAPE
+    if cursor or paginate == "cursor":
+        try:
+            posts, next_cursor = await search.search_posts_page(
+                q=q, sort=sort, limit=limit, cursor=cursor, db=db, fast=fast,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if fast:
+            return json_response(shape_posts(posts, *shape), _cursor_headers(next_cursor))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return posts
+
+    posts = await search.search_posts(q=q, sort=sort, limit=limit, offset=offset, db=db, fast=fast)
+    return json_response(shape_posts(posts, *shape)) if fast else posts
+
+
+@router.get("/batch", response_model=list[PostOut])
+async def get_posts_batch(
+    ids: str = Query(..., description="Comma-separated post ids, at most 100"),
+    shape: Shape = Depends(post_shape),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Posts in the order of `ids`, each once; ids that don't exist are left out.
+    """
+    try:
+        post_ids = parse_ids(ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    fast = settings.FAST_JSON_ENABLED or shape != NO_SHAPE
+    posts = await get_posts_by_ids(db, post_ids, fast=fast)
+    return json_response(shape_posts(posts, *shape)) if fast else posts
+
+
+# Declared last so /{post_id} doesn't shadow the fixed paths above.
+@router.get("/{post_id}", response_model=PostDetailOut)
+async def get_post(
+    post_id: int,
+    request: Request,
+    response: Response,
+    max_depth: int = Query(10, ge=1, le=50),
+    top_level_limit: int = Query(50, ge=1, le=200),
+    replies_limit: int = Query(20, ge=1, le=200, description="Replies loaded per comment below the top level"),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    id_stmt = (
-        select(Post.id)
-        .where(Post.title.ilike(f"%{q}%"))
-        .order_by(Post.created_at.desc())
-        .limit(limit)
-        .offset(offset)
+    """
+    The post with the first page of its comments, as GET /comments/posts/{post_id}
+    returns them; X-Next-Cursor continues the comments there.
+    """
+    # Revalidating costs one cheap lookup. Otherwise the ETag comes from the
+    # post row itself, so the whole page is a single query.
+    if "if-none-match" in request.headers:
+        stamp = await get_post_stamp(db, post_id)
+        if stamp is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        etag = make_etag("post", post_id, max_depth, top_level_limit, replies_limit, stamp)
+        if if_none_match(request, etag):
+            return not_modified(etag)
+
+    fast = settings.FAST_JSON_ENABLED
+    detail = await get_post_detail(
+        db, post_id, max_depth=max_depth, limit=top_level_limit, replies_limit=replies_limit, fast=fast,
     )
-    result = await db.execute(id_stmt)
-    post_ids = result.scalars().all()
-    if len(post_ids) == 0:
-        return []
-    posts = await get_posts_data(sort=sort, limit=limit, offset=offset, post_ids=post_ids, db=db)
-    
-    return posts
+    if detail is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    post, next_cursor, stamp = detail
+    etag = make_etag("post", post_id, max_depth, top_level_limit, replies_limit, stamp)
+    if fast:
+        return set_cache_headers(json_response(post, _cursor_headers(next_cursor)), etag)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    set_cache_headers(response, etag)
+    return post
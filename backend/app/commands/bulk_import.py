@@ -0,0 +1,270 @@
+"""
+Bulk-loads users, posts, comments and votes into PostgreSQL with COPY,
+for standing up staging or benchmark databases.
+
+Usage (from backend/):
+    python -m app.commands.bulk_import \\
+        --users users.csv --posts posts.jsonl --comments comments.jsonl --votes votes.csv
+
+Files are JSONL (.jsonl/.ndjson) or CSV with a header row, one object per
+row, with the table's column names:
+
+    users     id, username, [email], [password_hash], [is_active], [created_at]
+    posts     id, title, author_id, [url], [text], [created_at]
+    comments  id, content, author_id, post_id, [parent_id], [created_at]
+    votes     user_id, post_id, value (1 or -1)
+
+Ids are kept, so an external dump (e.g. HN items mapped to these columns)
+keeps its references. created_at is ISO 8601 or Unix seconds. Imported
+users get an unusable password unless password_hash is given.
+
+Files are read and copied --batch-size rows at a time, each batch in its
+own transaction, so memory stays flat. Comments must come after their
+parents in the file when they span batches. Secondary indexes on the
+target tables are dropped first and rebuilt at the end (--keep-indexes to
+skip that). Counters, hot scores and id sequences are then recomputed.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator
+
+import asyncpg
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+from app.models import Post
+from app.services.ranking import hot_score_sql
+
+TABLES = ("users", "posts", "comments", "votes")
+
+
+def _int(value) -> int:
+    return int(value)
+
+
+def _optional_int(value) -> int | None:
+    return None if value in (None, "") else int(value)
+
+
+def _optional_str(value) -> str | None:
+    return None if value in (None, "") else str(value)
+
+
+def _bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "t", "yes", "y")
+
+
+def _timestamp(value) -> datetime:
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.replace(".", "", 1).isdigit()):
+        return datetime.fromtimestamp(float(value), tz=timezone.utc)
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+# table -> [(column, converter, default for a missing/empty value)]
+# A default of ... means the column is required.
+Column = tuple[str, Callable, object]
+COLUMNS: dict[str, list[Column]] = {
+    "users": [
+        ("id", _int, ...),
+        ("username", str, ...),
+        ("email", str, None),
+        ("password_hash", str, "!"),
+        ("is_active", _bool, True),
+        ("created_at", _timestamp, None),
+    ],
+    "posts": [
+        ("id", _int, ...),
+        ("title", str, ...),
+        ("author_id", _int, ...),
+        ("url", _optional_str, None),
+        ("text", _optional_str, None),
+        ("created_at", _timestamp, None),
+    ],
+    "comments": [
+        ("id", _int, ...),
+        ("content", str, ...),
+        ("author_id", _int, ...),
+        ("post_id", _int, ...),
+        ("parent_id", _optional_int, None),
+        ("created_at", _timestamp, None),
+    ],
+    "votes": [
+        ("user_id", _int, ...),
+        ("post_id", _int, ...),
+        ("value", _int, ...),
+    ],
+}
+
+
+def read_rows(path: Path) -> Iterator[dict]:
+    with path.open(newline="", encoding="utf-8") as f:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def to_records(table: str, rows: Iterator[dict], now: datetime) -> Iterator[tuple]:
+    columns = COLUMNS[table]
+    for line, row in enumerate(rows, start=1):
+        record = []
+        for name, convert, default in columns:
+            value = row.get(name)
+            if value is None or value == "":
+                if default is ...:
+                    raise ValueError(f"{table} row {line}: missing {name}")
+                if name == "email":
+                    value = f"{row['username']}@import.invalid"
+                elif name == "created_at":
+                    value = now
+                else:
+                    value = default
+            else:
+                value = convert(value)
+            record.append(value)
+        if table == "votes" and record[2] not in (1, -1):
+            raise ValueError(f"votes row {line}: value must be 1 or -1")
+        yield tuple(record)
+
+
+def batches(records: Iterator[tuple], size: int) -> Iterator[list[tuple]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def copy_table(conn: asyncpg.Connection, table: str, path: Path, batch_size: int) -> int:
+    columns = [name for name, _, _ in COLUMNS[table]]
+    now = datetime.now(timezone.utc)
+    copied = 0
+    started = time.perf_counter()
+    for batch in batches(to_records(table, read_rows(path), now), batch_size):
+        await conn.copy_records_to_table(table, records=batch, columns=columns)
+        copied += len(batch)
+        elapsed = time.perf_counter() - started
+        print(f"  {table}: {copied} rows, {copied / elapsed:,.0f} rows/s", end="\r", flush=True)
+    elapsed = time.perf_counter() - started
+    print(f"  {table}: {copied} rows in {elapsed:.1f}s ({copied / max(elapsed, 1e-9):,.0f} rows/s)")
+    return copied
+
+
+_SECONDARY_INDEXES = """
+SELECT i.indexname, i.indexdef
+FROM pg_indexes i
+WHERE i.schemaname = current_schema()
+  AND i.tablename = ANY($1::text[])
+  AND i.indexdef NOT LIKE 'CREATE UNIQUE %'
+  AND NOT EXISTS (
+      SELECT 1 FROM pg_constraint c
+      WHERE c.conindid = (quote_ident(i.schemaname) || '.' || quote_ident(i.indexname))::regclass
+  )
+"""
+
+_RECOUNT = [
+    # Imported rows start at the column defaults (0); only posts that have
+    # votes or comments need touching.
+    """
+    UPDATE posts p
+    SET upvotes = v.up, downvotes = v.down, points = v.up - v.down
+    FROM (
+        SELECT post_id,
+               count(*) FILTER (WHERE value = 1) AS up,
+               count(*) FILTER (WHERE value = -1) AS down
+        FROM votes GROUP BY post_id
+    ) v
+    WHERE p.id = v.post_id
+    """,
+    """
+    UPDATE posts p
+    SET comment_count = c.n
+    FROM (SELECT post_id, count(*) AS n FROM comments GROUP BY post_id) c
+    WHERE p.id = c.post_id
+    """,
+]
+
+
+def _hot_score_sql() -> str:
+    stmt = update(Post).values(
+        hot_score=hot_score_sql(Post.points),
+        updated_at=Post.updated_at,
+    )
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    for table in TABLES:
+        parser.add_argument(f"--{table}", type=Path, help=f"{table} file (.jsonl or .csv)")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="don't drop and rebuild secondary indexes")
+    args = parser.parse_args()
+
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() != "postgresql":
+        raise SystemExit("bulk_import needs PostgreSQL (COPY); DATABASE_URL is " + url.get_backend_name())
+
+    files = {table: getattr(args, table) for table in TABLES if getattr(args, table)}
+    if not files:
+        raise SystemExit("nothing to import; pass at least one of --users/--posts/--comments/--votes")
+
+    conn = await asyncpg.connect(url.set(drivername="postgresql").render_as_string(hide_password=False))
+    try:
+        started = time.perf_counter()
+        dropped = []
+        if not args.keep_indexes:
+            dropped = await conn.fetch(_SECONDARY_INDEXES, list(files))
+            for index in dropped:
+                await conn.execute(f'DROP INDEX IF EXISTS "{index["indexname"]}"')
+            print(f"dropped {len(dropped)} secondary index(es)")
+
+        total = 0
+        try:
+            for table in TABLES:
+                if table in files:
+                    total += await copy_table(conn, table, files[table], args.batch_size)
+        finally:
+            # Also after a failed batch: earlier batches are committed.
+            step = time.perf_counter()
+            for index in dropped:
+                await conn.execute(index["indexdef"])
+            if dropped:
+                print(f"rebuilt {len(dropped)} index(es) in {time.perf_counter() - step:.1f}s")
+
+        step = time.perf_counter()
+        async with conn.transaction():
+            for sql in _RECOUNT:
+                await conn.execute(sql)
+            await conn.execute(_hot_score_sql())
+            for table in ("users", "posts", "comments", "votes"):
+                await conn.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {table}), false)"
+                )
+        await conn.execute("ANALYZE users, posts, comments, votes")
+        print(f"recomputed counters and hot scores in {time.perf_counter() - step:.1f}s")
+
+        elapsed = time.perf_counter() - started
+        print(f"imported {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s overall)")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+"""
+Runs the outbox worker on its own, e.g. with OUTBOX_WORKER_IN_PROCESS=false
+on the API workers. Any number can run at once.
+
+Live notifications sent from here reach clients only with
+LIVE_TRANSPORT=redis.
+
+Usage (from backend/):
+    python -m app.commands.outbox_worker
+"""
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.live import get_broker, close_broker
+from app.services import live  # noqa: F401 (registers the live handlers)
+from app.services.outbox import run_outbox_worker
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    if settings.LIVE_ENABLED and settings.LIVE_TRANSPORT == "local":
+        logger.warning("LIVE_TRANSPORT is local: live notifications from this process reach no one")
+    tasks = [asyncio.create_task(run_outbox_worker())]
+    if settings.LIVE_ENABLED:
+        tasks.append(asyncio.create_task(get_broker().run()))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await close_broker()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,21 @@
+"""
+Repairs drifted post counters (points, upvotes, downvotes, comment_count).
+
+Usage (from backend/):
+    python -m app.commands.reconcile_counters
+"""
+import asyncio
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.post import reconcile_post_counters
+
+
+async def main() -> None:
+    async with AsyncSessionLocal() as db:
+        fixed = await reconcile_post_counters(db)
+    await engine.dispose()
+    print(f"reconciled {fixed} post(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
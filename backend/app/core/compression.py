@@ -0,0 +1,125 @@
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Already compressed, or streamed to the client as it happens (SSE would
+# sit in the compressor's buffer).
+_SKIP_TYPES = ("image/", "video/", "audio/", "text/event-stream", "application/zip", "application/gzip")
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """
+    "br" or "gzip" from an Accept-Encoding header, preferring brotli when
+    it is installed; None if the client takes neither.
+    """
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self.compress, self._finish = self._compressor.process, self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+            self.compress, self._finish = self._compressor.compress, self._compressor.flush
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self.compress(data) + self._finish()
+
+
+class CompressionMiddleware:
+    """
+    gzip/brotli for responses of at least COMPRESSION_MINIMUM_SIZE bytes
+    (streamed responses always), for clients that accept it.
+
+    A compressed response's strong ETag becomes weak, as nginx does: the
+    bytes differ from the uncompressed representation, and If-None-Match
+    compares weakly anyway.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                if (
+                    "content-encoding" in headers
+                    or headers.get("content-type", "").startswith(_SKIP_TYPES)
+                    or (not more_body and len(body) < max(settings.COMPRESSION_MINIMUM_SIZE, 1))
+                ):
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                if more_body:
+                    del headers["Content-Length"]
+                    message = {**message, "body": compressor.compress(body)}
+                else:
+                    message = {**message, "body": compressor.finish(body)}
+                    headers["Content-Length"] = str(len(message["body"]))
+                await send(start)
+                start = None
+                await send(message)
+                return
+
+            if compressor is None:
+                await send(message)
+                return
+            if message.get("more_body", False):
+                await send({**message, "body": compressor.compress(message.get("body", b""))})
+            else:
+                await send({**message, "body": compressor.finish(message.get("body", b""))})
+
+        await self.app(scope, receive, send_compressed)
@@ -5,6 +5,144 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Comma-separated usernames allowed to use the /admin endpoints.
+    ADMIN_USERNAMES: str = ""
+    # Rows fetched per round trip (and written per chunk) by the exports.
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Connection pool, per worker process: up to DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # connections. DB_STATEMENT_TIMEOUT_MS (0 = off) and the prepared
+    # statement cache only apply to postgresql+asyncpg.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+
+    # Comma-separated read replica URLs for read-only endpoints (empty = all
+    # on DATABASE_URL). A user's reads stay on the primary for
+    # READ_YOUR_WRITES_SECONDS after they write, while their client sends
+    # back the X-Last-Write header of the write's response.
+    READ_DATABASE_URLS: str = ""
+    READ_YOUR_WRITES_SECONDS: float = 5
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: float = 5
+    REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS: float = 2
+
+    # Password hashing. Changing BCRYPT_ROUNDS re-hashes each user's password
+    # on their next successful login.
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Cache of authenticated users (id, username, is_active), per process.
+    USER_CACHE_MAX_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    # Cache of verified access tokens (digest -> subject), per process. An
+    # entry lives until its token's exp, so a hit skips the JWT parse and
+    # HMAC check but never extends a token's life.
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_SIZE: int = 50_000
+
+    # "best" ranking: points / (age_hours + HOT_AGE_OFFSET_HOURS) ** HOT_GRAVITY.
+    # Scores of posts younger than HOT_REFRESH_MAX_AGE_HOURS are recomputed
+    # every HOT_REFRESH_INTERVAL_SECONDS so they decay over time; older
+    # posts drop to 0.
+    HOT_GRAVITY: float = 1.8
+    HOT_AGE_OFFSET_HOURS: float = 2.0
+    HOT_REFRESH_ENABLED: bool = True
+    HOT_REFRESH_INTERVAL_SECONDS: int = 60
+    HOT_REFRESH_MAX_AGE_HOURS: int = 72
+    HOT_REFRESH_BATCH_SIZE: int = 1000
+
+    # Cache of serialized GET /posts/ pages (offset < FRONT_PAGE_CACHE_MAX_OFFSET).
+    # Pages are fresh for TTL seconds, then served stale for STALE seconds
+    # while one request rebuilds them in the background.
+    FRONT_PAGE_CACHE_ENABLED: bool = True
+    FRONT_PAGE_CACHE_TTL_SECONDS: float = 5
+    FRONT_PAGE_CACHE_STALE_SECONDS: float = 30
+    FRONT_PAGE_CACHE_MAX_ENTRIES: int = 256
+    FRONT_PAGE_CACHE_MAX_OFFSET: int = 100
+
+    # Buffer vote counter updates in memory and write them to posts in one
+    # batch every VOTE_BUFFER_FLUSH_MS (Postgres only).
+    VOTE_BUFFER_ENABLED: bool = False
+    VOTE_BUFFER_FLUSH_MS: int = 250
+
+    # Cache-Control sent with the ETag'd responses (post listings, single
+    # posts, comment threads). max-age=0 makes clients revalidate every
+    # time, which costs a version-stamp lookup and a 304 when unchanged;
+    # s-maxage lets a CDN serve them for that long.
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 0
+    HTTP_CACHE_SHARED_MAX_AGE_SECONDS: int = 0
+    HTTP_CACHE_STALE_WHILE_REVALIDATE_SECONDS: int = 0
+
+    # gzip (or brotli, when the `brotli` package is installed) for responses
+    # of at least COMPRESSION_MINIMUM_SIZE bytes to clients that accept it.
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1000
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Live updates (/live/ws, /live/sse). Events are merged per topic and
+    # sent every LIVE_FLUSH_MS; a client more than LIVE_SUBSCRIBER_QUEUE_SIZE
+    # messages behind is disconnected and reloads over HTTP. LIVE_TRANSPORT
+    # is `local` (clients see their own worker's events) or `redis`
+    # (pub/sub on REDIS_URL, shared by all workers).
+    LIVE_ENABLED: bool = True
+    LIVE_TRANSPORT: str = "local"
+    LIVE_FLUSH_MS: int = 250
+    LIVE_SUBSCRIBER_QUEUE_SIZE: int = 64
+    LIVE_MAX_TOPICS: int = 20
+    LIVE_KEEPALIVE_SECONDS: int = 15
+
+    # Transactional outbox. Write endpoints queue their live notifications
+    # in an outbox_events row, committed with the write, and a worker sends
+    # them in batches of OUTBOX_BATCH_SIZE, polling every OUTBOX_POLL_MS.
+    # Events for one post go out in order; a failing event is retried with
+    # exponential backoff (OUTBOX_RETRY_BASE_SECONDS, doubling) and parked
+    # after OUTBOX_MAX_ATTEMPTS. With OUTBOX_WORKER_IN_PROCESS off, run
+    # `python -m app.commands.outbox_worker` instead (with
+    # LIVE_TRANSPORT=redis, so its events reach the API workers' clients).
+    OUTBOX_ENABLED: bool = False
+    OUTBOX_WORKER_IN_PROCESS: bool = True
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_MS: int = 200
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_RETRY_BASE_SECONDS: float = 1.0
+
+    # Encode post listings, search results and comment trees straight from
+    # SQL rows to JSON (with orjson when installed), skipping the per-row
+    # pydantic models. Same response bytes.
+    FAST_JSON_ENABLED: bool = False
+
+    # /posts/search engine: "postgres" (tsvector + GIN index), "memory"
+    # (in-process inverted index, for SQLite) or "auto" (by database).
+    SEARCH_BACKEND: str = "auto"
+
+    # Query audit (development/canary): log requests over either budget with
+    # their statements, for QUERY_AUDIT_SAMPLE_RATE of requests. With
+    # QUERY_AUDIT_EXPLAIN, read-only statements slower than
+    # QUERY_AUDIT_SLOW_QUERY_MS are re-run under EXPLAIN ANALYZE.
+    QUERY_AUDIT_ENABLED: bool = False
+    QUERY_AUDIT_SAMPLE_RATE: float = 1.0
+    QUERY_AUDIT_MAX_QUERIES: int = 10
+    QUERY_AUDIT_MAX_DB_MS: float = 200
+    QUERY_AUDIT_SLOW_QUERY_MS: float = 100
+    QUERY_AUDIT_EXPLAIN: bool = False
+
+    # Rate limiting: "memory" (per process), "sqlite" (shared by workers on
+    # one host) or "redis" (shared across hosts).
+    RATE_LIMIT_BACKEND: str = "memory"
+    # Algorithm for the memory backend: "sliding_log" (exact),
+    # "sliding_window" (approximate counter) or "gcra" (token bucket).
+    RATE_LIMIT_ALGORITHM: str = "sliding_log"
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    RATE_LIMIT_SQLITE_PATH: str = "/tmp/ratelimit.sqlite3"
+    REDIS_URL: str = "redis://localhost:6379/0"
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
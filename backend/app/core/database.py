@@ -1,12 +1,104 @@
+import time
+import asyncio
+import logging
+import threading
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import  DeclarativeBase
 from app.core.config import settings
+from app.core.metrics import instrument_engine, registry
+from app.core.query_audit import audit_engine
+
+logger = logging.getLogger(__name__)
+
+
+pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection, per checkout.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+class PoolMetrics:
+    """
+    How long requests wait for a pooled connection, and how many are out.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        pool_checkout_wait.observe(seconds)
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited in `pool_metrics`.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            pool_metrics.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.observe(time.perf_counter() - start)
+        return conn
+
+
+def _engine_options(url: str) -> dict:
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's default.
+        return {}
+
+    options = {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+    if url.get_driver_name() == "asyncpg":
+        connect_args = {
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+            }
+        options["connect_args"] = connect_args
+    return options
+
 
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,
+    **_engine_options(settings.DATABASE_URL),
 )
 
+instrument_engine(engine)
+audit_engine(engine)
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     expire_on_commit=False,
@@ -15,7 +107,135 @@ AsyncSessionLocal = async_sessionmaker(
 class Base(DeclarativeBase):
     pass
 
+
+class _Replica:
+    def __init__(self, url: str):
+        self.url = make_url(url)
+        self.engine = create_async_engine(url, echo=False, **_engine_options(url))
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.healthy = True
+        instrument_engine(self.engine)
+        audit_engine(self.engine)
+
+        @event.listens_for(self.engine.sync_engine, "handle_error")
+        def _on_error(context):
+            # A dropped or refused connection takes the replica out of
+            # rotation until the next health check finds it back up.
+            if context.is_disconnect or context.connection is None:
+                if self.healthy:
+                    logger.warning("read replica %s is down", self.name)
+                self.healthy = False
+
+    @property
+    def name(self) -> str:
+        return self.url.render_as_string(hide_password=True)
+
+
+class ReplicaSet:
+    """
+    Read replicas (READ_DATABASE_URLS), handed out round-robin. Replicas
+    that fail a health check or drop a connection are skipped; with none
+    left, reads go to the primary.
+    """
+
+    def __init__(self, urls: list[str]):
+        self.replicas = [_Replica(url) for url in urls]
+        self._next = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    def pick(self) -> async_sessionmaker | None:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if replica.healthy:
+                return replica.sessionmaker
+        return None
+
+    async def check(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    await asyncio.wait_for(
+                        conn.execute(text("SELECT 1")),
+                        settings.REPLICA_HEALTH_CHECK_TIMEOUT_SECONDS,
+                    )
+            except Exception:
+                if replica.healthy:
+                    logger.warning("read replica %s failed its health check", replica.name)
+                replica.healthy = False
+            else:
+                if not replica.healthy:
+                    logger.info("read replica %s is back", replica.name)
+                replica.healthy = True
+
+    def stats(self) -> list[dict]:
+        return [{"url": r.name, "healthy": r.healthy} for r in self.replicas]
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replicas = ReplicaSet([url.strip() for url in settings.READ_DATABASE_URLS.split(",") if url.strip()])
+
+
+async def run_replica_health_checker() -> None:
+    while True:
+        await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS)
+        await replicas.check()
+
+
+def read_session(primary: bool = False) -> AsyncSession:
+    """
+    A session for read-only queries: on a replica when one is up, otherwise
+    (or with `primary=True`) on the primary. Replicas can lag behind.
+    """
+    sessionmaker = None if primary else replicas.pick()
+    return (sessionmaker or AsyncSessionLocal)()
+
+
+def pool_stats() -> dict:
+    pool = engine.sync_engine.pool
+    stats = {
+        "checkouts": pool_metrics.checkouts,
+        "checkout_timeouts": pool_metrics.timeouts,
+        "checkout_wait_seconds_total": pool_metrics.wait_seconds_total,
+        "checkout_wait_seconds_max": pool_metrics.wait_seconds_max,
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        stats.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            saturation=pool.checkedout() / capacity if capacity else 0.0,
+        )
+    if replicas:
+        stats["replicas"] = replicas.stats()
+    return stats
+
+
+@registry.collector
+def _collect_pool():
+    stats = pool_stats()
+    yield "db_pool_checkouts_total", "counter", "Connections checked out of the pool.", [({}, stats["checkouts"])]
+    yield "db_pool_checkout_timeouts_total", "counter", "Checkouts that gave up waiting.", [({}, stats["checkout_timeouts"])]
+    if "checked_out" in stats:
+        yield "db_pool_checked_out", "gauge", "Connections in use.", [({}, stats["checked_out"])]
+        yield "db_pool_saturation", "gauge", "Connections in use / (pool size + max overflow).", [({}, stats["saturation"])]
+    if replicas:
+        yield (
+            "db_replica_healthy", "gauge", "1 if the read replica is in rotation.",
+            [({"replica": r["url"]}, int(r["healthy"])) for r in replicas.stats()],
+        )
+
+
 async def get_db():
+    # A session only checks out a connection on its first query and gives it
+    # back on commit/rollback/close, so requests that never query (or are
+    # served from a cache) don't take one from the pool.
     async with AsyncSessionLocal() as session:
         yield session
-
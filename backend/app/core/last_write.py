@@ -0,0 +1,65 @@
+import hashlib
+import hmac
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+# A write's response carries a signed "<user id>.<until ms>.<signature>"
+# marker; the client sends it back on its requests, and until then that
+# user's reads go to the primary. Kept by the client, so it holds whichever
+# worker serves the next request.
+LAST_WRITE_HEADER = "X-Last-Write"
+
+
+def _sign(message: str) -> str:
+    key = settings.SECRET_KEY.encode("utf-8")
+    return hmac.new(key, b"last-write:" + message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def create_last_write_marker(user_id: int) -> str:
+    until = int((time.time() + settings.READ_YOUR_WRITES_SECONDS) * 1000)
+    message = f"{user_id}.{until}"
+    return f"{message}.{_sign(message)}"
+
+
+def wrote_recently(marker: str | None, user_id: int) -> bool:
+    """
+    Whether `marker` is an unexpired marker of a write by `user_id`.
+    Forged, foreign and malformed markers are ignored.
+    """
+    if not marker:
+        return False
+    message, _, signature = marker.rpartition(".")
+    if not hmac.compare_digest(signature, _sign(message)):
+        return False
+    marker_user, _, until = message.partition(".")
+    try:
+        return int(marker_user) == user_id and int(until) > time.time() * 1000
+    except ValueError:
+        return False
+
+
+class LastWriteMiddleware:
+    """
+    Sets X-Last-Write on the response of a write that get_current_principal
+    marked in `request.state.last_write`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_marked(message):
+            if message["type"] == "http.response.start":
+                marker = scope.get("state", {}).get("last_write")
+                if marker:
+                    MutableHeaders(scope=message).append(LAST_WRITE_HEADER, marker)
+            await send(message)
+
+        await self.app(scope, receive, send_marked)
@@ -1,7 +1,70 @@
 from functools import wraps
 from typing import Callable
 
-from app.utils.rate_limiter import SlidingWindowRateLimiter
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import rate_limit_rejections
+from app.utils.rate_limiter import (
+    SlidingWindowRateLimiter,
+    RateLimiterBackend,
+    InMemoryBackend,
+    SlidingWindowCounterBackend,
+    GCRABackend,
+    SQLiteBackend,
+    RedisBackend,
+)
+
+_rate_limiter: SlidingWindowRateLimiter | None = None
+
+
+MEMORY_ALGORITHMS: dict[str, type[InMemoryBackend]] = {
+    "sliding_log": InMemoryBackend,
+    "sliding_window": SlidingWindowCounterBackend,
+    "gcra": GCRABackend,
+}
+
+
+def create_backend() -> RateLimiterBackend:
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        backend_cls = MEMORY_ALGORITHMS.get(settings.RATE_LIMIT_ALGORITHM)
+        if backend_cls is None:
+            raise RuntimeError(
+                f"Unknown RATE_LIMIT_ALGORITHM: {settings.RATE_LIMIT_ALGORITHM!r}"
+            )
+        return backend_cls(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBackend(settings.RATE_LIMIT_SQLITE_PATH)
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend(url=settings.REDIS_URL)
+    raise RuntimeError(
+        f"Unknown RATE_LIMIT_BACKEND: {settings.RATE_LIMIT_BACKEND!r}"
+    )
+
+
+def get_rate_limiter() -> SlidingWindowRateLimiter:
+    """
+    Process-wide limiter, created on first use.
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = SlidingWindowRateLimiter(create_backend())
+    return _rate_limiter
+
+
+def set_rate_limiter(rate_limiter: SlidingWindowRateLimiter | None) -> None:
+    """
+    Replaces the process-wide limiter (e.g. with a fake-backed one in tests).
+    """
+    global _rate_limiter
+    _rate_limiter = rate_limiter
+
+
+async def close_rate_limiter() -> None:
+    global _rate_limiter
+    if _rate_limiter is not None:
+        await _rate_limiter.backend.close()
+        _rate_limiter = None
 
 
 def rate_limit(
@@ -15,6 +78,8 @@ def rate_limit(
       - user OR current_user kwarg with `.id`
     """
 
+    rejections = rate_limit_rejections.labels(action)
+
     def decorator(func: Callable):
         @wraps(func)
         async def wrapper(*args, **kwargs):
@@ -26,12 +91,16 @@ def rate_limit(
                 )
 
             key = f"{action}:{current_user.id}"
-            rate_limiter = SlidingWindowRateLimiter()
-            await rate_limiter.allow(
-                key=key,
-                limit=limit,
-                window_seconds=window_seconds,
-            )
+            try:
+                await get_rate_limiter().allow(
+                    key=key,
+                    limit=limit,
+                    window_seconds=window_seconds,
+                )
+            except HTTPException as e:
+                if e.status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+                    rejections.inc()
+                raise
 
             return await func(*args, **kwargs)
 
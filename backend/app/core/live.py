@@ -0,0 +1,64 @@
+from app.core.config import settings
+from app.core.metrics import registry
+from app.utils.live import LiveBroker, LiveTransport, LocalTransport, RedisTransport
+
+_broker: LiveBroker | None = None
+
+
+def create_transport() -> LiveTransport:
+    if settings.LIVE_TRANSPORT == "local":
+        return LocalTransport()
+    if settings.LIVE_TRANSPORT == "redis":
+        return RedisTransport(url=settings.REDIS_URL)
+    raise RuntimeError(
+        f"Unknown LIVE_TRANSPORT: {settings.LIVE_TRANSPORT!r}"
+    )
+
+
+def get_broker() -> LiveBroker:
+    """
+    Process-wide broker, created on first use. It delivers nothing until
+    its `run()` task is started (see app.main).
+    """
+    global _broker
+    if _broker is None:
+        _broker = LiveBroker(
+            create_transport(),
+            interval_ms=settings.LIVE_FLUSH_MS,
+            max_queue=settings.LIVE_SUBSCRIBER_QUEUE_SIZE,
+        )
+    return _broker
+
+
+def set_broker(broker: LiveBroker | None) -> None:
+    """
+    Replaces the process-wide broker (e.g. with a fake-backed one in tests).
+    """
+    global _broker
+    _broker = broker
+
+
+async def close_broker() -> None:
+    global _broker
+    if _broker is not None:
+        await _broker.transport.close()
+        _broker = None
+
+
+@registry.collector
+def _collect_live():
+    if _broker is None:
+        return
+    stats = _broker.stats()
+    yield "live_subscribers", "gauge", "Connections subscribed to live updates.", [({}, stats["subscribers"])]
+    yield "live_events_published_total", "counter", "Live events published by this worker.", [({}, stats["published"])]
+    yield "live_messages_sent_total", "counter", "Merged live messages queued to subscribers.", [({}, stats["sent"])]
+    yield (
+        "live_subscribers_dropped_total", "counter",
+        "Subscribers disconnected for falling too far behind.", [({}, stats["dropped"])],
+    )
+    yield (
+        "live_transport_reconnects_total", "counter",
+        "Times the live transport re-established a lost subscription.",
+        [({}, getattr(_broker.transport, "reconnects", 0))],
+    )
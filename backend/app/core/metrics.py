@@ -0,0 +1,209 @@
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from app.utils.metrics import Registry
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total",
+    "Requests handled, by route template and status.",
+    ["method", "route", "status"],
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Request latency, by route template.",
+    ["method", "route"],
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress",
+    "Requests being handled right now.",
+    ["method"],
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds",
+    "Time per SQL statement.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+db_queries_per_request = registry.histogram(
+    "db_queries_per_request",
+    "SQL statements executed per request.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+db_time_per_request = registry.histogram(
+    "db_time_per_request_seconds",
+    "Time spent in SQL per request.",
+    ["method", "route"],
+)
+rate_limit_rejections = registry.counter(
+    "rate_limit_rejections_total",
+    "Requests refused with 429, by rate limited action.",
+    ["action"],
+)
+
+
+class RequestDbUsage:
+    """
+    SQL statements run on behalf of the current request.
+    """
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+current_db_usage: ContextVar[RequestDbUsage | None] = ContextVar("current_db_usage", default=None)
+
+
+def instrument_engine(engine) -> None:
+    """
+    Times every statement run on `engine` (an AsyncEngine or Engine).
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    observe = db_query_duration.observe
+
+    # The start time lives on the statement's execution context, not the
+    # connection, so a statement that raises (and never reaches
+    # after_cursor_execute) leaves nothing behind.
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_query_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_metrics_query_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        observe(elapsed)
+        usage = current_db_usage.get()
+        if usage is not None:
+            usage.queries += 1
+            usage.seconds += elapsed
+
+
+_caches: dict[str, object] = {}
+_worker_pools: dict[str, object] = {}
+
+
+def register_cache(name: str, cache) -> None:
+    """
+    Exports `cache.stats()` (hits, misses, hit_ratio, size) at scrape time.
+    """
+    _caches[name] = cache
+
+
+def register_worker_pool(name: str, pool) -> None:
+    """
+    Exports a BoundedWorkerPool's `stats()` at scrape time.
+    """
+    _worker_pools[name] = pool
+
+
+@registry.collector
+def _collect_caches():
+    stats = {name: cache.stats() for name, cache in _caches.items()}
+    yield (
+        "cache_hits_total", "counter", "Cache lookups answered from the cache.",
+        [({"cache": name}, s["hits"] + s.get("stale_hits", 0) + s.get("coalesced", 0)) for name, s in stats.items()],
+    )
+    yield (
+        "cache_misses_total", "counter", "Cache lookups that had to compute the value.",
+        [({"cache": name}, s["misses"]) for name, s in stats.items()],
+    )
+    yield (
+        "cache_hit_ratio", "gauge", "Hits / lookups since the process started.",
+        [({"cache": name}, s["hit_ratio"]) for name, s in stats.items()],
+    )
+    yield (
+        "cache_entries", "gauge", "Entries currently cached.",
+        [({"cache": name}, s["size"]) for name, s in stats.items()],
+    )
+
+
+@registry.collector
+def _collect_worker_pools():
+    stats = {name: pool.stats() for name, pool in _worker_pools.items()}
+    for key, type_, documentation in (
+        ("running", "gauge", "Jobs running in the worker pool."),
+        ("queued", "gauge", "Jobs waiting for a worker."),
+        ("completed", "counter", "Jobs finished."),
+        ("rejected", "counter", "Jobs refused because the queue was full."),
+    ):
+        name = f"worker_pool_{key}" + ("_total" if type_ == "counter" else "")
+        yield name, type_, documentation, [({"pool": pool}, s[key]) for pool, s in stats.items()]
+
+
+class _RouteMetrics:
+    __slots__ = ("duration", "queries", "db_time", "statuses", "method", "route")
+
+    def __init__(self, method: str, route: str):
+        self.method = method
+        self.route = route
+        self.duration = http_request_duration.labels(method, route)
+        self.queries = db_queries_per_request.labels(method, route)
+        self.db_time = db_time_per_request.labels(method, route)
+        self.statuses: dict[int, object] = {}
+
+    def status(self, code: int):
+        child = self.statuses.get(code)
+        if child is None:
+            child = self.statuses[code] = http_requests.labels(self.method, self.route, str(code))
+        return child
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status, in-flight count and SQL usage per route
+    template (`/posts/{post_id}/vote`, not the raw path).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: dict[tuple[str, str], _RouteMetrics] = {}
+        self._in_progress: dict[str, object] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = self._in_progress.get(method)
+        if in_progress is None:
+            in_progress = self._in_progress[method] = http_requests_in_progress.labels(method)
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        usage = RequestDbUsage()
+        token = current_db_usage.set(usage)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            current_db_usage.reset(token)
+
+            # Unmatched paths share one label so 404 scans can't blow up
+            # the number of series.
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            metrics = self._routes.get((method, template))
+            if metrics is None:
+                metrics = self._routes[(method, template)] = _RouteMetrics(method, template)
+            metrics.duration.observe(elapsed)
+            metrics.queries.observe(usage.queries)
+            metrics.db_time.observe(usage.seconds)
+            metrics.status(status_code).inc()
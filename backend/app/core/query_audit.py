@@ -0,0 +1,186 @@
+import re
+import time
+import random
+import asyncio
+import logging
+from collections import Counter as TallyCounter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+query_budget_exceeded = registry.counter(
+    "query_budget_exceeded_total",
+    "Audited requests over the query count or SQL time budget.",
+    ["route"],
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|(?<!:):\w+|\?")
+_PARAM_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Same shape, same text: literals and bind parameters become `?` and
+    IN-lists of any length collapse to one, so repeats of a query group
+    together whatever their arguments.
+    """
+    statement = _STRING.sub("?", statement)
+    statement = _PARAM.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PARAM_LIST.sub("?, ...", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class _Query:
+    __slots__ = ("engine", "statement", "parameters", "seconds")
+
+    def __init__(self, engine, statement, parameters, seconds):
+        self.engine = engine
+        self.statement = statement
+        self.parameters = parameters
+        self.seconds = seconds
+
+
+class QueryLog:
+    __slots__ = ("queries",)
+
+    def __init__(self):
+        self.queries: list[_Query] = []
+
+    @property
+    def seconds(self) -> float:
+        return sum(q.seconds for q in self.queries)
+
+
+current_query_log: ContextVar[QueryLog | None] = ContextVar("current_query_log", default=None)
+
+
+def audit_engine(engine) -> None:
+    """
+    Records every statement run on `engine` into the current request's
+    QueryLog, when the request is being audited.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    # On the execution context, like instrument_engine's timing, so a
+    # statement that raises leaves nothing on the connection.
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if current_query_log.get() is not None and context is not None:
+            context._audit_start = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        log = current_query_log.get()
+        start = getattr(context, "_audit_start", None)
+        if log is None or start is None:
+            return
+        elapsed = time.perf_counter() - start
+        log.queries.append(_Query(engine, statement, None if executemany else parameters, elapsed))
+
+
+def _is_read_only(statement: str) -> bool:
+    head = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    if head not in ("SELECT", "WITH"):
+        return False
+    return not re.search(r"\b(INSERT|UPDATE|DELETE)\b", statement, re.IGNORECASE)
+
+
+async def explain(query: _Query) -> str:
+    """
+    Plan of a slow read-only query, on a fresh connection so a failing
+    EXPLAIN can't break the request's transaction. Postgres runs
+    EXPLAIN ANALYZE (which executes the query again); SQLite only plans it.
+    """
+    engine = query.engine
+    if engine.dialect.name == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+    else:
+        prefix = "EXPLAIN QUERY PLAN "
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(prefix + query.statement, query.parameters or ())
+        rows = result.all()
+        await conn.rollback()
+    return "\n".join(" ".join(str(col) for col in row) for row in rows)
+
+
+class QueryAuditMiddleware:
+    """
+    Development/canary aid: logs requests that run more than
+    QUERY_AUDIT_MAX_QUERIES statements or spend more than
+    QUERY_AUDIT_MAX_DB_MS in SQL, with their statements grouped by shape
+    (repeats of one shape are the N+1 to look for). Audits a
+    QUERY_AUDIT_SAMPLE_RATE share of requests.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._explain_tasks: set[asyncio.Task] = set()
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.QUERY_AUDIT_ENABLED
+            or random.random() >= settings.QUERY_AUDIT_SAMPLE_RATE
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog()
+        token = current_query_log.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_query_log.reset(token)
+            self._report(scope, log)
+
+    def _report(self, scope, log: QueryLog) -> None:
+        db_ms = log.seconds * 1000
+        slow = [
+            q for q in log.queries
+            if q.seconds * 1000 >= settings.QUERY_AUDIT_SLOW_QUERY_MS
+        ]
+        if (
+            len(log.queries) <= settings.QUERY_AUDIT_MAX_QUERIES
+            and db_ms <= settings.QUERY_AUDIT_MAX_DB_MS
+            and not slow
+        ):
+            return
+
+        route = getattr(scope.get("route"), "path", "unmatched")
+        query_budget_exceeded.labels(route).inc()
+
+        shapes = TallyCounter(normalize_statement(q.statement) for q in log.queries)
+        lines = [
+            f"{count:>4}x  {shape}"
+            for shape, count in shapes.most_common()
+        ]
+        logger.warning(
+            "%s %s ran %d queries in %.1f ms (%d slow)\n%s",
+            scope["method"], route, len(log.queries), db_ms, len(slow), "\n".join(lines),
+        )
+
+        if settings.QUERY_AUDIT_EXPLAIN:
+            for query in slow:
+                if _is_read_only(query.statement):
+                    task = asyncio.create_task(self._explain(query))
+                    self._explain_tasks.add(task)
+                    task.add_done_callback(self._explain_tasks.discard)
+
+    async def _explain(self, query: _Query) -> None:
+        try:
+            plan = await explain(query)
+        except Exception:
+            logger.exception("EXPLAIN failed for %s", normalize_statement(query.statement))
+            return
+        logger.warning(
+            "slow query (%.1f ms): %s\n%s",
+            query.seconds * 1000, normalize_statement(query.statement), plan,
+        )
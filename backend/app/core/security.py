@@ -1,14 +1,36 @@
 import bcrypt
+import time
 import hashlib
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from app.core.config import settings
+from app.core.metrics import register_cache, register_worker_pool
+from app.utils.cache import TTLCache
+from app.utils.worker_pool import BoundedWorkerPool
 
 ALGORITHM = "HS256"
 
+# bcrypt blocks for 100ms+ per call, so the async handlers run it here
+# instead of on the event loop.
+password_pool = BoundedWorkerPool(
+    name="bcrypt",
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+register_worker_pool("bcrypt", password_pool)
+
+# Subjects of tokens that already passed verification, keyed by the
+# token's digest. Each entry expires with its token, so a cached token is
+# never accepted past its exp.
+token_cache: TTLCache[bytes, str] = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+register_cache("token", token_cache)
+
 def hash_password(password: str) -> str:
     password_hash = hashlib.sha256(password.encode('utf-8')).hexdigest()
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_hash.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -16,6 +38,20 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     password_hash = hashlib.sha256(plain_password.encode('utf-8')).hexdigest()
     return bcrypt.checkpw(password_hash.encode('utf-8'), hashed_password.encode('utf-8'))
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    # bcrypt hashes look like $2b$<cost>$<salt+hash>
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != settings.BCRYPT_ROUNDS
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
 def create_access_token(subject: str) -> str:
     expire = datetime.now(timezone.utc) + timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -25,8 +61,27 @@ def create_access_token(subject: str) -> str:
 
 
 def decode_access_token(token: str) -> str:
+    if not settings.TOKEN_CACHE_ENABLED:
+        return _verify_access_token(token)["sub"]
+
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    subject = token_cache.get(key)
+    if subject is not None:
+        return subject
+    payload = _verify_access_token(token)
+    # Invalid tokens raise above and are never cached, nor are tokens
+    # without an exp (they have nothing to expire the entry with).
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        token_cache.set(key, payload["sub"], ttl_seconds=remaining)
+    return payload["sub"]
+
+
+def _verify_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        return payload["sub"]
     except JWTError:
         raise ValueError("Invalid token")
+    if "sub" not in payload:
+        raise ValueError("Invalid token")
+    return payload
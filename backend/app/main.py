@@ -1,12 +1,59 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.routes import auth, post, comment
-from app.models import User, Post, Comment, Vote
+from app.api.v1.routes import auth, post, comment, admin, live
+from app.core.limiter import close_rate_limiter
+from app.core.live import get_broker, close_broker
+from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.last_write import LastWriteMiddleware
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.query_audit import QueryAuditMiddleware
+from app.core.database import pool_stats, replicas, run_replica_health_checker
+from app.core.security import password_pool
+from app.services.outbox import run_outbox_worker
+from app.services.ranking import run_hot_score_refresher
+from app.services.vote import run_vote_buffer_flusher
+from app.models import User, Post, Comment, Vote, OutboxEvent
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    if settings.HOT_REFRESH_ENABLED:
+        tasks.append(asyncio.create_task(run_hot_score_refresher()))
+    if settings.VOTE_BUFFER_ENABLED:
+        tasks.append(asyncio.create_task(run_vote_buffer_flusher()))
+    if replicas:
+        tasks.append(asyncio.create_task(run_replica_health_checker()))
+    if settings.LIVE_ENABLED:
+        tasks.append(asyncio.create_task(get_broker().run()))
+    if settings.OUTBOX_ENABLED and settings.OUTBOX_WORKER_IN_PROCESS:
+        tasks.append(asyncio.create_task(run_outbox_worker()))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await close_rate_limiter()
+    await close_broker()
+    await replicas.dispose()
+    password_pool.shutdown()
+
 
 app = FastAPI(
     title="4umSocial API",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
+app.add_middleware(LastWriteMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(QueryAuditMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -16,6 +63,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],             # IMPORTANT (allows OPTIONS)
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Last-Write"],
 )
 
 
@@ -23,6 +71,18 @@ app.add_middleware(
 async def health():
     return {"status": "ok"}
 
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/health/db")
+async def health_db():
+    return pool_stats()
+
 app.include_router(auth.router)
 app.include_router(post.router)
 app.include_router(comment.router)
+app.include_router(admin.router)
+app.include_router(live.router)
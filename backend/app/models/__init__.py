@@ -2,10 +2,12 @@ from app.models.user import User
 from app.models.post import Post
 from app.models.comment import Comment
 from app.models.vote import Vote
+from app.models.outbox import OutboxEvent
 
 __all__ = [
     "User",
     "Post",
     "Comment",
     "Vote",
+    "OutboxEvent",
 ]
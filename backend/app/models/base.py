@@ -1,15 +1,27 @@
 from sqlalchemy import DateTime, func
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import Mapped, mapped_column
 from app.core.database import Base
 
+# SQLite keeps timestamps as text and compares them as text. Its
+# CURRENT_TIMESTAMP (the server default) writes whole seconds, while
+# SQLAlchemy binds microseconds too, and "12:00:00" < "12:00:00.000000":
+# keyset cursors would never get past a second's rows. Binding in the
+# server default's format keeps those comparisons exact.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d",
+    ),
+    "sqlite",
+)
+
 class TimestampMixin:
     created_at: Mapped[DateTime] = mapped_column(
-        DateTime(timezone=True),
+        Timestamp,
         server_default=func.now()
     )
     updated_at: Mapped[DateTime] = mapped_column(
-        DateTime(timezone=True),
+        Timestamp,
         server_default=func.now(),
         onupdate=func.now()
     )
-
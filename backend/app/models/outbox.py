@@ -0,0 +1,32 @@
+# models/outbox.py
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, DateTime, Integer, JSON, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class OutboxEvent(Base):
+    """
+    A side effect of a write, inserted in the same transaction and run
+    later by the outbox worker (app/services/outbox.py). Rows are deleted
+    once handled; `failed_at` marks one that ran out of attempts.
+    """
+    __tablename__ = "outbox_events"
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    topic: Mapped[str] = mapped_column(String(50))
+    # Events with the same key (e.g. "post:12") are handled in id order.
+    key: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    payload: Mapped[dict] = mapped_column(JSON)
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Set by the application, not the database, so lag is measured on one clock.
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_now)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_now)
+    failed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,5 +1,5 @@
 # models/post.py
-from sqlalchemy import String, Text, ForeignKey, Integer
+from sqlalchemy import String, Text, ForeignKey, Integer, Float
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import TimestampMixin
 from app.core.database import Base
@@ -13,7 +13,19 @@ class Post(Base, TimestampMixin):
     text: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     author_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
-    points: Mapped[int] = mapped_column(Integer, default=0)
+    points: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
+    # Denormalized counters, kept in sync by the vote/comment handlers.
+    # `python -m app.commands.reconcile_counters` repairs any drift.
+    upvotes: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    downvotes: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    comment_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
+    # updated_at (TimestampMixin) also moves with every counter change and
+    # comment edit, so it versions the post and its thread for ETags.
+
+    # Ranking for the "best" sort, see app/services/ranking.py.
+    hot_score: Mapped[float] = mapped_column(Float, default=0, server_default="0")
 
     author = relationship("User", back_populates="posts")
     comments = relationship("Comment", back_populates="post", cascade="all,delete")
@@ -21,9 +21,26 @@ class CommentOut(BaseModel):
     parent_id: Optional[int]
     created_at: datetime
     children: List["CommentOut"] = []
+    # Direct replies; when more_replies is set they were cut off by
+    # max_depth and can be loaded with GET /comments/{id}/replies.
+    reply_count: int = 0
+    more_replies: bool = False
 
     class Config:
         from_attributes = True
 
 
+class CommentExportOut(BaseModel):
+    """
+    One line of the comments NDJSON export (flat; no tree).
+    """
+    id: int
+    content: str
+    author_id: int
+    author_name: str
+    post_id: int
+    parent_id: Optional[int]
+    created_at: datetime
+
+
 CommentOut.model_rebuild()
@@ -2,6 +2,8 @@ from pydantic import BaseModel, HttpUrl, Field
 from typing import Optional
 from datetime import datetime
 
+from app.schemas.comment import CommentOut
+
 
 class PostCreate(BaseModel):
     title: str = Field(min_length=3, max_length=300)
@@ -28,3 +30,10 @@ class PostOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PostDetailOut(PostOut):
+    """
+    GET /posts/{post_id}: the post and the first page of its comment thread.
+    """
+    comments: list[CommentOut] = []
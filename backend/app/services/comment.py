@@ -0,0 +1,189 @@
+from datetime import datetime
+
+from sqlalchemy import select, func, literal, tuple_
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import User, Comment
+from app.schemas.comment import CommentOut
+from app.utils.cursor import encode_cursor, decode_cursor
+
+
+async def get_comment_tree(
+        db: AsyncSession,
+        max_depth: int,
+        limit: int,
+        cursor: str | None,
+        post_id: int | None = None,
+        parent_id: int | None = None,
+        replies_limit: int = 20,
+        fast: bool = False,
+) -> tuple[list[CommentOut] | list[dict], str | None]:
+    """
+    Loads one page of `limit` comments at the top of a thread (the post's
+    top-level comments, or the direct replies to `parent_id`) together with
+    their replies down to `max_depth` levels, in a single recursive query.
+    Below the page, each comment brings at most its first `replies_limit`
+    replies.
+
+    Comments at the depth cut-off that have replies of their own, and
+    comments with more than `replies_limit` replies, are returned with
+    `more_replies=True` and their `reply_count`; fetch their replies with
+    `parent_id`. Returns the page and the cursor for the next one.
+    With `fast` the comments are CommentOut-shaped dicts.
+    Raises ValueError for a malformed cursor.
+    """
+    stmt = comment_tree_query(max_depth, limit, cursor, post_id=post_id, parent_id=parent_id, replies_limit=replies_limit)
+    result = await db.execute(stmt)
+    return comment_page(result.all(), max_depth, limit, replies_limit, fast)
+
+
+def comment_tree_query(
+        max_depth: int,
+        limit: int,
+        cursor: str | None,
+        post_id: int | None = None,
+        parent_id: int | None = None,
+        replies_limit: int = 20,
+):
+    """
+    The statement behind get_comment_tree, for embedding in a larger query.
+    Its rows go to comment_page. Raises ValueError for a malformed cursor.
+    """
+    if parent_id is not None:
+        page_filter = Comment.parent_id == parent_id
+    else:
+        page_filter = (Comment.post_id == post_id) & Comment.parent_id.is_(None)
+
+    page = (
+        select(
+            Comment.id,
+            func.row_number().over(order_by=(Comment.created_at, Comment.id)).label("rn"),
+        )
+        .where(page_filter)
+        .order_by(Comment.created_at, Comment.id)
+    )
+    if cursor:
+        after = decode_cursor(cursor)
+        try:
+            last = (datetime.fromisoformat(after["created_at"]), int(after["id"]))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        page = page.where(tuple_(Comment.created_at, Comment.id) > last)
+    # One extra row tells us whether there is a next page.
+    page = page.limit(limit + 1).cte("page")
+
+    tree = (
+        select(page.c.id, literal(1).label("depth"))
+        .where(page.c.rn <= limit)
+        .cte("tree", recursive=True)
+    )
+    # The first `replies_limit` siblings, so one comment with thousands of
+    # replies can't blow up the page. A correlated IN rather than a window
+    # function: neither SQLite nor Postgres allows those in the recursive term.
+    sibling = aliased(Comment)
+    first_replies = (
+        select(sibling.id)
+        .where(sibling.parent_id == Comment.parent_id)
+        .order_by(sibling.created_at, sibling.id)
+        .limit(replies_limit)
+    )
+    tree = tree.union_all(
+        select(Comment.id, tree.c.depth + 1)
+        .join(tree, Comment.parent_id == tree.c.id)
+        .where(tree.c.depth < max_depth, Comment.id.in_(first_replies))
+    )
+
+    reply = aliased(Comment)
+    reply_count = (
+        select(func.count(reply.id))
+        .where(reply.parent_id == Comment.id)
+        .scalar_subquery()
+    )
+    page_size = select(func.count()).select_from(page).scalar_subquery()
+
+    return (
+        select(
+            Comment.id,
+            Comment.content,
+            Comment.author_id,
+            User.username.label("author_name"),
+            Comment.post_id,
+            Comment.parent_id,
+            Comment.created_at,
+            tree.c.depth,
+            reply_count.label("reply_count"),
+            page_size.label("page_size"),
+        )
+        .join(tree, tree.c.id == Comment.id)
+        .join(User, User.id == Comment.author_id)
+        .order_by(Comment.created_at, Comment.id)
+    )
+
+
+def comment_page(
+        rows,
+        max_depth: int,
+        limit: int,
+        replies_limit: int = 20,
+        fast: bool = False,
+) -> tuple[list[CommentOut] | list[dict], str | None]:
+    """
+    The page of comments and the next page's cursor from comment_tree_query's rows.
+    """
+    roots = build_comment_tree(rows, max_depth, fast, replies_limit)
+
+    next_cursor = None
+    if rows and rows[0].page_size > limit:
+        last_root = next(row for row in reversed(rows) if row.depth == 1)
+        next_cursor = encode_cursor({
+            "created_at": last_root.created_at.isoformat(),
+            "id": last_root.id,
+        })
+    return roots, next_cursor
+
+
+def build_comment_tree(
+        rows,
+        max_depth: int,
+        fast: bool = False,
+        replies_limit: int | None = None,
+) -> list[CommentOut] | list[dict]:
+    """
+    `rows` have CommentOut's scalar fields plus `depth` and `reply_count`,
+    ordered so that parents come before their replies. `replies_limit` is
+    the per-comment reply cap the rows were loaded with, if any.
+    """
+    children_of: dict[int, list] = {}
+    roots = []
+
+    for row in rows:
+        fields = {
+            "id": row.id,
+            "content": row.content,
+            "author_id": row.author_id,
+            "author_name": row.author_name,
+            "post_id": row.post_id,
+            "parent_id": row.parent_id,
+            "created_at": row.created_at,
+            "children": [],
+            "reply_count": row.reply_count,
+            "more_replies": (
+                row.reply_count > 0 if row.depth >= max_depth
+                else replies_limit is not None and row.reply_count > replies_limit
+            ),
+        }
+        if fast:
+            node = fields
+            children_of[row.id] = fields["children"]
+        else:
+            node = CommentOut(**fields)
+            children_of[row.id] = node.children
+
+        if row.depth == 1:
+            roots.append(node)
+        else:
+            siblings = children_of.get(row.parent_id)
+            if siblings is not None:
+                siblings.append(node)
+
+    return roots
@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import read_session
+from app.models import User, Post, Comment
+from app.schemas.comment import CommentExportOut
+from app.services.post import _to_post_out
+
+
+async def _stream_lines(stmt, to_line) -> AsyncIterator[bytes]:
+    # Own session, on a replica when there is one: the response outlives
+    # the request's dependencies. yield_per runs it through a server-side
+    # cursor, so only one batch is in memory at a time.
+    async with read_session() as db:
+        result = await db.stream(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield b"".join(to_line(row) + b"\n" for row in rows)
+
+
+def export_posts(after_id: int = 0) -> AsyncIterator[bytes]:
+    """
+    Every post with id > `after_id`, in id order, as NDJSON chunks.
+    """
+    stmt = (
+        select(Post, User.username)
+        .join(User, User.id == Post.author_id)
+        .where(Post.id > after_id)
+        .order_by(Post.id)
+    )
+    return _stream_lines(
+        stmt,
+        lambda row: _to_post_out(row[0], row[1]).model_dump_json().encode(),
+    )
+
+
+def export_comments(
+        since: datetime | None = None,
+        until: datetime | None = None,
+        after_id: int = 0,
+) -> AsyncIterator[bytes]:
+    """
+    Comments created in [since, until) with id > `after_id`, in id order,
+    as NDJSON chunks.
+    """
+    stmt = (
+        select(
+            Comment.id,
+            Comment.content,
+            Comment.author_id,
+            User.username.label("author_name"),
+            Comment.post_id,
+            Comment.parent_id,
+            Comment.created_at,
+        )
+        .join(User, User.id == Comment.author_id)
+        .where(Comment.id > after_id)
+        .order_by(Comment.id)
+    )
+    if since is not None:
+        stmt = stmt.where(Comment.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Comment.created_at < until)
+    return _stream_lines(
+        stmt,
+        lambda row: CommentExportOut.model_validate(row._mapping).model_dump_json().encode(),
+    )
@@ -0,0 +1,82 @@
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.database import read_session
+from app.core.metrics import register_cache
+from app.schemas.post import PostOut
+from app.services.post import get_posts_data, get_listing_stamp, shape_posts
+from app.utils.cache import StaleWhileRevalidateCache
+from app.utils.http_cache import make_etag
+from app.utils import fast_json
+
+# Serialized `GET /posts/` pages and their ETags, keyed by (sort, limit,
+# offset, fields, truncate_text) and tagged with the ids of the posts they
+# contain. Per process: other workers see a write once their copy goes
+# stale after FRONT_PAGE_CACHE_TTL_SECONDS.
+front_page_cache: StaleWhileRevalidateCache[tuple, tuple[bytes, str]] = StaleWhileRevalidateCache(
+    max_size=settings.FRONT_PAGE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.FRONT_PAGE_CACHE_TTL_SECONDS,
+    stale_seconds=settings.FRONT_PAGE_CACHE_STALE_SECONDS,
+)
+register_cache("front_page", front_page_cache)
+
+_posts_adapter = TypeAdapter(list[PostOut])
+
+
+def is_cacheable(offset: int) -> bool:
+    return settings.FRONT_PAGE_CACHE_ENABLED and offset < settings.FRONT_PAGE_CACHE_MAX_OFFSET
+
+
+def listing_etag(
+    stamp: tuple,
+    sort: str,
+    limit: int,
+    offset: int | None = None,
+    cursor: str | None = None,
+    fields: tuple[str, ...] | None = None,
+    truncate_text: int | None = None,
+) -> str:
+    return make_etag("posts", sort, limit, offset, cursor, fields, truncate_text, stamp)
+
+
+async def get_front_page(
+    sort: str,
+    limit: int,
+    offset: int,
+    fields: tuple[str, ...] | None = None,
+    truncate_text: int | None = None,
+) -> tuple[bytes, str]:
+    """
+    The page's JSON and its ETag. `fields` comes from parse_fields.
+    """
+    async def compute():
+        # Own session: a background refresh outlives the request that
+        # triggered it.
+        fast = settings.FAST_JSON_ENABLED or fields is not None or truncate_text is not None
+        async with read_session() as db:
+            # Stamp first: a write landing in between makes the page newer
+            # than its ETag, never older.
+            stamp = await get_listing_stamp(db, sort)
+            posts = await get_posts_data(sort=sort, limit=limit, offset=offset, post_ids=[], db=db, fast=fast)
+        etag = listing_etag(stamp, sort, limit, offset, fields=fields, truncate_text=truncate_text)
+        tags = [sort, *(post["id"] if fast else post.id for post in posts)]
+        if fast:
+            return (fast_json.dumps(shape_posts(posts, fields, truncate_text)), etag), tags
+        return (_posts_adapter.dump_json(posts), etag), tags
+
+    return await front_page_cache.get_or_compute((sort, limit, offset, fields, truncate_text), compute)
+
+
+def post_created() -> None:
+    front_page_cache.mark_stale()
+
+
+def post_changed(post_id: int, reorders: bool = False) -> None:
+    """
+    `reorders` is for changes that can move the post between pages of the
+    top/best sorts (votes), not just change what it displays (comments).
+    """
+    front_page_cache.mark_stale(post_id)
+    if reorders:
+        for sort in ("top", "best"):
+            front_page_cache.mark_stale(sort)
@@ -0,0 +1,114 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal
+from app.core.live import get_broker
+from app.models import Comment, User
+from app.schemas.comment import CommentOut
+from app.services import outbox
+
+# Topics: the front page gets every post's counter changes; "post:<id>"
+# gets that post's counters and its comments.
+FRONT_PAGE = "front_page"
+
+
+def post_topic(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+def is_topic(topic: str) -> bool:
+    if topic == FRONT_PAGE:
+        return True
+    kind, _, post_id = topic.partition(":")
+    return kind == "post" and post_id.isdigit()
+
+
+def post_created(post_id: int) -> None:
+    """
+    Front page clients fetch it with GET /posts/{post_id} if they want it.
+    """
+    get_broker().publish(FRONT_PAGE, f"new:{post_id}", {"type": "post_created", "post_id": post_id})
+
+
+def post_changed(post_id: int, **counters) -> None:
+    """
+    `counters` are the post's new values (points, comment_count).
+    """
+    event = {"type": "post", "post_id": post_id, **counters}
+    broker = get_broker()
+    broker.publish(FRONT_PAGE, f"post:{post_id}", event)
+    broker.publish(post_topic(post_id), f"post:{post_id}", event)
+
+
+def comment_changed(comment: CommentOut) -> None:
+    """
+    A comment was added or edited; clients upsert it by id.
+    """
+    event = {"type": "comment", "comment": comment.model_dump(mode="json", exclude={"children"})}
+    get_broker().publish(post_topic(comment.post_id), f"comment:{comment.id}", event)
+
+
+# With OUTBOX_ENABLED the write endpoints queue these in their transaction
+# instead of publishing after the commit; the outbox worker publishes them,
+# in order per post.
+POST_CREATED = "live.post_created"
+POST_CHANGED = "live.post_changed"
+COMMENT_CHANGED = "live.comment_changed"
+
+
+def queue_post_created(db: AsyncSession, post_id: int) -> None:
+    outbox.enqueue(db, POST_CREATED, {"post_id": post_id}, key=post_topic(post_id))
+
+
+def queue_post_changed(db: AsyncSession, post_id: int, **counters) -> None:
+    outbox.enqueue(db, POST_CHANGED, {"post_id": post_id, **counters}, key=post_topic(post_id))
+
+
+def queue_comment_changed(
+    db: AsyncSession, comment_id: int, post_id: int, comment_count: int | None = None
+) -> None:
+    """
+    Only the id is queued (the comment's created_at isn't known before the
+    commit); the handler reads the comment back. A `comment_count` is
+    published as a post change too, so a new comment costs one event.
+    """
+    payload = {"comment_id": comment_id, "post_id": post_id}
+    if comment_count is not None:
+        payload["comment_count"] = comment_count
+    outbox.enqueue(db, COMMENT_CHANGED, payload, key=post_topic(post_id))
+
+
+@outbox.handler(POST_CREATED)
+async def _send_post_created(payload: dict) -> None:
+    post_created(payload["post_id"])
+
+
+@outbox.handler(POST_CHANGED)
+async def _send_post_changed(payload: dict) -> None:
+    post_changed(**payload)
+
+
+@outbox.handler(COMMENT_CHANGED)
+async def _send_comment_changed(payload: dict) -> None:
+    if "comment_count" in payload:
+        post_changed(payload["post_id"], comment_count=payload["comment_count"])
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Comment, User.username)
+            .join(User, User.id == Comment.author_id)
+            .where(Comment.id == payload["comment_id"])
+        )
+        row = result.one_or_none()
+    if row is None:
+        # Deleted since; nothing left to show.
+        return
+    comment, username = row
+    comment_changed(CommentOut(
+        id=comment.id,
+        content=comment.content,
+        author_id=comment.author_id,
+        author_name=username,
+        post_id=comment.post_id,
+        parent_id=comment.parent_id,
+        created_at=comment.created_at,
+        children=[],
+    ))
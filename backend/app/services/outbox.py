@@ -0,0 +1,214 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from sqlalchemy import select, delete, exists, or_, insert, literal, String, DateTime
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import registry
+from app.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], Awaitable[None]]
+
+_handlers: dict[str, Handler] = {}
+
+outbox_events = registry.counter(
+    "outbox_events_total",
+    "Outbox events handled, by topic and outcome (done, retry, failed).",
+    ["topic", "outcome"],
+)
+outbox_lag = registry.histogram(
+    "outbox_lag_seconds",
+    "Time from an outbox event's write to its handling.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+outbox_oldest_pending = registry.gauge(
+    "outbox_oldest_pending_seconds",
+    "Age of the oldest event waiting in the outbox, as of the last poll.",
+)
+
+
+def handler(topic: str) -> Callable[[Handler], Handler]:
+    """
+    Registers `func(payload)` as the handler for `topic`. An event can be
+    handled more than once (if the worker dies before committing), so
+    handlers must be idempotent.
+    """
+    def register(func: Handler) -> Handler:
+        _handlers[topic] = func
+        return func
+    return register
+
+
+def enqueue(db: AsyncSession, topic: str, payload: dict, key: str | None = None) -> None:
+    """
+    Adds an event to `db`'s transaction: it is handled only if that
+    transaction commits. Events with the same `key` are handled in the
+    order they were written. `payload` must be JSON-ready.
+    """
+    db.add(OutboxEvent(topic=topic, key=key, payload=payload))
+
+
+def enqueue_from(source, topic: str, payload, key: str | None = None):
+    """
+    An INSERT of one event per row of `source` (a CTE), with `payload` a SQL
+    JSON expression over it. Attached to the statement that writes `source`,
+    it queues the event without a round trip of its own.
+    """
+    now = literal(datetime.now(timezone.utc), DateTime(timezone=True))
+    return insert(OutboxEvent).from_select(
+        ["topic", "key", "payload", "created_at", "available_at"],
+        select(literal(topic, String), literal(key, String), payload, now, now).select_from(source),
+    )
+
+
+def _age(since: datetime, now: datetime) -> float:
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return max((now - since).total_seconds(), 0.0)
+
+
+class OutboxWorker:
+    """
+    Drains outbox_events in batches. Each batch is claimed with
+    SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers (in-process
+    or `python -m app.commands.outbox_worker`) can run side by side.
+
+    Only the oldest pending event of each key is claimable, and a batch
+    takes the rest of its keys' events behind it, so a key's events never
+    run concurrently or out of order. A failing event is retried with
+    exponential backoff and holds back the later events of its key until
+    it succeeds or is parked (`failed_at`) after `max_attempts`.
+    """
+
+    def __init__(self, batch_size: int, max_attempts: int, retry_base_seconds: float):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+
+    async def _claim(self, db: AsyncSession, now: datetime) -> list[OutboxEvent]:
+        pending = OutboxEvent.failed_at.is_(None)
+        earlier = aliased(OutboxEvent)
+        result = await db.execute(
+            select(OutboxEvent)
+            .where(
+                pending,
+                OutboxEvent.available_at <= now,
+                or_(
+                    OutboxEvent.key.is_(None),
+                    ~exists().where(
+                        earlier.key == OutboxEvent.key,
+                        earlier.id < OutboxEvent.id,
+                        earlier.failed_at.is_(None),
+                    ),
+                ),
+            )
+            .order_by(OutboxEvent.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        events = list(result.scalars())
+
+        # Other workers can't claim these: while the first event of their
+        # key is locked here, none of them is the oldest of its key.
+        keys = {event.key for event in events if event.key is not None}
+        if keys and len(events) < self.batch_size:
+            result = await db.execute(
+                select(OutboxEvent)
+                .where(
+                    pending,
+                    OutboxEvent.key.in_(keys),
+                    OutboxEvent.id.not_in([event.id for event in events]),
+                )
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size - len(events))
+                .with_for_update()
+            )
+            events.extend(result.scalars())
+            events.sort(key=lambda event: event.id)
+        return events
+
+    def _retry(self, event: OutboxEvent, error: Exception, now: datetime) -> None:
+        event.attempts += 1
+        event.last_error = f"{type(error).__name__}: {error}"[:2000]
+        if event.attempts >= self.max_attempts:
+            event.failed_at = now
+            outbox_events.labels(event.topic, "failed").inc()
+            logger.error("outbox event %d (%s) failed %d times; parked", event.id, event.topic, event.attempts)
+            return
+        delay = self.retry_base_seconds * 2 ** (event.attempts - 1)
+        event.available_at = now + timedelta(seconds=delay)
+        outbox_events.labels(event.topic, "retry").inc()
+        logger.warning("outbox event %d (%s) failed; retrying in %gs", event.id, event.topic, delay, exc_info=error)
+
+    async def drain(self) -> int:
+        """
+        Claims one batch and handles it. Returns how many events were claimed.
+        """
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as db:
+            events = await self._claim(db, now)
+            done: list[int] = []
+            held_back: set[str] = set()
+            for event in events:
+                if event.key in held_back:
+                    continue
+                try:
+                    func = _handlers.get(event.topic)
+                    if func is None:
+                        raise LookupError(f"No outbox handler for {event.topic!r}")
+                    await func(event.payload)
+                except Exception as e:
+                    self._retry(event, e, now)
+                    if event.key is not None:
+                        held_back.add(event.key)
+                    continue
+                done.append(event.id)
+                outbox_events.labels(event.topic, "done").inc()
+                outbox_lag.observe(_age(event.created_at, datetime.now(timezone.utc)))
+
+            if done:
+                await db.execute(
+                    delete(OutboxEvent)
+                    .where(OutboxEvent.id.in_(done))
+                    .execution_options(synchronize_session=False)
+                )
+            result = await db.execute(
+                select(OutboxEvent.created_at)
+                .where(OutboxEvent.failed_at.is_(None))
+                .order_by(OutboxEvent.id)
+                .limit(1)
+            )
+            oldest = result.scalar_one_or_none()
+            await db.commit()
+        outbox_oldest_pending.set(_age(oldest, now) if oldest is not None else 0)
+        return len(events)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                claimed = await self.drain()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("outbox drain failed")
+                claimed = 0
+            # A full batch means there is probably more waiting.
+            if claimed < self.batch_size:
+                await asyncio.sleep(settings.OUTBOX_POLL_MS / 1000)
+
+
+outbox_worker = OutboxWorker(
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    retry_base_seconds=settings.OUTBOX_RETRY_BASE_SECONDS,
+)
+
+
+async def run_outbox_worker() -> None:
+    await outbox_worker.run()
@@ -1,51 +1,120 @@
+import time
+from datetime import datetime, timezone
+
 from fastapi import Depends
-from sqlalchemy import select, func, case
+from sqlalchemy import select, func, update, tuple_, case, true
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.core.database import get_db
 from app.models import User, Post, Vote, Comment
-from app.schemas.post import PostOut
+from app.schemas.post import PostOut, PostDetailOut
+from app.services.comment import comment_tree_query, comment_page
+from app.services.ranking import hot_score, hot_score_sql, update_hot_score
+from app.utils.cursor import encode_cursor, decode_cursor
 
-async def get_posts_data(
-        sort: str,
-        limit: int, 
-        offset: int, 
-        post_ids: list[int], 
-        db: AsyncSession
-) -> list[PostOut]:
-    
-    upvotes = func.coalesce(
-        func.sum(case((Vote.value == 1, 1), else_=0)), 0
-    ).label("upvotes")
-
-    downvotes = func.coalesce(
-        func.sum(case((Vote.value == -1, 1), else_=0)), 0
-    ).label("downvotes")
-
-    comment_count_subq = (
-        select(
-            Comment.post_id,
-            func.count(Comment.id).label("comment_count")
-        )
-        .group_by(Comment.post_id)
-        .subquery()
-    )
+# PostOut's fields, in order. Rows selected with these are already
+# PostOut-shaped dicts, which the fast JSON path encodes as they are.
+POST_OUT_COLUMNS = (
+    Post.id,
+    Post.title,
+    Post.url,
+    Post.text,
+    Post.points,
+    Post.upvotes,
+    Post.downvotes,
+    Post.comment_count,
+    Post.author_id,
+    User.username.label("author_name"),
+    Post.created_at,
+)
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """
+    `fields=` of the listing endpoints: comma-separated PostOut field
+    names, returned in PostOut's order. Raises ValueError for unknown ones.
+    """
+    if not fields:
+        return None
+    wanted = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = wanted - PostOut.model_fields.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in PostOut.model_fields if name in wanted)
+
+
+def shape_posts(posts: list[dict], fields: tuple[str, ...] | None, truncate_text: int | None) -> list[dict]:
+    """
+    Applies `fields=` and `truncate_text=` to PostOut-shaped dicts. Text
+    longer than `truncate_text` characters is cut and ends in "…".
+    """
+    if truncate_text is not None:
+        for post in posts:
+            text = post.get("text")
+            if text is not None and len(text) > truncate_text:
+                post["text"] = text[:truncate_text] + "…"
+    if fields is not None:
+        posts = [{name: post[name] for name in fields} for post in posts]
+    return posts
+
+
+def _posts_query(post_ids: list[int], where=None, fast: bool = False):
+    # upvotes/downvotes/comment_count are denormalized onto posts, so listing
+    # is a plain read of the posts table (plus the author's name).
+    columns = POST_OUT_COLUMNS if fast else (Post, User.username)
     stmt = (
-        select(
-            Post,
-            upvotes,
-            downvotes,
-            User.username,
-            func.coalesce(comment_count_subq.c.comment_count, 0).label("comment_count")
-        )
-        .outerjoin(Vote, Vote.post_id == Post.id)        
-        .outerjoin(comment_count_subq, comment_count_subq.c.post_id == Post.id)
+        select(*columns)
         .join(User, User.id == Post.author_id)
-        .group_by(Post.id, User.username, comment_count_subq.c.comment_count)
-        
     )
     if len(post_ids) > 0:
         stmt = stmt.where(Post.id.in_(post_ids))
-    
+    if where is not None:
+        stmt = stmt.where(where)
+    return stmt
+
+
+def _to_post_out(post: Post, username: str) -> PostOut:
+    return PostOut(
+        id= post.id,
+        title=post.title,
+        url=post.url,
+        text=post.text,
+        points=post.points,
+        upvotes=post.upvotes,
+        downvotes=post.downvotes,
+        author_id=post.author_id,
+        author_name=username,
+        created_at=post.created_at,
+        comment_count=post.comment_count
+    )
+
+
+def _sort_key(sort: str, rank=None):
+    if sort == "new":
+        return Post.created_at
+    if sort == "top":
+        return Post.points
+    if sort == "relevance":
+        return rank
+    return Post.hot_score
+
+
+async def get_posts_data(
+        sort: str,
+        limit: int,
+        offset: int,
+        post_ids: list[int],
+        db: AsyncSession,
+        where=None,
+        rank=None,
+        fast: bool = False,
+) -> list[PostOut] | list[dict]:
+    """
+    `rank` is the SQL expression ordered by for sort="relevance".
+    With `fast`, returns plain PostOut-shaped dicts instead of models.
+    """
+    stmt = _posts_query(post_ids, where, fast)
+
     if sort == "new":
         stmt = stmt.order_by(Post.created_at.desc())
 
@@ -53,25 +122,245 @@ async def get_posts_data(
         stmt = stmt.order_by(Post.points.desc())
 
     elif sort == "best":
-        stmt = stmt.order_by(
-            (Post.points / func.extract("epoch", func.now() - Post.created_at)).desc()
+        stmt = stmt.order_by(Post.hot_score.desc(), Post.id.desc())
+
+    elif sort == "relevance":
+        stmt = stmt.order_by(rank.desc(), Post.id.desc())
+
+    stmt = stmt.limit(limit).offset(offset)
+    result = await db.execute(stmt)
+    if fast:
+        return [row._asdict() for row in result.all()]
+    return [_to_post_out(post, username) for post, username in result.all()]
+
+
+async def get_posts_page(
+        sort: str,
+        limit: int,
+        cursor: str | None,
+        db: AsyncSession,
+        where=None,
+        rank=None,
+        fast: bool = False,
+) -> tuple[list[PostOut] | list[dict], str | None]:
+    """
+    Keyset pagination: each page continues strictly after the last row of
+    the previous one, so deep pages cost the same as the first.
+
+    Returns the page and the cursor for the next one (None on the last page).
+    Raises ValueError for a malformed cursor or one from a different sort.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    if after is not None and after.get("sort") != sort:
+        raise ValueError("Cursor does not match sort")
+
+    key = _sort_key(sort, rank)
+    stmt = _posts_query([], where, fast).add_columns(key.label("sort_key"))
+    stmt = stmt.order_by(key.desc(), Post.id.desc())
+
+    if after is not None:
+        try:
+            if sort == "new":
+                last_key = datetime.fromisoformat(after["key"])
+            elif sort == "top":
+                last_key = int(after["key"])
+            else:
+                last_key = float(after["key"])
+            last_id = int(after["id"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        stmt = stmt.where(tuple_(key, Post.id) < (last_key, last_id))
+
+    result = await db.execute(stmt.limit(limit + 1))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_id, last_key = rows[-1].id if fast else rows[-1][0].id, rows[-1].sort_key
+        data = {"sort": sort, "id": last_id}
+        if sort == "new":
+            data["key"] = last_key.isoformat()
+        else:
+            data["key"] = last_key
+        next_cursor = encode_cursor(data)
+
+    if fast:
+        posts = []
+        for row in rows:
+            post = row._asdict()
+            del post["sort_key"]
+            posts.append(post)
+        return posts, next_cursor
+    return [_to_post_out(post, username) for post, username, _ in rows], next_cursor
+
+
+MAX_BATCH_IDS = 100
+
+
+def parse_ids(ids: str) -> list[int]:
+    """
+    `ids=` of GET /posts/batch: comma-separated post ids, duplicates
+    dropped, in the order given. Raises ValueError for anything that isn't
+    an id and for more than MAX_BATCH_IDS of them.
+    """
+    try:
+        post_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise ValueError("ids must be comma-separated integers")
+    if not post_ids:
+        raise ValueError("ids is empty")
+    if len(post_ids) > MAX_BATCH_IDS:
+        raise ValueError(f"At most {MAX_BATCH_IDS} ids")
+    return post_ids
+
+
+async def get_posts_by_ids(db: AsyncSession, post_ids: list[int], fast: bool = False) -> list[PostOut] | list[dict]:
+    """
+    The posts in `post_ids` order, in one query. Missing ids are left out.
+    """
+    stmt = _posts_query(post_ids, fast=fast)
+    result = await db.execute(stmt)
+    if fast:
+        posts = {row.id: row._asdict() for row in result.all()}
+    else:
+        posts = {post.id: _to_post_out(post, username) for post, username in result.all()}
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+
+async def get_post_detail(
+        db: AsyncSession,
+        post_id: int,
+        max_depth: int,
+        limit: int,
+        replies_limit: int = 20,
+        fast: bool = False,
+) -> tuple[PostDetailOut | dict, str | None, tuple] | None:
+    """
+    The post with the first page of its comments (as get_comment_tree),
+    the comments' next cursor and the post's version stamp (as
+    get_post_stamp), all from one query. None if the post doesn't exist.
+
+    The post's columns (prefixed "p_", clear of the comment columns) come
+    back on every comment row, except `text`, which only the first carries.
+    """
+    thread = comment_tree_query(max_depth, limit, None, post_id=post_id, replies_limit=replies_limit).order_by(None).subquery("thread")
+    first_row = func.row_number().over(order_by=(thread.c.created_at, thread.c.id)) == 1
+    post_columns = [
+        (case((first_row, Post.text)) if column.key == "text" else column).label(f"p_{column.key}")
+        for column in POST_OUT_COLUMNS
+    ]
+    result = await db.execute(
+        select(*post_columns, Post.updated_at.label("p_updated_at"), *thread.c)
+        .select_from(Post)
+        .join(User, User.id == Post.author_id)
+        .outerjoin(thread, true())
+        .where(Post.id == post_id)
+        .order_by(thread.c.created_at, thread.c.id)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+
+    head = rows[0]
+    post = {column.key: getattr(head, f"p_{column.key}") for column in POST_OUT_COLUMNS}
+    stamp = (head.p_updated_at, head.p_points, head.p_comment_count)
+    # A post without comments comes back as one row of NULL comment columns.
+    comments, next_cursor = comment_page([row for row in rows if row.id is not None], max_depth, limit, replies_limit, fast)
+    if fast:
+        return {**post, "comments": comments}, next_cursor, stamp
+    return PostDetailOut(**post, comments=comments), next_cursor, stamp
+
+
+async def get_listing_stamp(db: AsyncSession, sort: str) -> tuple:
+    """
+    Version stamp of the post listings, for ETags: changes when a post is
+    created or any post's counters change (every counter update moves its
+    updated_at). Two index lookups.
+
+    A write whose transaction started before another's but commits after
+    it carries the older updated_at and goes unnoticed until the next
+    write. The "best" sort also reorders as hot scores decay; that is
+    folded in as the current HOT_REFRESH_INTERVAL_SECONDS slot.
+    """
+    result = await db.execute(select(func.max(Post.updated_at), func.max(Post.id)))
+    stamp = tuple(result.one())
+    if sort == "best":
+        stamp += (int(time.time() // settings.HOT_REFRESH_INTERVAL_SECONDS),)
+    return stamp
+
+
+async def get_post_stamp(db: AsyncSession, post_id: int) -> tuple | None:
+    """
+    Version stamp of one post and its comment thread (adding, editing or
+    deleting a comment moves the post's updated_at). None if the post
+    doesn't exist.
+    """
+    result = await db.execute(
+        select(Post.updated_at, Post.points, Post.comment_count).where(Post.id == post_id)
+    )
+    row = result.one_or_none()
+    return tuple(row) if row is not None else None
+
+
+def apply_vote(post: Post, old_value: int, new_value: int) -> None:
+    """
+    Moves `post`'s counters from a previous vote value to a new one.
+    0 means "no vote".
+    """
+    post.points += new_value - old_value
+    post.upvotes += (new_value == 1) - (old_value == 1)
+    post.downvotes += (new_value == -1) - (old_value == -1)
+    update_hot_score(post)
+
+
+async def reconcile_post_counters(db: AsyncSession) -> int:
+    """
+    Recomputes points/upvotes/downvotes/comment_count from the votes and
+    comments tables, and hot_score from the corrected points. Returns the
+    number of posts that had drifted.
+    """
+    upvotes = (
+        select(func.count(Vote.id))
+        .where(Vote.post_id == Post.id, Vote.value == 1)
+        .scalar_subquery()
+    )
+    downvotes = (
+        select(func.count(Vote.id))
+        .where(Vote.post_id == Post.id, Vote.value == -1)
+        .scalar_subquery()
+    )
+    comment_count = (
+        select(func.count(Comment.id))
+        .where(Comment.post_id == Post.id)
+        .scalar_subquery()
+    )
+    points = upvotes - downvotes
+    values = dict(upvotes=upvotes, downvotes=downvotes, comment_count=comment_count, points=points)
+    postgres = db.get_bind().dialect.name == "postgresql"
+    if postgres:
+        values["hot_score"] = hot_score_sql(points)
+
+    stmt = (
+        update(Post)
+        .where(
+            (Post.upvotes != upvotes)
+            | (Post.downvotes != downvotes)
+            | (Post.comment_count != comment_count)
+            | (Post.points != points)
         )
-    
-    stmt = stmt.limit(limit).offset(offset)        
+        .values(**values)
+        .returning(Post.id, Post.points, Post.created_at)
+        .execution_options(synchronize_session=False)
+    )
     result = await db.execute(stmt)
-    posts = []
-    for post, up, down, username, comment_count in result.all():
-        posts.append(PostOut(
-            id= post.id,
-            title=post.title,
-            url=post.url,
-            text=post.text,
-            points=post.points,
-            upvotes=up,
-            downvotes=down,
-            author_id=post.author_id,
-            author_name=username,
-            created_at=post.created_at,
-            comment_count=comment_count
-        ))
-    return posts
+    rows = result.all()
+    if rows and not postgres:
+        # hot_score_sql is Postgres-only; score the corrected posts here.
+        now = datetime.now(timezone.utc)
+        await db.execute(
+            update(Post),
+            [{"id": row.id, "hot_score": hot_score(row.points, row.created_at, now)} for row in rows],
+        )
+    await db.commit()
+    return len(rows)
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update, bindparam, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import Post
+
+logger = logging.getLogger(__name__)
+
+
+def hot_score(points: int, created_at: datetime | None, now: datetime | None = None) -> float:
+    """
+    HN-style gravity ranking: points / (age_hours + offset) ** gravity.
+    The offset keeps brand-new posts from dividing by ~zero.
+    """
+    now = now or datetime.now(timezone.utc)
+    if created_at is None:
+        age_hours = 0.0
+    else:
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        age_hours = max((now - created_at).total_seconds() / 3600, 0.0)
+    return points / (age_hours + settings.HOT_AGE_OFFSET_HOURS) ** settings.HOT_GRAVITY
+
+
+def hot_score_sql(points, created_at=Post.created_at):
+    """
+    hot_score as a SQL expression (Postgres), for set-based updates.
+    """
+    age_hours = func.extract("epoch", func.now() - created_at) / 3600
+    return points / func.power(
+        func.greatest(age_hours, 0) + settings.HOT_AGE_OFFSET_HOURS,
+        settings.HOT_GRAVITY,
+    )
+
+
+def update_hot_score(post: Post) -> None:
+    post.hot_score = hot_score(post.points, post.created_at)
+
+
+# Core executemany; decay is not an edit, so updated_at is left alone.
+_update_hot_score = (
+    update(Post.__table__)
+    .where(Post.__table__.c.id == bindparam("b_id"))
+    .values(
+        hot_score=bindparam("b_score"),
+        updated_at=Post.__table__.c.updated_at,
+    )
+)
+
+
+async def refresh_hot_scores(db: AsyncSession) -> int:
+    """
+    Recomputes hot_score for posts younger than HOT_REFRESH_MAX_AGE_HOURS
+    and zeroes it for older ones, so a post that was very popular when it
+    crossed the cutoff doesn't keep outranking new posts forever. Returns
+    the number of posts updated.
+    """
+    now = datetime.now(timezone.utc)
+    since = now - timedelta(hours=settings.HOT_REFRESH_MAX_AGE_HOURS)
+
+    updated = 0
+    last_id = 0
+    while True:
+        result = await db.execute(
+            select(Post.id, Post.points, Post.created_at)
+            .where(Post.created_at >= since, Post.id > last_id)
+            .order_by(Post.id)
+            .limit(settings.HOT_REFRESH_BATCH_SIZE)
+        )
+        rows = result.all()
+        if not rows:
+            break
+
+        await db.execute(
+            _update_hot_score,
+            [
+                {"b_id": row.id, "b_score": hot_score(row.points, row.created_at, now)}
+                for row in rows
+            ],
+        )
+        await db.commit()
+        updated += len(rows)
+        last_id = rows[-1].id
+
+    # Posts that crossed the cutoff since the last pass, or got a vote
+    # after it. The range conditions can use the hot_score index.
+    result = await db.execute(
+        update(Post.__table__)
+        .where(
+            Post.__table__.c.created_at < since,
+            or_(Post.__table__.c.hot_score > 0, Post.__table__.c.hot_score < 0),
+        )
+        .values(hot_score=0, updated_at=Post.__table__.c.updated_at)
+    )
+    await db.commit()
+    return updated + result.rowcount
+
+
+async def run_hot_score_refresher() -> None:
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await refresh_hot_scores(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("hot score refresh failed")
+        await asyncio.sleep(settings.HOT_REFRESH_INTERVAL_SECONDS)
@@ -0,0 +1,213 @@
+import re
+import heapq
+import asyncio
+from bisect import bisect_left
+
+from sqlalchemy import select, func, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import engine
+from app.models import Post
+from app.schemas.post import PostOut
+from app.services.post import get_posts_data, get_posts_page
+from app.utils.cursor import encode_cursor, decode_cursor
+
+MAX_TERMS = 8
+
+# Weights match Postgres' ts_rank defaults for the A (title) and B (text)
+# labels set on posts.search_vector.
+TITLE_WEIGHT = 1.0
+TEXT_WEIGHT = 0.4
+
+# Generated column + GIN index, see the add_post_search_vector migration.
+# Not mapped on Post so that SQLite can still create the schema.
+search_vector = literal_column("posts.search_vector", type_=TSVECTOR)
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"[^\W_]+", text.lower())
+
+
+def search_backend() -> str:
+    if settings.SEARCH_BACKEND != "auto":
+        return settings.SEARCH_BACKEND
+    return "postgres" if engine.dialect.name == "postgresql" else "memory"
+
+
+class InvertedIndex:
+    """
+    In-process term -> {post_id: weight} index for databases without full
+    text search (SQLite in tests and local runs). Each worker has its own,
+    built from the posts table on first use and caught up with the posts
+    created since before every search, so writes don't have to index.
+
+    Catching up by id assumes ids become visible in order, as they do on
+    SQLite where writes are serialized.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, dict[int, float]] = {}
+        self._terms: list[str] = []
+        self.last_id = 0
+        self._load_lock = asyncio.Lock()
+
+    async def catch_up(self, db: AsyncSession) -> None:
+        """
+        Indexes the posts created since the last call (all of them the first time).
+        """
+        async with self._load_lock:
+            result = await db.stream(
+                select(Post.id, Post.title, Post.text)
+                .where(Post.id > self.last_id)
+                .order_by(Post.id)
+                .execution_options(yield_per=1000)
+            )
+            async for row in result:
+                self.add(row.id, row.title, row.text)
+                self.last_id = row.id
+
+    def add(self, post_id: int, title: str, text: str | None) -> None:
+        for tokens, weight in ((tokenize(title), TITLE_WEIGHT), (tokenize(text or ""), TEXT_WEIGHT)):
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    self._terms.insert(bisect_left(self._terms, token), token)
+                postings[post_id] = postings.get(post_id, 0.0) + weight
+
+    def search(self, terms: list[str]) -> dict[int, float]:
+        """
+        Posts matching every term as a prefix, with summed weights.
+        """
+        scores: dict[int, float] | None = None
+        for term in terms:
+            matches: dict[int, float] = {}
+            i = bisect_left(self._terms, term)
+            while i < len(self._terms) and self._terms[i].startswith(term):
+                for post_id, weight in self._postings[self._terms[i]].items():
+                    matches[post_id] = matches.get(post_id, 0.0) + weight
+                i += 1
+
+            if scores is None:
+                scores = matches
+            else:
+                scores = {
+                    post_id: score + matches[post_id]
+                    for post_id, score in scores.items()
+                    if post_id in matches
+                }
+            if not scores:
+                return {}
+        return scores or {}
+
+
+memory_index = InvertedIndex()
+
+
+def _pg_match(terms: list[str]):
+    # Every term as a prefix, all required: "foo:* & bar:*".
+    query = func.to_tsquery(
+        literal_column("'english'"),
+        " & ".join(f"{term}:*" for term in terms),
+    )
+    return search_vector.op("@@")(query), func.ts_rank_cd(search_vector, query)
+
+
+async def search_posts(
+        q: str,
+        sort: str,
+        limit: int,
+        offset: int,
+        db: AsyncSession,
+        fast: bool = False,
+) -> list[PostOut] | list[dict]:
+    """
+    With `fast`, returns PostOut-shaped dicts, see get_posts_data.
+    """
+    terms = tokenize(q)[:MAX_TERMS]
+    if not terms:
+        return []
+
+    if search_backend() == "postgres":
+        match, rank = _pg_match(terms)
+        return await get_posts_data(
+            sort=sort, limit=limit, offset=offset, post_ids=[], db=db,
+            where=match, rank=rank, fast=fast,
+        )
+
+    await memory_index.catch_up(db)
+    scores = memory_index.search(terms)
+    if not scores:
+        return []
+
+    if sort != "relevance":
+        return await get_posts_data(
+            sort=sort, limit=limit, offset=offset, post_ids=[], db=db,
+            where=Post.id.in_(list(scores)), fast=fast,
+        )
+
+    ranked = heapq.nlargest(
+        offset + limit, scores, key=lambda post_id: (scores[post_id], post_id)
+    )
+    return await _hydrate(ranked[offset:], db, fast)
+
+
+async def search_posts_page(
+        q: str,
+        sort: str,
+        limit: int,
+        cursor: str | None,
+        db: AsyncSession,
+        fast: bool = False,
+) -> tuple[list[PostOut] | list[dict], str | None]:
+    """
+    Cursor-paginated variant of search_posts, see get_posts_page.
+    """
+    terms = tokenize(q)[:MAX_TERMS]
+    if not terms:
+        return [], None
+
+    if search_backend() == "postgres":
+        match, rank = _pg_match(terms)
+        return await get_posts_page(
+            sort=sort, limit=limit, cursor=cursor, db=db, where=match, rank=rank, fast=fast,
+        )
+
+    await memory_index.catch_up(db)
+    scores = memory_index.search(terms)
+    if sort != "relevance":
+        if not scores:
+            return [], None
+        return await get_posts_page(
+            sort=sort, limit=limit, cursor=cursor, db=db, where=Post.id.in_(list(scores)), fast=fast,
+        )
+
+    ranked = ((score, post_id) for post_id, score in scores.items())
+    if cursor:
+        after = decode_cursor(cursor)
+        if after.get("sort") != sort:
+            raise ValueError("Cursor does not match sort")
+        try:
+            last = (float(after["key"]), int(after["id"]))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        ranked = (item for item in ranked if item < last)
+
+    page = heapq.nlargest(limit + 1, ranked)
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        score, post_id = page[-1]
+        next_cursor = encode_cursor({"sort": sort, "key": score, "id": post_id})
+    return await _hydrate([post_id for _, post_id in page], db, fast), next_cursor
+
+
+async def _hydrate(post_ids: list[int], db: AsyncSession, fast: bool = False) -> list[PostOut] | list[dict]:
+    if not post_ids:
+        return []
+    posts = await get_posts_data(
+        sort="new", limit=len(post_ids), offset=0, post_ids=post_ids, db=db, fast=fast,
+    )
+    by_id = {post["id"] if fast else post.id: post for post in posts}
+    return [by_id[post_id] for post_id in post_ids if post_id in by_id]
@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+
+from sqlalchemy import select, event
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.metrics import register_cache
+from app.models import User
+from app.utils.cache import TTLCache
+
+
+@dataclass(frozen=True, slots=True)
+class UserPrincipal:
+    """
+    The parts of a user that authenticated handlers need.
+    """
+    id: int
+    username: str
+    is_active: bool
+
+
+principal_cache: TTLCache[int, UserPrincipal] = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+register_cache("principal", principal_cache)
+
+
+async def get_user_principal(db: AsyncSession, user_id: int) -> UserPrincipal | None:
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(
+        select(User.id, User.username, User.is_active).where(User.id == user_id)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    principal = UserPrincipal(id=row.id, username=row.username, is_active=row.is_active)
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, target: User) -> None:
+    # Other workers keep their copy until USER_CACHE_TTL_SECONDS runs out.
+    principal_cache.delete(target.id)
@@ -0,0 +1,280 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+from sqlalchemy import select, update, delete, case, bindparam, func, literal, literal_column, Integer, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import Post, Vote
+from app.services import live, outbox
+from app.services.post import apply_vote
+from app.services.ranking import hot_score_sql
+
+logger = logging.getLogger(__name__)
+
+
+class PostNotFound(LookupError):
+    pass
+
+
+class VoteBuffer:
+    """
+    Coalesces per-post counter deltas in memory and writes them in one
+    batched UPDATE every VOTE_BUFFER_FLUSH_MS, so a viral post takes one
+    row lock per flush instead of one per vote.
+
+    Deltas not yet flushed are lost if the process dies;
+    `python -m app.commands.reconcile_counters` rebuilds them from votes.
+    """
+
+    def __init__(self):
+        # post_id -> [points, upvotes, downvotes]
+        self._pending: dict[int, list[int]] = defaultdict(lambda: [0, 0, 0])
+        self._flush_lock = asyncio.Lock()
+
+    def add(self, post_id: int, points: int, upvotes: int, downvotes: int) -> None:
+        pending = self._pending[post_id]
+        pending[0] += points
+        pending[1] += upvotes
+        pending[2] += downvotes
+
+    def pending_points(self, post_id: int) -> int:
+        pending = self._pending.get(post_id)
+        return pending[0] if pending else 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, defaultdict(lambda: [0, 0, 0])
+
+            # Same lock order in every flush, so concurrent workers can't deadlock.
+            params = [
+                {"b_id": post_id, "b_points": d[0], "b_up": d[1], "b_down": d[2]}
+                for post_id, d in sorted(batch.items())
+                if any(d)
+            ]
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(_apply_buffered_deltas, params)
+                    await db.commit()
+            except Exception:
+                # Put the deltas back for the next attempt.
+                for post_id, d in batch.items():
+                    self.add(post_id, *d)
+                raise
+            return len(params)
+
+
+_posts = Post.__table__
+_apply_buffered_deltas = (
+    update(_posts)
+    .where(_posts.c.id == bindparam("b_id"))
+    .values(
+        points=_posts.c.points + bindparam("b_points"),
+        upvotes=_posts.c.upvotes + bindparam("b_up"),
+        downvotes=_posts.c.downvotes + bindparam("b_down"),
+        hot_score=hot_score_sql(_posts.c.points + bindparam("b_points"), _posts.c.created_at),
+    )
+)
+
+vote_buffer = VoteBuffer()
+
+
+async def run_vote_buffer_flusher() -> None:
+    try:
+        while True:
+            await asyncio.sleep(settings.VOTE_BUFFER_FLUSH_MS / 1000)
+            try:
+                await vote_buffer.flush()
+            except Exception:
+                logger.exception("vote buffer flush failed")
+    finally:
+        await vote_buffer.flush()
+
+
+async def cast_vote(db: AsyncSession, user_id: int, post_id: int, value: int) -> tuple[int, bool]:
+    """
+    Records `user_id`'s vote (1, -1, or 0 to remove it) and moves the post's
+    counters by the difference. Returns the post's points and whether
+    anything changed. Raises PostNotFound.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return await _cast_vote_orm(db, user_id, post_id, value)
+
+    # `change` is None when the vote was already `value`. When buffering it
+    # is the (points, upvotes, downvotes) delta left for the buffer to write.
+    buffered = settings.VOTE_BUFFER_ENABLED
+    try:
+        if value == 0:
+            points, change = await _remove_vote(db, user_id, post_id, buffered)
+        else:
+            points, change = await _upsert_vote(db, user_id, post_id, value, buffered)
+    except IntegrityError:
+        # votes.post_id foreign key: the post does not exist.
+        await db.rollback()
+        raise PostNotFound(post_id)
+    if buffered and points is not None and change is not None and settings.OUTBOX_ENABLED:
+        # The points the caller gets back below, once the commit is done.
+        # (Unbuffered, the counter UPDATE queued the event itself.)
+        expected = points + change[0] + vote_buffer.pending_points(post_id)
+        live.queue_post_changed(db, post_id, points=expected)
+    await db.commit()
+
+    if points is None:
+        raise PostNotFound(post_id)
+    if buffered:
+        if change is not None:
+            vote_buffer.add(post_id, *change)
+        points += vote_buffer.pending_points(post_id)
+    return points, change is not None
+
+
+def _vote_delta(old_value: int, new_value: int) -> tuple[int, int, int]:
+    return (
+        new_value - old_value,
+        (new_value == 1) - (old_value == 1),
+        (new_value == -1) - (old_value == -1),
+    )
+
+
+def _counter_values(points, upvotes, downvotes) -> dict:
+    return {
+        "points": Post.points + points,
+        "upvotes": Post.upvotes + upvotes,
+        "downvotes": Post.downvotes + downvotes,
+        "hot_score": hot_score_sql(Post.points + points),
+    }
+
+
+async def _bump_counters(db, post_id, changed, delta):
+    # Returns the new points, or None when `changed` is false. With the
+    # outbox on, the live event is inserted by the same statement, so
+    # queueing it costs the vote no extra round trip.
+    bump = (
+        update(Post)
+        .where(Post.id == post_id, changed)
+        .values(**_counter_values(*delta))
+        .returning(Post.points)
+    )
+    if not settings.OUTBOX_ENABLED:
+        result = await db.execute(bump.execution_options(synchronize_session=False))
+        return result.scalar_one_or_none()
+
+    bumped = bump.cte("bumped")
+    payload = func.json_build_object(
+        literal("post_id", String), literal(post_id, Integer),
+        literal("points", String), bumped.c.points,
+    )
+    queued = outbox.enqueue_from(bumped, live.POST_CHANGED, payload, key=live.post_topic(post_id))
+    result = await db.execute(select(bumped.c.points).add_cte(queued.cte("queued")))
+    return result.scalar_one_or_none()
+
+
+async def _upsert_vote(db, user_id, post_id, value, buffered):
+    # The conditional DO UPDATE only fires when the vote flips, so the old
+    # value is 0 for a fresh insert and -value for an update.
+    upsert = pg_insert(Vote).values(user_id=user_id, post_id=post_id, value=value)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[Vote.user_id, Vote.post_id],
+        set_={"value": upsert.excluded.value},
+        where=Vote.value != upsert.excluded.value,
+    ).returning(literal_column("xmax = 0").label("inserted"))
+    changed = upsert.cte("changed")
+
+    inserted_delta = _vote_delta(0, value)
+    flipped_delta = _vote_delta(-value, value)
+    delta = [
+        case((changed.c.inserted, ins), else_=flip)
+        for ins, flip in zip(inserted_delta, flipped_delta)
+    ]
+
+    if buffered:
+        result = await db.execute(
+            select(Post.points, changed.c.inserted)
+            .outerjoin(changed, literal_column("true"))
+            .where(Post.id == post_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None, None
+        if row.inserted is None:
+            return row.points, None
+        return row.points, inserted_delta if row.inserted else flipped_delta
+
+    points = await _bump_counters(db, post_id, changed.c.inserted.is_not(None), delta)
+    if points is not None:
+        return points, True
+
+    # Same vote as before: nothing changed.
+    result = await db.execute(select(Post.points).where(Post.id == post_id))
+    return result.scalar_one_or_none(), None
+
+
+async def _remove_vote(db, user_id, post_id, buffered):
+    removed = (
+        delete(Vote)
+        .where(Vote.user_id == user_id, Vote.post_id == post_id)
+        .returning(Vote.value)
+        .cte("removed")
+    )
+    old = removed.c.value
+    delta = (-old, -case((old == 1, 1), else_=0), -case((old == -1, 1), else_=0))
+
+    if buffered:
+        result = await db.execute(
+            select(Post.points, old)
+            .outerjoin(removed, literal_column("true"))
+            .where(Post.id == post_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None, None
+        if row.value is None:
+            return row.points, None
+        return row.points, _vote_delta(row.value, 0)
+
+    points = await _bump_counters(db, post_id, old.is_not(None), delta)
+    if points is not None:
+        return points, True
+
+    result = await db.execute(select(Post.points).where(Post.id == post_id))
+    return result.scalar_one_or_none(), None
+
+
+async def _cast_vote_orm(db, user_id, post_id, value):
+    # Read-modify-write fallback for databases without data-modifying CTEs
+    # (SQLite in tests). Not safe under concurrent votes on one post.
+    post = await db.get(Post, post_id)
+    if not post:
+        raise PostNotFound(post_id)
+
+    result = await db.execute(
+        select(Vote).where(
+            Vote.user_id == user_id,
+            Vote.post_id == post_id,
+        )
+    )
+    vote = result.scalar_one_or_none()
+    old_value = vote.value if vote else 0
+    if old_value == value:
+        # idempotent: same vote again
+        return post.points, False
+
+    apply_vote(post, old_value, value)
+    if value == 0:
+        await db.delete(vote)
+    elif vote:
+        vote.value = value
+    else:
+        db.add(Vote(user_id=user_id, post_id=post_id, value=value))
+    if settings.OUTBOX_ENABLED:
+        live.queue_post_changed(db, post_id, points=post.points)
+    await db.commit()
+    return post.points, True
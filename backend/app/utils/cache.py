@@ -0,0 +1,214 @@
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Generic, Hashable, Iterable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Per-process LRU cache whose entries also expire after `ttl_seconds`.
+    Not shared between workers, so keep the TTL short for anything that
+    another process can change.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class _Entry(Generic[V]):
+    __slots__ = ("value", "tags", "fresh_until", "stale_until")
+
+    def __init__(self, value: V, tags: frozenset, fresh_until: float, stale_until: float):
+        self.value = value
+        self.tags = tags
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class StaleWhileRevalidateCache(Generic[K, V]):
+    """
+    LRU cache for values that are expensive to build (e.g. serialized pages).
+
+    An entry is fresh for `ttl_seconds`, then served stale for another
+    `stale_seconds` while a single background task rebuilds it. On a miss,
+    concurrent callers for the same key share one computation. Entries carry
+    tags so writers can mark every entry that mentions something as stale.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, stale_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._data: OrderedDict[K, _Entry[V]] = OrderedDict()
+        self._inflight: dict[K, asyncio.Future] = {}
+        self._refreshing: set[asyncio.Task] = set()
+        # Bumped on every invalidation; results computed across one are
+        # stored already stale.
+        self._generation = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_compute(
+        self,
+        key: K,
+        compute: Callable[[], Awaitable[tuple[V, Iterable]]],
+    ) -> V:
+        """
+        `compute` returns the value and the tags to file it under.
+        """
+        now = time.monotonic()
+        entry = self._data.get(key)
+        if entry is not None and now < entry.stale_until:
+            self._data.move_to_end(key)
+            if now < entry.fresh_until:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self._start_refresh(key, compute)
+            return entry.value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The computing caller went away; take over.
+                return await self.get_or_compute(key, compute)
+
+        self.misses += 1
+        return await self._compute(key, compute)
+
+    def _claim(self, key: K) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    async def _compute(self, key: K, compute, future: asyncio.Future | None = None) -> V:
+        if future is None:
+            future = self._claim(key)
+        generation = self._generation
+        try:
+            value, tags = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise it; don't warn when nobody was waiting.
+            future.exception()
+            raise
+        else:
+            self._store(key, value, frozenset(tags), stale=generation != self._generation)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _start_refresh(self, key: K, compute) -> None:
+        # Claimed now, not when the task first runs, so stale hits in between
+        # don't start refreshes of their own.
+        task = asyncio.create_task(self._compute(key, compute, self._claim(key)))
+        self._refreshing.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refreshing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # Keep serving the stale copy; the next request retries.
+            logger.warning("cache refresh failed", exc_info=task.exception())
+
+    def _store(self, key: K, value: V, tags: frozenset, stale: bool) -> None:
+        now = time.monotonic()
+        fresh_until = now if stale else now + self.ttl_seconds
+        self._data[key] = _Entry(value, tags, fresh_until, now + self.ttl_seconds + self.stale_seconds)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def mark_stale(self, tag=None) -> None:
+        """
+        Marks entries tagged with `tag` (or every entry if None) as stale, so
+        the next read serves them once more and triggers a rebuild.
+        """
+        self._generation += 1
+        for entry in self._data.values():
+            if tag is None or tag in entry.tags:
+                entry.fresh_until = 0
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": (self.hits + self.stale_hits + self.coalesced) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,48 @@
+import json
+from datetime import datetime, timedelta
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Output matches what FastAPI sends for a pydantic response_model: compact
+# separators, UTF-8 rather than \u escapes, and pydantic's datetime format
+# (ISO 8601, "Z" for UTC).
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        if value.utcoffset() == timedelta(0):
+            text = text[:-6] + "Z"
+        return text
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(
+    ensure_ascii=False,
+    allow_nan=False,
+    separators=(",", ":"),
+    default=_default,
+)
+
+
+def dumps(value) -> bytes:
+    """
+    Plain dicts/lists/str/int/datetime to JSON bytes. Uses orjson when it is
+    installed, otherwise the standard library; both give the same bytes.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_UTC_Z)
+    return _encoder.encode(value).encode("utf-8")
+
+
+def json_response(content, headers: dict | None = None) -> Response:
+    """
+    Response with `dumps(content)`, skipping FastAPI's response_model
+    validation; `content` must already have the documented shape.
+    """
+    return Response(content=dumps(content), media_type="application/json", headers=headers)
@@ -0,0 +1,42 @@
+import hashlib
+
+from fastapi import Request, Response
+from app.core.config import settings
+
+
+def make_etag(*parts) -> str:
+    """
+    Strong ETag from a version stamp plus whatever else picks the
+    representation (sort, page, ...). The body is never hashed.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison: W/"x" matches "x".
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def cache_control() -> str:
+    directives = ["public", f"max-age={settings.HTTP_CACHE_MAX_AGE_SECONDS}"]
+    if settings.HTTP_CACHE_SHARED_MAX_AGE_SECONDS:
+        directives.append(f"s-maxage={settings.HTTP_CACHE_SHARED_MAX_AGE_SECONDS}")
+    if settings.HTTP_CACHE_STALE_WHILE_REVALIDATE_SECONDS:
+        directives.append(f"stale-while-revalidate={settings.HTTP_CACHE_STALE_WHILE_REVALIDATE_SECONDS}")
+    return ", ".join(directives)
+
+
+def set_cache_headers(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control()
+    return response
+
+
+def not_modified(etag: str) -> Response:
+    return set_cache_headers(Response(status_code=304), etag)
@@ -0,0 +1,266 @@
+import json
+import time
+import asyncio
+import logging
+from typing import Callable
+
+from app.utils import fast_json
+
+logger = logging.getLogger(__name__)
+
+# (topic, key, event)
+Batch = list[tuple[str, str, dict]]
+
+
+class LiveTransport:
+    """
+    Carries published events between workers. `send` ships a batch from
+    this worker; every worker's broker, this one included, receives it
+    through the `deliver` callback passed to `start`.
+    """
+
+    async def start(self, deliver: Callable[[Batch], None]) -> None:
+        self._deliver = deliver
+
+    async def send(self, batch: Batch) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalTransport(LiveTransport):
+    """
+    One process: batches go straight back to this worker's broker, so
+    clients only see events published by the worker they are connected to.
+    """
+
+    async def send(self, batch: Batch) -> None:
+        self._deliver(batch)
+
+
+class RedisTransport(LiveTransport):
+    """
+    Redis pub/sub on one channel, shared by every worker that talks to the
+    same server. Works with any client exposing the `redis.asyncio`
+    interface (e.g. `fakeredis.aioredis.FakeRedis`).
+
+    A lost subscription is logged and re-established with exponential
+    backoff (`reconnect_base_seconds`, doubling up to
+    `reconnect_max_seconds`). Batches published while it is down don't
+    reach this worker; its clients catch up over HTTP.
+    """
+
+    channel = "live"
+
+    def __init__(
+        self,
+        client=None,
+        url: str | None = None,
+        reconnect_base_seconds: float = 0.5,
+        reconnect_max_seconds: float = 30.0,
+    ):
+        if client is None:
+            try:
+                from redis import asyncio as redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "RedisTransport requires the 'redis' package"
+                ) from e
+            client = redis.from_url(url)
+        self._client = client
+        self._pubsub = None
+        self._listener: asyncio.Task | None = None
+        self.reconnect_base_seconds = reconnect_base_seconds
+        self.reconnect_max_seconds = reconnect_max_seconds
+        self.reconnects = 0
+
+    async def start(self, deliver: Callable[[Batch], None]) -> None:
+        await super().start(deliver)
+        self._pubsub = await self._subscribe()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def _subscribe(self):
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(self.channel)
+        return pubsub
+
+    async def _unsubscribe(self) -> None:
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    async def _listen(self) -> None:
+        delay = self.reconnect_base_seconds
+        while True:
+            try:
+                if self._pubsub is None:
+                    self._pubsub = await self._subscribe()
+                    self.reconnects += 1
+                    logger.info("live transport resubscribed to %r", self.channel)
+                async for message in self._pubsub.listen():
+                    delay = self.reconnect_base_seconds
+                    self._handle(message)
+                # listen() only returns once nothing is subscribed.
+                logger.warning("live transport subscription ended; resubscribing in %.1fs", delay)
+            except Exception:
+                logger.exception("live transport subscription failed; resubscribing in %.1fs", delay)
+            await self._unsubscribe()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.reconnect_max_seconds)
+
+    def _handle(self, message: dict) -> None:
+        if message["type"] != "message":
+            return
+        try:
+            batch = [tuple(item) for item in json.loads(message["data"])]
+        except (ValueError, TypeError):
+            logger.warning("dropped malformed live batch")
+            return
+        self._deliver(batch)
+
+    async def send(self, batch: Batch) -> None:
+        await self._client.publish(self.channel, fast_json.dumps(batch))
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+        await self._unsubscribe()
+        await self._client.aclose()
+
+
+class Subscriber:
+    """
+    One connection's topics and its bounded queue of encoded messages.
+    A consumer that falls `max_queue` messages behind is dropped instead of
+    buffered without bound: `get` then returns None and the connection
+    should close so the client reloads over HTTP.
+    """
+    __slots__ = ("topics", "queue", "dropped")
+
+    def __init__(self, max_queue: int):
+        self.topics: set[str] = set()
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(max_queue)
+        self.dropped = False
+
+    async def get(self) -> str | None:
+        if self.dropped:
+            return None
+        return await self.queue.get()
+
+    def _drop(self) -> None:
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class LiveBroker:
+    """
+    Fan-out of live events to subscribed connections.
+
+    `publish` only records the event; every `interval_ms` the broker ships
+    what was published through the transport, then sends each topic's
+    events to its subscribers as one message, encoded once. Events with
+    the same key merge in between (later fields win), so a post voted on a
+    hundred times in one interval costs one update per subscriber.
+    """
+
+    def __init__(self, transport: LiveTransport, interval_ms: int = 250, max_queue: int = 64):
+        self.transport = transport
+        self.interval = interval_ms / 1000
+        self.max_queue = max_queue
+        self.running = False
+        self._outbound: dict[tuple[str, str], dict] = {}
+        self._pending: dict[str, dict[str, dict]] = {}
+        self._subscribers: dict[str, set[Subscriber]] = {}
+        self.published = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def publish(self, topic: str, key: str, event: dict) -> None:
+        """
+        `event` must be JSON-ready. A no-op until the broker is running.
+        """
+        if not self.running:
+            return
+        previous = self._outbound.get((topic, key))
+        self._outbound[(topic, key)] = {**previous, **event} if previous else event
+        self.published += 1
+
+    def subscriber(self) -> Subscriber:
+        return Subscriber(self.max_queue)
+
+    def subscribe(self, subscriber: Subscriber, topic: str) -> None:
+        subscriber.topics.add(topic)
+        self._subscribers.setdefault(topic, set()).add(subscriber)
+
+    def unsubscribe(self, subscriber: Subscriber, topic: str | None = None) -> None:
+        """
+        From one topic, or from all of them.
+        """
+        for name in [topic] if topic is not None else list(subscriber.topics):
+            subscriber.topics.discard(name)
+            subscribers = self._subscribers.get(name)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[name]
+
+    def _receive(self, batch: Batch) -> None:
+        for topic, key, event in batch:
+            if topic not in self._subscribers:
+                continue
+            pending = self._pending.setdefault(topic, {})
+            previous = pending.get(key)
+            pending[key] = {**previous, **event} if previous else event
+
+    def fan_out(self) -> None:
+        pending, self._pending = self._pending, {}
+        for topic, events in pending.items():
+            subscribers = self._subscribers.get(topic)
+            if not subscribers:
+                continue
+            message = fast_json.dumps({"topic": topic, "events": list(events.values())}).decode()
+            for subscriber in list(subscribers):
+                try:
+                    subscriber.queue.put_nowait(message)
+                    self.sent += 1
+                except asyncio.QueueFull:
+                    self.unsubscribe(subscriber)
+                    subscriber._drop()
+                    self.dropped += 1
+
+    async def flush(self) -> None:
+        if self._outbound:
+            batch = [(topic, key, event) for (topic, key), event in self._outbound.items()]
+            self._outbound = {}
+            try:
+                await self.transport.send(batch)
+            except Exception:
+                logger.exception("live transport send failed; %d events lost", len(batch))
+        self.fan_out()
+
+    async def run(self) -> None:
+        await self.transport.start(self._receive)
+        self.running = True
+        try:
+            while True:
+                started = time.monotonic()
+                await self.flush()
+                await asyncio.sleep(max(self.interval - (time.monotonic() - started), 0))
+        finally:
+            self.running = False
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len({s for subs in self._subscribers.values() for s in subs}),
+            "topics": len(self._subscribers),
+            "published": self.published,
+            "sent": self.sent,
+            "dropped": self.dropped,
+        }
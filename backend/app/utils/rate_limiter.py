@@ -1,13 +1,300 @@
 import time
+import uuid
 import asyncio
-from collections import defaultdict, deque
+import sqlite3
+import threading
+from collections import OrderedDict, deque
 from fastapi import HTTPException, status
 
 
+class RateLimiterBackend:
+    """
+    Storage for rate limit state.
+
+    `hit` records an event for `key` if it fits in the window and returns 0,
+    otherwise it records nothing and returns the seconds until a slot frees up.
+    """
+
+    async def hit(self, key: str, limit: int, window_seconds: int) -> float:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class InMemoryBackend(RateLimiterBackend):
+    """
+    Per-process exact sliding log (one timestamp per event). Each check runs
+    without awaiting, so it is atomic on the event loop and needs no lock.
+
+    Keys are kept in least-recently-used order; idle keys whose window has
+    passed are evicted as new hits come in, and `max_keys` caps the total.
+    Subclasses swap the per-key state for a fixed-size approximation.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, object] = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window_seconds: int) -> float:
+        now = time.monotonic()
+
+        state = self._buckets.get(key)
+        if state is None:
+            state = self._new_state(now, window_seconds)
+            self._buckets[key] = state
+        else:
+            self._buckets.move_to_end(key)
+
+        retry_after = self._take(state, now, limit, window_seconds)
+        if retry_after == 0:
+            self._evict(now)
+        return retry_after
+
+    def _new_state(self, now: float, window_seconds: int):
+        return _LogState(window_seconds)
+
+    def _take(self, state, now: float, limit: int, window_seconds: int) -> float:
+        q = state.events
+        while q and q[0] <= now - window_seconds:
+            q.popleft()
+
+        if len(q) >= limit:
+            return q[0] + window_seconds - now
+
+        q.append(now)
+        return 0
+
+    def _is_idle(self, state, now: float) -> bool:
+        return not state.events or state.events[-1] <= now - state.window
+
+    def _evict(self, now: float) -> None:
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        # The oldest-touched key is the first to go idle.
+        while self._buckets:
+            key, state = next(iter(self._buckets.items()))
+            if not self._is_idle(state, now):
+                break
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class _LogState:
+    __slots__ = ("events", "window")
+
+    def __init__(self, window: int):
+        self.events: deque[float] = deque()
+        self.window = window
+
+
+class SlidingWindowCounterBackend(InMemoryBackend):
+    """
+    Approximate sliding window: counts for the current and previous fixed
+    windows, with the previous one weighted by how much of it still overlaps
+    the sliding window. O(1) memory and time per key.
+    """
+
+    def _new_state(self, now: float, window_seconds: int):
+        return _CounterState(now - now % window_seconds, window_seconds)
+
+    def _take(self, state, now: float, limit: int, window_seconds: int) -> float:
+        start = now - now % window_seconds
+        if start != state.start:
+            elapsed_windows = (start - state.start) / window_seconds
+            state.previous = state.current if elapsed_windows < 1.5 else 0
+            state.current = 0
+            state.start = start
+
+        into = now - start
+        previous_weight = (window_seconds - into) / window_seconds
+        if state.previous * previous_weight + state.current >= limit:
+            if state.previous and state.current < limit:
+                # When enough of the previous window will have slid out.
+                needed = 1 - (limit - state.current) / state.previous
+                return max(needed * window_seconds - into, 0.001)
+            return window_seconds - into
+
+        state.current += 1
+        return 0
+
+    def _is_idle(self, state, now: float) -> bool:
+        return now >= state.start + 2 * state.window
+
+
+class _CounterState:
+    __slots__ = ("start", "window", "previous", "current")
+
+    def __init__(self, start: float, window: int):
+        self.start = start
+        self.window = window
+        self.previous = 0
+        self.current = 0
+
+
+class GCRABackend(InMemoryBackend):
+    """
+    Generic cell rate algorithm (a token bucket stored as a single
+    "theoretical arrival time"). Allows bursts of up to `limit` and refills
+    one slot every `window_seconds / limit`. O(1) memory and time per key.
+    """
+
+    def _new_state(self, now: float, window_seconds: int):
+        return _GCRAState(now)
+
+    def _take(self, state, now: float, limit: int, window_seconds: int) -> float:
+        interval = window_seconds / limit
+        tat = max(state.tat, now) + interval
+        allow_at = tat - window_seconds
+        if now < allow_at:
+            return allow_at - now
+
+        state.tat = tat
+        return 0
+
+    def _is_idle(self, state, now: float) -> bool:
+        return state.tat <= now
+
+
+class _GCRAState:
+    __slots__ = ("tat",)
+
+    def __init__(self, tat: float):
+        self.tat = tat
+
+
+class SQLiteBackend(RateLimiterBackend):
+    """
+    Sliding log in a SQLite file, shared by every worker on the host.
+    `BEGIN IMMEDIATE` serializes the check-and-insert across processes.
+    """
+
+    # Run the expired-row sweep once every this many hits.
+    sweep_every = 1000
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(
+            path,
+            timeout=5,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._lock = threading.Lock()
+        self._hits = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_events ("
+                "key TEXT NOT NULL, ts REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_rate_limit_events_key_ts "
+                "ON rate_limit_events (key, ts)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_rate_limit_events_expires_at "
+                "ON rate_limit_events (expires_at)"
+            )
+
+    async def hit(self, key: str, limit: int, window_seconds: int) -> float:
+        return await asyncio.to_thread(self._hit, key, limit, window_seconds)
+
+    def _hit(self, key: str, limit: int, window_seconds: int) -> float:
+        # Wall clock, since several processes compare timestamps.
+        now = time.time()
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.execute(
+                    "DELETE FROM rate_limit_events WHERE key = ? AND ts <= ?",
+                    (key, now - window_seconds),
+                )
+                count, oldest = cur.execute(
+                    "SELECT COUNT(*), MIN(ts) FROM rate_limit_events WHERE key = ?",
+                    (key,),
+                ).fetchone()
+
+                if count >= limit:
+                    retry_after = oldest + window_seconds - now
+                else:
+                    cur.execute(
+                        "INSERT INTO rate_limit_events (key, ts, expires_at) "
+                        "VALUES (?, ?, ?)",
+                        (key, now, now + window_seconds),
+                    )
+                    retry_after = 0
+
+                self._hits += 1
+                if self._hits % self.sweep_every == 0:
+                    cur.execute(
+                        "DELETE FROM rate_limit_events WHERE expires_at <= ?",
+                        (now,),
+                    )
+                cur.execute("COMMIT")
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+        return retry_after
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisBackend(RateLimiterBackend):
+    """
+    Sliding log in a Redis sorted set per key, shared by every worker that
+    talks to the same server. Works with any client exposing the
+    `redis.asyncio` interface (e.g. `fakeredis.aioredis.FakeRedis`).
+
+    Each key carries a TTL of one window, so idle keys expire on their own.
+    """
+
+    prefix = "ratelimit:"
+
+    def __init__(self, client=None, url: str | None = None):
+        if client is None:
+            try:
+                from redis import asyncio as redis
+            except ImportError as e:
+                raise RuntimeError(
+                    "RedisBackend requires the 'redis' package"
+                ) from e
+            client = redis.from_url(url)
+        self._client = client
+
+    async def hit(self, key: str, limit: int, window_seconds: int) -> float:
+        now = time.time()
+        rkey = self.prefix + key
+        member = f"{now}:{uuid.uuid4().hex}"
+
+        # Add optimistically and roll back if that overflowed the window;
+        # MULTI keeps the trim/add/count atomic.
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.zremrangebyscore(rkey, "-inf", now - window_seconds)
+            pipe.zadd(rkey, {member: now})
+            pipe.zcard(rkey)
+            pipe.zrange(rkey, 0, 0, withscores=True)
+            pipe.expire(rkey, int(window_seconds) + 1)
+            _, _, count, oldest, _ = await pipe.execute()
+
+        if count > limit:
+            await self._client.zrem(rkey, member)
+            return oldest[0][1] + window_seconds - now
+        return 0
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
 class SlidingWindowRateLimiter:
-    def __init__(self):
-        self._events: dict[str, deque[float]] = defaultdict(deque)
-        self._lock = asyncio.Lock()
+    def __init__(self, backend: RateLimiterBackend | None = None):
+        self.backend = backend or InMemoryBackend()
 
     async def allow(
         self,
@@ -18,22 +305,13 @@ class SlidingWindowRateLimiter:
         """
         Raises HTTPException if rate limit exceeded.
         """
-        now = time.time()
-
-        async with self._lock:
-            q = self._events[key]
-            
-            while q and q[0] <= now - window_seconds:
-                q.popleft()
-
-            if len(q) >= limit:
-                retry_after = int(q[0] + window_seconds - now)
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Rate limit exceeded",
-                    headers={
-                        "Retry-After": str(max(retry_after, 1))
-                    },
-                )
+        retry_after = await self.backend.hit(key, limit, window_seconds)
 
-            q.append(now)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={
+                    "Retry-After": str(max(int(retry_after), 1))
+                },
+            )
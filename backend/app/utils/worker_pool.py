@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class PoolSaturated(RuntimeError):
+    """
+    Raised by BoundedWorkerPool.run when `max_pending` jobs are already
+    running or queued.
+    """
+
+
+class BoundedWorkerPool:
+    """
+    Thread pool for blocking CPU work (e.g. bcrypt) that keeps it off the
+    event loop. At most `max_workers` jobs run at once; once `max_pending`
+    jobs are running or queued, new ones are shed with PoolSaturated
+    instead of piling up behind them.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_pending: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=name,
+        )
+        self._running_lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PoolSaturated(f"{self.name} pool is saturated")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._call, func, args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def _call(self, func: Callable[..., T], args: tuple) -> T:
+        with self._running_lock:
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._running_lock:
+                self.running -= 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "running": self.running,
+            "queued": max(self.pending - self.running, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
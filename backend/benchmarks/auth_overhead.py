@@ -0,0 +1,72 @@
+"""
+Per-request cost of authenticating a bearer token, with and without the
+verified-token cache (TOKEN_CACHE_ENABLED).
+
+Times the token step of get_current_user / get_current_principal
+(get_token_user_id), and get_current_principal end to end with the
+principal cache warm, so neither touches the database. --tokens distinct
+tokens are used round-robin, like that many users clicking around.
+
+    SECRET_KEY=x python -m benchmarks.auth_overhead [--tokens 1000]
+"""
+import argparse
+import asyncio
+import time
+
+from starlette.requests import Request
+
+from app.api.deps import get_current_principal, get_token_user_id
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.security import create_access_token, token_cache
+from app.services.user import UserPrincipal, principal_cache
+
+
+def token_step(tokens: list[str], iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        get_token_user_id(tokens[i % len(tokens)])
+    return (time.perf_counter() - started) / iterations
+
+
+async def principal_step(tokens: list[str], iterations: int) -> float:
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        for i in range(iterations):
+            await get_current_principal(request, get_token_user_id(tokens[i % len(tokens)]), db)
+        return (time.perf_counter() - started) / iterations
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=1000, help="distinct users")
+    parser.add_argument("--iterations", type=int, default=50_000)
+    args = parser.parse_args()
+
+    tokens = [create_access_token(str(user_id)) for user_id in range(1, args.tokens + 1)]
+    for user_id in range(1, args.tokens + 1):
+        principal_cache.set(user_id, UserPrincipal(id=user_id, username=f"user{user_id}", is_active=True))
+
+    print(f"{args.tokens:,} tokens, {args.iterations:,} requests each")
+    print(f"{'':<24}{'token only':>14}{'principal':>14}")
+    results = {}
+    for enabled in (False, True):
+        settings.TOKEN_CACHE_ENABLED = enabled
+        token_cache.clear()
+        # One pass so the cached run measures hits, not the first misses.
+        token_step(tokens, len(tokens))
+        principal_cache_hits = principal_cache.hits
+        results[enabled] = (token_step(tokens, args.iterations), await principal_step(tokens, args.iterations))
+        assert principal_cache.hits > principal_cache_hits
+        label = "token cache on" if enabled else "token cache off"
+        print(f"{label:<24}" + "".join(f"{seconds * 1e6:>11.1f} µs" for seconds in results[enabled]))
+
+    off, on = results[False][0], results[True][0]
+    print(f"token step {off / on:.0f}x faster with the cache; "
+          f"hits {token_cache.hits:,}, misses {token_cache.misses:,}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
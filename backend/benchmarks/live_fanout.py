@@ -0,0 +1,125 @@
+"""
+Fan-out cost of the live update broker with many concurrent subscribers,
+in-process and without sockets (the broker is what the /live endpoints
+share; each connection adds its own socket writes on top).
+
+--subscribers connections are split between the front page and
+--posts post topics; a publisher sends --rate vote events per second,
+spread over those posts with a Zipf skew, for --duration seconds.
+Every subscriber drains its queue; --slow of them never read, to show
+them being dropped once --queue-size messages have piled up (after
+queue-size x flush-ms, 16 s with the defaults).
+
+    python -m benchmarks.live_fanout --subscribers 10000 --rate 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import resource
+import time
+
+from app.utils.live import LiveBroker, LocalTransport
+
+# Share of subscribers watching the front page; the rest watch one post.
+FRONT_PAGE_SHARE = 0.8
+# Subscribers that decode messages to measure latency (the rest only drain).
+SAMPLED = 200
+
+
+def percentile(ordered: list[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * p), len(ordered) - 1)]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--rate", type=int, default=2000, help="events published per second")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--flush-ms", type=int, default=250)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--slow", type=int, default=10, help="subscribers that never read")
+    args = parser.parse_args()
+
+    broker = LiveBroker(LocalTransport(), interval_ms=args.flush_ms, max_queue=args.queue_size)
+    flush_times: list[float] = []
+    flush = broker.flush
+
+    async def timed_flush():
+        started = time.perf_counter()
+        await flush()
+        flush_times.append(time.perf_counter() - started)
+
+    broker.flush = timed_flush
+    runner = asyncio.create_task(broker.run())
+    await asyncio.sleep(0)
+
+    rng = random.Random(1)
+    latencies: list[float] = []
+    received = 0
+
+    async def consume(subscriber, sampled: bool):
+        nonlocal received
+        while (message := await subscriber.get()) is not None:
+            received += 1
+            if sampled:
+                now = time.perf_counter()
+                for event in json.loads(message)["events"]:
+                    latencies.append(now - event["sent"])
+
+    consumers = []
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for i in range(args.subscribers):
+        subscriber = broker.subscriber()
+        if rng.random() < FRONT_PAGE_SHARE:
+            broker.subscribe(subscriber, "front_page")
+        else:
+            broker.subscribe(subscriber, f"post:{rng.randint(1, args.posts)}")
+        if i >= args.slow:
+            consumers.append(asyncio.create_task(consume(subscriber, i < args.slow + SAMPLED)))
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    weights = [1 / rank ** 1.1 for rank in range(1, args.posts + 1)]
+    posts = list(range(1, args.posts + 1))
+    published = 0
+    cpu_start = time.process_time()
+    started = time.perf_counter()
+    while (now := time.perf_counter() - started) < args.duration:
+        # Catch up to the target rate, however long the last sleep took.
+        n = int(args.rate * now) - published
+        for post_id in rng.choices(posts, weights, k=max(n, 0)):
+            event = {"type": "post", "post_id": post_id, "points": published, "sent": time.perf_counter()}
+            broker.publish("front_page", f"post:{post_id}", event)
+            broker.publish(f"post:{post_id}", f"post:{post_id}", event)
+            published += 1
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(args.flush_ms / 1000 * 2)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_start
+
+    runner.cancel()
+    for task in consumers:
+        task.cancel()
+    await asyncio.gather(runner, *consumers, return_exceptions=True)
+
+    stats = broker.stats()
+    flush_times.sort()
+    latencies.sort()
+    print(f"subscribers       {args.subscribers:,} ({args.slow} slow), "
+          f"~{(rss_after - rss_before) * 1024 / max(args.subscribers, 1):,.0f} bytes each")
+    print(f"events published  {published:,} ({published / elapsed:,.0f}/s)")
+    print(f"messages received {received:,} ({received / elapsed:,.0f}/s), "
+          f"{stats['sent'] / max(published, 1):.1f} per event after merging")
+    print(f"slow dropped      {stats['dropped']}")
+    print(f"flush             p50 {percentile(flush_times, 0.5) * 1000:.1f} ms, "
+          f"p99 {percentile(flush_times, 0.99) * 1000:.1f} ms, max {flush_times[-1] * 1000 if flush_times else 0:.1f} ms")
+    print(f"delivery latency  p50 {percentile(latencies, 0.5) * 1000:.0f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.0f} ms (includes up to {args.flush_ms} ms of merging)")
+    print(f"CPU               {cpu / elapsed:.0%} of one core")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,386 @@
+"""
+Throughput and latency of the API under a realistic request mix.
+
+--seed fills DATABASE_URL with a synthetic Hacker News-shaped dataset:
+users, posts spread over the last --days days, votes drawn from a Zipf
+distribution over posts (a few posts get most of them), and comment
+trees up to --max-depth levels deep. Then a pool of --concurrency
+clients replays a mix of reads and writes against the ASGI app
+in-process (no network) for --duration seconds:
+
+    DATABASE_URL=sqlite+aiosqlite:///load.db SECRET_KEY=x \\
+        python -m benchmarks.load_test --seed --posts 20000 --votes 200000
+
+Prints RPS and p50/p95/p99 per endpoint and writes them, with the commit
+and settings, to benchmarks/results/ (or --output). --compare prints the
+change against an earlier results file. Rate limits are off unless
+--rate-limits is given, since a few hundred users would hit them at once.
+"""
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import httpx
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, Base, engine
+from app.core.limiter import set_rate_limiter
+from app.core.security import create_access_token
+from app.main import app
+from app.models import Comment, Post, User, Vote
+from app.services.post import reconcile_post_counters
+from app.services.ranking import refresh_hot_scores
+from app.utils.rate_limiter import RateLimiterBackend, SlidingWindowRateLimiter
+
+VOCABULARY = [
+    "rust", "python", "postgres", "compiler", "database", "startup", "launch",
+    "kernel", "linux", "browser", "security", "privacy", "design", "hiring",
+    "funding", "open", "source", "release", "performance", "memory", "cache",
+    "network", "protocol", "learning", "model", "science", "space", "energy",
+    "battery", "climate", "economy", "market", "history", "language", "typescript",
+    "framework", "cloud", "server", "mobile", "hardware",
+]
+SEARCH_QUERIES = ["rust", "python compiler", "data", "open source", "perf", "climate energy", "linux kernel"]
+
+# Share of requests per endpoint; reads dominate, as on the real site.
+DEFAULT_MIX = "list=45,list_deep=5,search=12,comments=25,vote=9,comment=4"
+BATCH_SIZE = 5000
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(n))
+
+
+class Zipf:
+    """
+    Draws ranks 0..n-1 with P(k) proportional to 1 / (k + 1) ** s.
+    """
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        weights = [1 / (k + 1) ** s for k in range(n)]
+        self.cumulative = list(itertools.accumulate(weights))
+        self.rng = rng
+
+    def draw(self) -> int:
+        return bisect.bisect_left(self.cumulative, self.rng.random() * self.cumulative[-1])
+
+
+async def insert_batches(model, rows: list[dict], returning: bool = False) -> list[int]:
+    ids = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        async with engine.begin() as conn:
+            if returning:
+                result = await conn.execute(
+                    insert(model).returning(model.id, sort_by_parameter_order=True), batch
+                )
+                ids.extend(result.scalars().all())
+            else:
+                await conn.execute(insert(model), batch)
+    return ids
+
+
+async def seed(args) -> None:
+    rng = random.Random(args.rng_seed)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    tag = f"{args.rng_seed}_{int(time.time())}"
+    user_ids = await insert_batches(User, [
+        {"username": f"load_{tag}_{i}", "email": f"load_{tag}_{i}@example.com",
+         "password_hash": "x", "is_active": True}
+        for i in range(args.users)
+    ], returning=True)
+
+    now = datetime.now(timezone.utc)
+    span = timedelta(days=args.days).total_seconds()
+    post_ids = await insert_batches(Post, [
+        {
+            "title": words(rng, rng.randint(4, 10)),
+            "text": words(rng, rng.randint(10, 60)),
+            "author_id": rng.choice(user_ids),
+            "points": 0,
+            "created_at": now - timedelta(seconds=rng.random() * span),
+        }
+        for _ in range(args.posts)
+    ], returning=True)
+
+    # Popularity rank -> post, shuffled so popular posts have any age.
+    popular = post_ids[:]
+    rng.shuffle(popular)
+    post_zipf = Zipf(len(popular), args.zipf, rng)
+
+    seen = set()
+    votes = []
+    for _ in range(args.votes):
+        key = (rng.choice(user_ids), popular[post_zipf.draw()])
+        if key not in seen:
+            seen.add(key)
+            votes.append({"user_id": key[0], "post_id": key[1], "value": 1 if rng.random() < 0.85 else -1})
+    await insert_batches(Vote, votes)
+
+    # Comment trees: top-level comments follow popularity too; each further
+    # level replies to comments of the level above, thinning out with depth.
+    level = [
+        {"content": words(rng, rng.randint(5, 40)), "author_id": rng.choice(user_ids),
+         "post_id": popular[post_zipf.draw()], "parent_id": None}
+        for _ in range(int(args.comments * (1 - args.reply_ratio)))
+    ]
+    total = 0
+    depth = 1
+    while level and total < args.comments:
+        level = level[:args.comments - total]
+        ids = await insert_batches(Comment, level, returning=True)
+        total += len(ids)
+        if depth >= args.max_depth:
+            break
+        parents = list(zip(ids, (row["post_id"] for row in level)))
+        replies = max(int(len(parents) * args.reply_ratio), 1 if len(parents) else 0)
+        level = []
+        for _ in range(replies):
+            parent_id, post_id = rng.choice(parents)
+            level.append({"content": words(rng, rng.randint(5, 40)), "author_id": rng.choice(user_ids),
+                          "post_id": post_id, "parent_id": parent_id})
+        depth += 1
+
+    async with AsyncSessionLocal() as db:
+        await reconcile_post_counters(db)
+        hours = settings.HOT_REFRESH_MAX_AGE_HOURS
+        settings.HOT_REFRESH_MAX_AGE_HOURS = args.days * 24 + 1
+        try:
+            await refresh_hot_scores(db)
+        finally:
+            settings.HOT_REFRESH_MAX_AGE_HOURS = hours
+
+    print(f"seeded {len(user_ids)} users, {len(post_ids)} posts, {len(votes)} votes, "
+          f"{total} comments ({depth} levels deep)")
+
+
+class Unlimited(RateLimiterBackend):
+    async def hit(self, key: str, limit: int, window_seconds: int) -> float:
+        return 0
+
+
+class Workload:
+    def __init__(self, client: httpx.AsyncClient, user_ids: list[int], post_ids: list[int], rng: random.Random):
+        self.client = client
+        self.rng = rng
+        self.post_ids = post_ids
+        self.popular = Zipf(len(post_ids), 1.1, rng)
+        self.tokens = [
+            {"Authorization": f"Bearer {create_access_token(str(user_id))}"}
+            for user_id in user_ids
+        ]
+
+    def post_id(self) -> int:
+        return self.post_ids[self.popular.draw()]
+
+    def auth(self) -> dict:
+        return self.rng.choice(self.tokens)
+
+    async def list(self):
+        sort = self.rng.choice(["new", "best", "best", "top"])
+        return await self.client.get("/posts/", params={"sort": sort, "limit": 30})
+
+    async def list_deep(self):
+        sort = self.rng.choice(["new", "best"])
+        return await self.client.get(
+            "/posts/", params={"sort": sort, "limit": 30, "offset": self.rng.randint(100, 2000)},
+        )
+
+    async def search(self):
+        return await self.client.get("/posts/search", params={"q": self.rng.choice(SEARCH_QUERIES)})
+
+    async def comments(self):
+        return await self.client.get(f"/comments/posts/{self.post_id()}")
+
+    async def vote(self):
+        return await self.client.post(
+            f"/posts/{self.post_id()}/vote",
+            params={"value": self.rng.choice([1, 1, 1, -1, 0])},
+            headers=self.auth(),
+        )
+
+    async def comment(self):
+        return await self.client.post(
+            f"/comments/posts/{self.post_id()}",
+            json={"content": words(self.rng, 12)},
+            headers=self.auth(),
+        )
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def percentile(ordered: list[float], p: float) -> float:
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+async def run(args) -> dict:
+    if not args.rate_limits:
+        set_rate_limiter(SlidingWindowRateLimiter(Unlimited()))
+
+    async with AsyncSessionLocal() as db:
+        user_ids = (await db.execute(select(User.id).limit(args.clients_users))).scalars().all()
+        post_ids = (await db.execute(
+            select(Post.id).order_by(Post.hot_score.desc()).limit(args.hot_posts)
+        )).scalars().all()
+    if not user_ids or not post_ids:
+        raise SystemExit("database is empty; run with --seed first")
+
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    samples: dict[str, list[float]] = {name: [] for name in names}
+    errors: dict[str, int] = {name: 0 for name in names}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        rng = random.Random(args.rng_seed)
+        workload = Workload(client, user_ids, post_ids, rng)
+        for name in names:
+            if not hasattr(workload, name):
+                raise SystemExit(f"unknown endpoint in --mix: {name}")
+
+        async def worker(deadline: float, record: bool):
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                started = time.perf_counter()
+                response = await getattr(workload, name)()
+                elapsed = (time.perf_counter() - started) * 1000
+                if record:
+                    samples[name].append(elapsed)
+                    if response.status_code >= 400:
+                        errors[name] += 1
+
+        if args.warmup:
+            deadline = time.perf_counter() + args.warmup
+            await asyncio.gather(*(worker(deadline, False) for _ in range(args.concurrency)))
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(worker(deadline, True) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for name in names:
+        ordered = sorted(samples[name])
+        if not ordered:
+            continue
+        endpoints[name] = {
+            "requests": len(ordered),
+            "errors": errors[name],
+            "rps": len(ordered) / elapsed,
+            "p50_ms": percentile(ordered, 50),
+            "p95_ms": percentile(ordered, 95),
+            "p99_ms": percentile(ordered, 99),
+        }
+    total = sum(len(s) for s in samples.values())
+    return {"total_rps": total / elapsed, "duration_s": elapsed, "endpoints": endpoints}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(results: dict, baseline: dict | None) -> None:
+    header = f"{'endpoint':<12}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    for name, e in results["endpoints"].items():
+        print(f"{name:<12}{e['requests']:>10}{e['errors']:>8}{e['rps']:>10.1f}"
+              f"{e['p50_ms']:>10.1f}{e['p95_ms']:>10.1f}{e['p99_ms']:>10.1f}")
+    print(f"{'total':<12}{'':>18}{results['total_rps']:>10.1f}")
+
+    if baseline is None:
+        return
+    print(f"\nchange vs {baseline['commit']} ({baseline['timestamp']}):")
+    for name, e in results["endpoints"].items():
+        old = baseline["endpoints"].get(name)
+        if not old:
+            continue
+        deltas = "".join(
+            f"{key.replace('_ms', '')} {100 * (e[key] - old[key]) / old[key]:+.0f}%  "
+            for key in ("rps", "p50_ms", "p95_ms", "p99_ms")
+            if old[key]
+        )
+        print(f"{name:<12}{deltas}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", action="store_true", help="insert the synthetic dataset first")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--posts", type=int, default=20_000)
+    parser.add_argument("--votes", type=int, default=200_000)
+    parser.add_argument("--comments", type=int, default=100_000)
+    parser.add_argument("--max-depth", type=int, default=15)
+    parser.add_argument("--reply-ratio", type=float, default=0.7,
+                        help="replies per comment at the level above")
+    parser.add_argument("--zipf", type=float, default=1.1, help="vote skew exponent")
+    parser.add_argument("--days", type=int, default=14, help="age span of posts")
+    parser.add_argument("--rng-seed", type=int, default=42)
+
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--clients-users", type=int, default=500, help="distinct users sending writes")
+    parser.add_argument("--hot-posts", type=int, default=2000, help="posts the workload reads and votes on")
+    parser.add_argument("--rate-limits", action="store_true", help="keep the app's rate limits on")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path, help="earlier results file")
+    args = parser.parse_args()
+
+    if args.seed:
+        started = time.perf_counter()
+        await seed(args)
+        print(f"seeding took {time.perf_counter() - started:.1f}s")
+
+    results = await run(args)
+    await engine.dispose()
+
+    results.update(
+        commit=git_commit(),
+        timestamp=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        database=engine.dialect.name,
+        python=platform.python_version(),
+        args={
+            key: str(value) if isinstance(value, Path) else value
+            for key, value in vars(args).items()
+        },
+    )
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(results, baseline)
+
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = results["timestamp"].replace(":", "").replace("-", "")
+        output = RESULTS_DIR / f"{stamp}-{results['commit']}.json"
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nresults written to {output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
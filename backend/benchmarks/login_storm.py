@@ -0,0 +1,106 @@
+"""
+p50/p99 latency of GET /posts/ while logins saturate the bcrypt pool.
+
+Runs the ASGI app in-process against DATABASE_URL (no network). With
+--create-tables the schema is created first, e.g. for a throwaway SQLite
+file:
+
+    DATABASE_URL=sqlite+aiosqlite:///bench.db SECRET_KEY=x \\
+        python -m benchmarks.login_storm --create-tables
+
+--blocking runs bcrypt inline on the event loop (the old behaviour) for
+comparison.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from app.core.database import Base, engine
+from app.core.security import password_pool
+from app.main import app
+
+
+def percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+async def probe(client: httpx.AsyncClient, duration: float) -> list[float]:
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        r = await client.get("/posts/?sort=new")
+        r.raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.005)
+    return samples
+
+
+async def login_loop(client: httpx.AsyncClient, creds: dict, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        await client.post("/auth/login", json=creds)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login loops")
+    parser.add_argument("--create-tables", action="store_true")
+    parser.add_argument("--blocking", action="store_true")
+    args = parser.parse_args()
+
+    if args.create_tables:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    if args.blocking:
+        async def run_inline(func, *a):
+            return func(*a)
+        password_pool.run = run_inline
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        name = f"bench_{uuid.uuid4().hex[:8]}"
+        creds = {"username": name, "password": "benchmark-password"}
+        r = await client.post(
+            "/auth/signup", json={**creds, "email": f"{name}@example.com"}
+        )
+        r.raise_for_status()
+        token = r.json()["access_token"]
+        await client.post(
+            "/posts/",
+            json={"title": "benchmark post", "text": "hello"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        baseline = await probe(client, args.duration)
+
+        stop = asyncio.Event()
+        storm = [
+            asyncio.create_task(login_loop(client, creds, stop))
+            for _ in range(args.logins)
+        ]
+        await asyncio.sleep(0.5)
+        loaded = await probe(client, args.duration)
+        stats = password_pool.stats()
+        stop.set()
+        await asyncio.gather(*storm)
+
+    await engine.dispose()
+    password_pool.shutdown()
+
+    print(f"{'phase':<10}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for phase, samples in (("idle", baseline), ("logins", loaded)):
+        print(
+            f"{phase:<10}{len(samples):>10}{percentile(samples, 50):>10.1f}"
+            f"{percentile(samples, 99):>10.1f}"
+        )
+    print("bcrypt pool during storm:", stats)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+Bytes on the wire per read endpoint: uncompressed, gzip and (when the
+`brotli` package is installed) brotli, with and without `fields=` /
+`truncate_text=`. Runs the ASGI app in-process against DATABASE_URL;
+seed it first with `python -m benchmarks.load_test --seed`.
+
+    python -m benchmarks.payload_size [--limit 30]
+"""
+import argparse
+import asyncio
+
+import httpx
+from sqlalchemy import select
+
+from app.core.compression import brotli
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.main import app
+from app.models import Post
+
+FRONT_PAGE_FIELDS = "id,title,url,points,comment_count,author_name,created_at"
+
+
+async def wire_size(client: httpx.AsyncClient, path: str, encoding: str) -> int:
+    """
+    Response body bytes as sent, before the client decompresses them.
+    """
+    size = 0
+    async with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_raw():
+            size += len(chunk)
+    return size
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=30, help="page size for the listings")
+    parser.add_argument("--truncate", type=int, default=200, help="truncate_text= value")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Post.id).order_by(Post.comment_count.desc()).limit(1))
+        busiest = result.scalar_one_or_none()
+    if busiest is None:
+        raise SystemExit("no posts in DATABASE_URL; run python -m benchmarks.load_test --seed first")
+
+    limit = args.limit
+    endpoints = [
+        ("front page", f"/posts/?sort=best&limit={limit}"),
+        ("front page, truncate_text", f"/posts/?sort=best&limit={limit}&truncate_text={args.truncate}"),
+        ("front page, fields", f"/posts/?sort=best&limit={limit}&fields={FRONT_PAGE_FIELDS}"),
+        ("new, cursor", f"/posts/?sort=new&limit={limit}&paginate=cursor"),
+        ("search", f"/posts/search?q=python&limit={limit}"),
+        ("search, truncate_text", f"/posts/search?q=python&limit={limit}&truncate_text={args.truncate}"),
+        ("comments (busiest post)", f"/comments/posts/{busiest}"),
+        ("single post", f"/posts/{busiest}"),
+    ]
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+
+    print(f"compression {'on' if settings.COMPRESSION_ENABLED else 'off'}, "
+          f"minimum size {settings.COMPRESSION_MINIMUM_SIZE} bytes, gzip level {settings.COMPRESSION_GZIP_LEVEL}"
+          + ("" if brotli is not None else "; brotli not installed"))
+    # "saved" is the best encoding against that endpoint's uncompressed size.
+    print(f"{'endpoint':<28}" + "".join(f"{name:>12}" for name in encodings) + f"{'saved':>8}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path in endpoints:
+            sizes = []
+            for encoding in encodings:
+                sizes.append(await wire_size(client, path, encoding))
+            saved = 1 - min(sizes) / sizes[0] if sizes[0] else 0
+            print(f"{label:<28}" + "".join(f"{size:>12,}" for size in sizes) + f"{saved:>8.0%}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+Memory and per-call latency of the in-memory rate limiter algorithms.
+
+Usage (from backend/):
+    python -m benchmarks.rate_limiter --keys 1000000 --hits-per-key 5
+
+Every key gets `--hits-per-key` calls against a 10 per 20 minute limit
+(the `/posts/` limit), so nothing is evicted and the sliding log grows
+with the total number of events.
+"""
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+
+from app.utils.rate_limiter import (
+    InMemoryBackend,
+    SlidingWindowCounterBackend,
+    GCRABackend,
+)
+
+BACKENDS = {
+    "sliding_log": InMemoryBackend,
+    "sliding_window": SlidingWindowCounterBackend,
+    "gcra": GCRABackend,
+}
+LIMIT = 10
+WINDOW_SECONDS = 20 * 60
+
+
+async def fill(backend, keys: list[str], hits_per_key: int) -> None:
+    for _ in range(hits_per_key):
+        for key in keys:
+            await backend.hit(key, LIMIT, WINDOW_SECONDS)
+
+
+async def run(name: str, keys: list[str], hits_per_key: int) -> dict:
+    backend_cls = BACKENDS[name]
+
+    # Memory: traced separately, tracemalloc skews timings.
+    gc.collect()
+    tracemalloc.start()
+    backend = backend_cls(max_keys=len(keys) + 1)
+    await fill(backend, keys, hits_per_key)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del backend
+    gc.collect()
+
+    backend = backend_cls(max_keys=len(keys) + 1)
+    calls = len(keys) * hits_per_key
+    started = time.perf_counter()
+    await fill(backend, keys, hits_per_key)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "algorithm": name,
+        "keys": len(keys),
+        "calls": calls,
+        "memory_mb": memory / 1024 / 1024,
+        "bytes_per_key": memory / len(keys),
+        "ns_per_call": elapsed / calls * 1e9,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--hits-per-key", type=int, default=5)
+    parser.add_argument(
+        "--algorithms", nargs="+", default=list(BACKENDS), choices=list(BACKENDS)
+    )
+    args = parser.parse_args()
+
+    keys = [f"post:{i}" for i in range(args.keys)]
+    print(f"{'algorithm':<16}{'memory MB':>12}{'bytes/key':>12}{'ns/call':>12}")
+    for name in args.algorithms:
+        row = await run(name, keys, args.hits_per_key)
+        print(
+            f"{row['algorithm']:<16}{row['memory_mb']:>12.1f}"
+            f"{row['bytes_per_key']:>12.0f}{row['ns_per_call']:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
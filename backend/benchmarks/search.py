@@ -0,0 +1,112 @@
+"""
+/posts/search latency: the old title ILIKE scan vs the search engine.
+
+Runs against DATABASE_URL. --seed first inserts synthetic posts (titles
+and text drawn from a fixed vocabulary), e.g.:
+
+    python -m benchmarks.search --seed --posts 1000000
+
+On Postgres the engine is the tsvector/GIN query (run `alembic upgrade
+head` first); on SQLite it is the in-process inverted index, whose
+one-off build time is reported separately.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import insert, select
+
+from app.core.database import AsyncSessionLocal, Base, engine
+from app.models import Post, User
+from app.services import search
+
+VOCABULARY = [
+    "rust", "python", "postgres", "compiler", "database", "startup", "launch",
+    "kernel", "linux", "browser", "security", "privacy", "design", "hiring",
+    "funding", "open", "source", "release", "performance", "memory", "cache",
+    "network", "protocol", "learning", "model", "science", "space", "energy",
+    "battery", "climate", "economy", "market", "history", "language", "typescript",
+    "framework", "cloud", "server", "mobile", "hardware",
+]
+QUERIES = ["rust", "python compiler", "data", "open source", "perf", "climate energy"]
+BATCH_SIZE = 10_000
+
+
+def words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(n))
+
+
+async def seed(posts: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        result = await conn.execute(
+            insert(User).returning(User.id),
+            [{"username": "bench_author", "email": "bench@example.com",
+              "password_hash": "x", "is_active": True}],
+        )
+        author_id = result.scalar_one()
+
+    rng = random.Random(42)
+    for start in range(0, posts, BATCH_SIZE):
+        rows = [
+            {"title": words(rng, 6), "text": words(rng, 30), "author_id": author_id, "points": 0}
+            for _ in range(min(BATCH_SIZE, posts - start))
+        ]
+        async with engine.begin() as conn:
+            await conn.execute(insert(Post), rows)
+
+
+async def time_queries(label: str, run, repeat: int) -> None:
+    samples = []
+    for _ in range(repeat):
+        for q in QUERIES:
+            started = time.perf_counter()
+            await run(q)
+            samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    p50 = samples[len(samples) // 2]
+    p99 = samples[min(int(len(samples) * 0.99), len(samples) - 1)]
+    print(f"{label:<24}{p50:>10.1f}{p99:>10.1f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", action="store_true")
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.seed:
+        started = time.perf_counter()
+        await seed(args.posts)
+        print(f"seeded {args.posts} posts in {time.perf_counter() - started:.1f}s")
+
+    async with AsyncSessionLocal() as db:
+        async def ilike(q: str):
+            result = await db.execute(
+                select(Post.id)
+                .where(Post.title.ilike(f"%{q}%"))
+                .order_by(Post.created_at.desc())
+                .limit(20)
+            )
+            return result.all()
+
+        async def engine_search(q: str):
+            return await search.search_posts(q=q, sort="relevance", limit=20, offset=0, db=db)
+
+        backend = search.search_backend()
+        if backend == "memory":
+            started = time.perf_counter()
+            await search.memory_index.catch_up(db)
+            print(f"inverted index built in {time.perf_counter() - started:.1f}s")
+
+        print(f"{'query':<24}{'p50 ms':>10}{'p99 ms':>10}")
+        await time_queries("title ILIKE (old)", ilike, args.repeat)
+        await time_queries(f"search ({backend})", engine_search, args.repeat)
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
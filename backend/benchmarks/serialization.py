@@ -0,0 +1,183 @@
+"""
+Serialization cost of the list endpoints, without a database: the
+response_model path (rows -> pydantic models -> validated again for the
+response_model -> JSON) against the FAST_JSON_ENABLED path (rows -> dicts
+-> JSON bytes), with orjson and with the standard library fallback.
+
+Both paths must produce the same bytes; exits non-zero if they don't.
+
+    python -m benchmarks.serialization --posts 30 --comments 200
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+
+from pydantic import TypeAdapter
+
+from app.schemas.comment import CommentOut
+from app.schemas.post import PostOut
+from app.services.comment import build_comment_tree
+from app.utils import fast_json
+
+_posts_adapter = TypeAdapter(list[PostOut])
+_comments_adapter = TypeAdapter(list[CommentOut])
+
+WORDS = "the of a to in rust python postgres latency cache query index ünïcödé ✓ \"quoted\"".split()
+
+
+class PostRow(NamedTuple):
+    id: int
+    title: str
+    url: str | None
+    text: str | None
+    points: int
+    upvotes: int
+    downvotes: int
+    comment_count: int
+    author_id: int
+    author_name: str | None
+    created_at: datetime
+
+
+class CommentRow(NamedTuple):
+    id: int
+    content: str
+    author_id: int
+    author_name: str
+    post_id: int
+    parent_id: int | None
+    created_at: datetime
+    depth: int
+    reply_count: int
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def post_rows(n: int, rng: random.Random) -> list[PostRow]:
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(1, n + 1):
+        up, down = rng.randint(0, 500), rng.randint(0, 50)
+        rows.append(PostRow(
+            id=i,
+            title=_words(rng, 8),
+            url=f"https://example.com/{i}" if i % 3 else None,
+            text=None if i % 3 else _words(rng, 60),
+            points=up - down,
+            upvotes=up,
+            downvotes=down,
+            comment_count=rng.randint(0, 300),
+            author_id=rng.randint(1, 1000),
+            author_name=f"user{i % 97}",
+            created_at=now - timedelta(seconds=rng.randint(0, 86400), microseconds=rng.randint(0, 999999)),
+        ))
+    return rows
+
+
+def comment_rows(n: int, rng: random.Random, max_depth: int = 10) -> list[CommentRow]:
+    now = datetime.now(timezone.utc)
+    rows: list[CommentRow] = []
+    replies: dict[int, int] = {}
+    for i in range(1, n + 1):
+        parent = rng.choice(rows) if rows and rng.random() < 0.7 else None
+        depth = parent.depth + 1 if parent else 1
+        if depth > max_depth:
+            parent, depth = None, 1
+        if parent:
+            replies[parent.id] = replies.get(parent.id, 0) + 1
+        rows.append(CommentRow(
+            id=i,
+            content=_words(rng, 40),
+            author_id=rng.randint(1, 1000),
+            author_name=f"user{i % 97}",
+            post_id=1,
+            parent_id=parent.id if parent else None,
+            created_at=now - timedelta(seconds=n - i),
+            depth=depth,
+            reply_count=0,
+        ))
+    return [row._replace(reply_count=replies.get(row.id, 0)) for row in rows]
+
+
+def _model_bytes(adapter: TypeAdapter, models) -> bytes:
+    # What FastAPI does with a response_model: validate the returned
+    # objects again, dump them to JSON-able data, then json.dumps.
+    validated = adapter.validate_python(models, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _timed(fn, repeat: int) -> tuple[float, bytes]:
+    best = float("inf")
+    out = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def compare(label: str, n: int, model_path, fast_path, repeat: int) -> bool:
+    results = {}
+    model_s, expected = _timed(model_path, repeat)
+    results["response_model"] = model_s
+
+    orjson = fast_json.orjson
+    try:
+        if orjson is not None:
+            results["fast (orjson)"], out = _timed(fast_path, repeat)
+            if out != expected:
+                print(f"{label}: orjson output differs from response_model output")
+                return False
+        fast_json.orjson = None
+        results["fast (stdlib)"], out = _timed(fast_path, repeat)
+        if out != expected:
+            print(f"{label}: stdlib output differs from response_model output")
+            return False
+    finally:
+        fast_json.orjson = orjson
+
+    print(f"{label} ({n} rows, {len(expected)} bytes)")
+    for name, seconds in results.items():
+        print(f"  {name:<16} {seconds * 1e6 / n:8.2f} µs/row   {model_s / seconds:5.1f}x")
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=30, help="rows per post page")
+    parser.add_argument("--comments", type=int, default=200, help="comments per tree")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    posts = post_rows(args.posts, rng)
+    comments = comment_rows(args.comments, rng)
+
+    ok = compare(
+        "posts",
+        len(posts),
+        lambda: _model_bytes(_posts_adapter, [PostOut.model_validate(row._asdict()) for row in posts]),
+        lambda: fast_json.dumps([row._asdict() for row in posts]),
+        args.repeat,
+    )
+    ok &= compare(
+        "comment tree",
+        len(comments),
+        lambda: _model_bytes(_comments_adapter, build_comment_tree(comments, max_depth=10)),
+        lambda: fast_json.dumps(build_comment_tree(comments, max_depth=10, fast=True)),
+        args.repeat,
+    )
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Concurrency check for the vote path: many users vote, flip and unvote on
+one post at the same time, then the post's counters must equal what the
+votes table says.
+
+Runs against DATABASE_URL (use Postgres; SQLite takes the ORM fallback,
+which is not safe under concurrency). Exits non-zero on a mismatch.
+
+    python -m benchmarks.vote_concurrency --users 500 [--buffered]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+
+from sqlalchemy import insert, select, func, case
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, Base, engine
+from app.models import Post, User, Vote
+from app.services.vote import cast_vote, vote_buffer
+
+
+async def vote(user_id: int, post_id: int, value: int) -> None:
+    async with AsyncSessionLocal() as db:
+        await cast_vote(db, user_id, post_id, value)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--buffered", action="store_true")
+    parser.add_argument("--create-tables", action="store_true")
+    args = parser.parse_args()
+
+    settings.VOTE_BUFFER_ENABLED = args.buffered
+
+    if args.create_tables:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    run = uuid.uuid4().hex[:8]
+    async with engine.begin() as conn:
+        result = await conn.execute(
+            insert(User).returning(User.id),
+            [
+                {"username": f"voter_{run}_{i}", "email": f"voter_{run}_{i}@example.com",
+                 "password_hash": "x", "is_active": True}
+                for i in range(args.users)
+            ],
+        )
+        user_ids = result.scalars().all()
+        result = await conn.execute(
+            insert(Post).returning(Post.id),
+            [{"title": f"hot post {run}", "text": "x", "author_id": user_ids[0], "points": 0}],
+        )
+        post_id = result.scalar_one()
+
+    rng = random.Random(7)
+    started = time.perf_counter()
+    calls = 0
+    for _ in range(args.rounds):
+        values = [rng.choice((1, 1, 1, -1, 0)) for _ in user_ids]
+        await asyncio.gather(*(vote(u, post_id, v) for u, v in zip(user_ids, values)))
+        calls += len(values)
+    elapsed = time.perf_counter() - started
+    await vote_buffer.flush()
+
+    async with AsyncSessionLocal() as db:
+        post = await db.get(Post, post_id)
+        result = await db.execute(
+            select(
+                func.coalesce(func.sum(Vote.value), 0),
+                func.count().filter(Vote.value == 1),
+                func.count().filter(Vote.value == -1),
+            ).where(Vote.post_id == post_id)
+        )
+        expected = tuple(result.one())
+    await engine.dispose()
+
+    actual = (post.points, post.upvotes, post.downvotes)
+    print(f"{calls} votes in {elapsed:.2f}s ({calls / elapsed:.0f}/s)")
+    print(f"post (points, upvotes, downvotes): {actual}")
+    print(f"votes table:                       {expected}")
+    if actual != expected:
+        print("MISMATCH")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
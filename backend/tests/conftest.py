@@ -0,0 +1,62 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read, and the engines created, when app.core.config is first
+# imported, so the test databases have to be in the environment before that.
+_tmp = tempfile.mkdtemp(prefix="forum-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}/primary.sqlite"
+os.environ["READ_DATABASE_URLS"] = f"sqlite+aiosqlite:///{_tmp}/replica.sqlite"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client(monkeypatch):
+    """
+    An API client on a freshly created primary database, with read replicas
+    switched off and the per-process caches emptied.
+    """
+    import httpx
+
+    from app.core.database import Base, engine, replicas
+    from app.core.limiter import set_rate_limiter
+    from app.core.security import token_cache
+    from app.main import app
+    from app.services import search
+    from app.services.front_page import front_page_cache
+    from app.services.user import principal_cache
+    from app.utils.rate_limiter import InMemoryBackend, SlidingWindowRateLimiter
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(replicas, "replicas", [])
+    monkeypatch.setattr(search, "memory_index", search.InvertedIndex())
+    set_rate_limiter(SlidingWindowRateLimiter(InMemoryBackend()))
+    for cache in (front_page_cache, principal_cache, token_cache):
+        cache.clear()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    await engine.dispose()
+
+
+@pytest.fixture
+def signup(client):
+    """
+    `await signup("alice")` creates a user and returns their auth headers.
+    """
+    async def signup(username: str) -> dict:
+        response = await client.post(
+            "/auth/signup",
+            json={"username": username, "email": f"{username}@example.com", "password": "password123"},
+        )
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return signup
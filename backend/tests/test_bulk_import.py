@@ -0,0 +1,67 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import asyncpg
+import pytest
+from sqlalchemy.engine import make_url
+
+from app.commands.bulk_import import to_records
+
+# bulk_import COPYs into PostgreSQL. Point this at a scratch database: its
+# public schema is dropped and rebuilt from the migrations.
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def test_posts_records_leave_counters_to_the_database():
+    now = object()
+    records = list(to_records("posts", iter([{"id": "1", "title": "hi", "author_id": "2"}]), now))
+    assert records == [(1, "hi", 2, None, None, now)]
+
+
+def run(*args: str) -> None:
+    env = {**os.environ, "DATABASE_URL": POSTGRES_URL, "READ_DATABASE_URLS": ""}
+    result = subprocess.run([sys.executable, *args], cwd=BACKEND, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+def test_import_small_dataset(tmp_path):
+    dsn = make_url(POSTGRES_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+
+    async def sql(query: str):
+        conn = await asyncpg.connect(dsn)
+        try:
+            return await conn.fetch(query)
+        finally:
+            await conn.close()
+
+    asyncio.run(sql("DROP SCHEMA public CASCADE; CREATE SCHEMA public"))
+    run("-m", "alembic", "upgrade", "head")
+
+    (tmp_path / "users.csv").write_text("id,username\n1,alice\n2,bob\n")
+    (tmp_path / "posts.jsonl").write_text("\n".join(json.dumps(post) for post in [
+        {"id": 10, "title": "first", "author_id": 1, "created_at": "2024-01-01T00:00:00Z"},
+        {"id": 11, "title": "second", "author_id": 2, "text": "body"},
+    ]) + "\n")
+    (tmp_path / "comments.jsonl").write_text(
+        json.dumps({"id": 5, "content": "hi", "author_id": 2, "post_id": 10}) + "\n"
+    )
+    (tmp_path / "votes.csv").write_text("user_id,post_id,value\n1,10,1\n2,10,1\n2,11,-1\n")
+    run(
+        "-m", "app.commands.bulk_import",
+        "--users", str(tmp_path / "users.csv"),
+        "--posts", str(tmp_path / "posts.jsonl"),
+        "--comments", str(tmp_path / "comments.jsonl"),
+        "--votes", str(tmp_path / "votes.csv"),
+    )
+
+    rows = asyncio.run(sql(
+        "SELECT id, points, upvotes, downvotes, comment_count, hot_score FROM posts ORDER BY id"
+    ))
+    assert [tuple(row)[:5] for row in rows] == [(10, 2, 2, 0, 1), (11, -1, 0, 1, 0)]
+    assert rows[1]["hot_score"] < 0
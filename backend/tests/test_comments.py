@@ -0,0 +1,102 @@
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.models import Comment
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def thread(client, signup):
+    """
+    a, b, c at the top; a has replies a1, a2, a3; a1 has a1x, which has a1xy.
+    Written straight to the database, past the comment rate limit.
+    """
+    alice = await signup("alice")
+    response = await client.post("/posts/", json={"title": "thread", "text": "x"}, headers=alice)
+    post_id = response.json()["id"]
+    author_id = response.json()["author_id"]
+
+    ids = {}
+    async with AsyncSessionLocal() as db:
+        for name, parent in [
+            ("a", None), ("b", None), ("c", None),
+            ("a1", "a"), ("a2", "a"), ("a3", "a"),
+            ("a1x", "a1"), ("a1xy", "a1x"),
+        ]:
+            comment = Comment(content=name, author_id=author_id, post_id=post_id, parent_id=ids.get(parent))
+            db.add(comment)
+            await db.flush()
+            ids[name] = comment.id
+        await db.commit()
+    return post_id
+
+
+def names(comments: list[dict]) -> list[str]:
+    return [comment["content"] for comment in comments]
+
+
+def find(comments: list[dict], name: str) -> dict:
+    for comment in comments:
+        if comment["content"] == name:
+            return comment
+        found = find(comment["children"], name)
+        if found:
+            return found
+    return {}
+
+
+async def test_replies_are_capped(client, thread):
+    response = await client.get(f"/comments/posts/{thread}", params={"replies_limit": 2})
+    assert response.status_code == 200
+    a = find(response.json(), "a")
+    assert names(a["children"]) == ["a1", "a2"]
+    assert a["reply_count"] == 3
+    assert a["more_replies"] is True
+    assert find(response.json(), "b")["more_replies"] is False
+
+
+async def test_depth_cut_off(client, thread):
+    response = await client.get(f"/comments/posts/{thread}", params={"max_depth": 2})
+    comments = response.json()
+    a1 = find(comments, "a1")
+    assert a1["children"] == []
+    assert a1["reply_count"] == 1
+    assert a1["more_replies"] is True
+    assert find(comments, "a2")["more_replies"] is False
+    assert find(comments, "a1x") == {}
+
+    # The full depth comes back when the cut-off allows it.
+    response = await client.get(f"/comments/posts/{thread}", params={"max_depth": 4})
+    assert names(find(response.json(), "a1x")["children"]) == ["a1xy"]
+
+
+async def test_top_level_cursor(client, thread):
+    response = await client.get(f"/comments/posts/{thread}", params={"top_level_limit": 2})
+    assert names(response.json()) == ["a", "b"]
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = await client.get(f"/comments/posts/{thread}", params={"top_level_limit": 2, "cursor": cursor})
+    assert names(response.json()) == ["c"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+async def test_replies_cursor(client, thread):
+    # Where a more_replies comment sends the client.
+    response = await client.get(f"/comments/posts/{thread}", params={"replies_limit": 1})
+    a = find(response.json(), "a")
+    assert a["more_replies"] is True
+
+    response = await client.get(f"/comments/{a['id']}/replies", params={"limit": 2, "max_depth": 1})
+    assert names(response.json()) == ["a1", "a2"]
+    assert find(response.json(), "a1")["more_replies"] is True
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = await client.get(f"/comments/{a['id']}/replies", params={"limit": 2, "cursor": cursor})
+    assert names(response.json()) == ["a3"]
+    assert "X-Next-Cursor" not in response.headers
+
+
+async def test_replies_of_missing_comment(client, thread):
+    assert (await client.get("/comments/999/replies")).status_code == 404
+    assert (await client.get("/comments/999/replies", params={"cursor": "!"})).status_code == 400
@@ -0,0 +1,61 @@
+import pytest
+
+from app.core import compression
+from app.core.config import settings
+from app.core.compression import choose_encoding
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("*", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_brotli_only_when_installed(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br") is None
+    assert choose_encoding("br, gzip") == "gzip"
+
+
+async def create_posts(client, signup, count: int = 10):
+    alice = await signup("alice")
+    for i in range(count):
+        await client.post("/posts/", json={"title": f"post number {i}", "text": "lorem ipsum " * 20}, headers=alice)
+
+
+async def test_large_responses_are_gzipped(client, signup):
+    await create_posts(client, signup)
+    plain = await client.get("/posts/", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+    assert len(plain.content) >= settings.COMPRESSION_MINIMUM_SIZE
+
+    response = await client.get("/posts/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) < len(plain.content)
+    # httpx decodes it; the bytes are the same representation.
+    assert response.content == plain.content
+    # Compressed bytes differ, so the ETag is weakened.
+    assert response.headers["ETag"] == "W/" + plain.headers["ETag"]
+
+
+async def test_small_responses_are_not_compressed(client):
+    response = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+
+async def test_brotli(client, signup):
+    pytest.importorskip("brotli")
+    await create_posts(client, signup)
+    plain = await client.get("/posts/", headers={"Accept-Encoding": "identity"})
+    response = await client.get("/posts/", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.content == plain.content
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.post import PostOut
+from app.services.front_page import front_page_cache
+from app.utils import fast_json
+
+pytestmark = pytest.mark.anyio
+
+POST = {
+    "id": 1,
+    "title": "Crème brûlée — \"quoted\" 🍮",
+    "url": None,
+    "text": "line\nbreak\ttab \\ slash </script>",
+    "points": -3,
+    "upvotes": 2,
+    "downvotes": 5,
+    "comment_count": 0,
+    "author_id": 7,
+    "author_name": "zoë",
+    "created_at": datetime(2026, 1, 21, 17, 49, 56, 48967, tzinfo=timezone.utc),
+}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("created_at", [
+    POST["created_at"],
+    POST["created_at"].replace(microsecond=0),
+    POST["created_at"].replace(tzinfo=None),  # as SQLite returns it
+])
+def test_dumps_matches_pydantic(monkeypatch, use_orjson, created_at):
+    if not use_orjson:
+        monkeypatch.setattr(fast_json, "orjson", None)
+    elif fast_json.orjson is None:
+        pytest.skip("orjson is not installed")
+    post = {**POST, "created_at": created_at}
+    expected = b"[" + PostOut(**post).model_dump_json().encode() + b"]"
+    assert fast_json.dumps([post]) == expected
+
+
+async def test_endpoints_match_with_and_without_fast_path(client, signup, monkeypatch):
+    alice = await signup("zoë")
+    response = await client.post("/posts/", json={"title": "Crème brûlée 🍮", "text": "a \"b\"\nc"}, headers=alice)
+    post_id = response.json()["id"]
+    response = await client.post(f"/comments/posts/{post_id}", json={"content": "première"}, headers=alice)
+    comment_id = response.json()["id"]
+    await client.post(f"/comments/posts/{post_id}", json={"content": "réponse", "parent_id": comment_id}, headers=alice)
+
+    urls = [
+        "/posts/?sort=new",
+        "/posts/?sort=top&paginate=cursor",
+        f"/posts/{post_id}",
+        f"/posts/batch?ids={post_id}",
+        "/posts/search?q=brûlée",
+        f"/comments/posts/{post_id}",
+        f"/comments/{comment_id}/replies",
+    ]
+
+    async def fetch_all(fast: bool) -> list[bytes]:
+        monkeypatch.setattr(settings, "FAST_JSON_ENABLED", fast)
+        front_page_cache.clear()
+        bodies = []
+        for url in urls:
+            response = await client.get(url)
+            assert response.status_code == 200, (url, response.text)
+            bodies.append(response.content)
+        return bodies
+
+    for url, slow, fast in zip(urls, await fetch_all(False), await fetch_all(True)):
+        assert slow != b"[]", url
+        assert fast == slow, url
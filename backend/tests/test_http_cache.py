@@ -0,0 +1,84 @@
+import pytest
+
+from app.utils.http_cache import make_etag
+
+pytestmark = pytest.mark.anyio
+
+
+async def revalidate(client, url: str, etag: str, **headers):
+    return await client.get(url, headers={"If-None-Match": etag, **headers})
+
+
+def test_etag_depends_on_every_part():
+    assert make_etag("post", 1, (1, 2)) == make_etag("post", 1, (1, 2))
+    assert make_etag("post", 1, (1, 2)) != make_etag("post", 1, (1, 3))
+    assert make_etag("post", 1, (1, 2)).startswith('"')
+
+
+async def test_post_detail_304_until_it_changes(client, signup):
+    alice = await signup("alice")
+    post_id = (await client.post("/posts/", json={"title": "cached", "text": "x"}, headers=alice)).json()["id"]
+    url = f"/posts/{post_id}"
+
+    response = await client.get(url)
+    etag = response.headers["ETag"]
+    assert "Cache-Control" in response.headers
+
+    response = await revalidate(client, url, etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    # Weak and listed tags match too (If-None-Match compares weakly).
+    assert (await revalidate(client, url, f'"other", W/{etag}')).status_code == 304
+    assert (await revalidate(client, url, '"other"')).status_code == 200
+    # The thread shape is part of the representation.
+    assert (await revalidate(client, url + "?max_depth=1", etag)).status_code == 200
+
+    await client.post(f"/posts/{post_id}/vote", params={"value": 1}, headers=alice)
+    response = await revalidate(client, url, etag)
+    assert response.status_code == 200
+    assert response.json()["points"] == 1
+    etag = response.headers["ETag"]
+
+    await client.post(f"/comments/posts/{post_id}", json={"content": "hi"}, headers=alice)
+    assert (await revalidate(client, url, etag)).status_code == 200
+
+
+async def test_comment_thread_304(client, signup):
+    alice = await signup("alice")
+    post_id = (await client.post("/posts/", json={"title": "cached", "text": "x"}, headers=alice)).json()["id"]
+    await client.post(f"/comments/posts/{post_id}", json={"content": "first"}, headers=alice)
+    url = f"/comments/posts/{post_id}"
+
+    etag = (await client.get(url)).headers["ETag"]
+    assert (await revalidate(client, url, etag)).status_code == 304
+
+    await client.post(f"/comments/posts/{post_id}", json={"content": "second"}, headers=alice)
+    response = await revalidate(client, url, etag)
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+@pytest.mark.parametrize("params", [
+    {"sort": "new"},  # served from the front page cache
+    {"sort": "top", "paginate": "cursor"},
+    {"sort": "top", "offset": 200},
+])
+async def test_listing_304_until_a_post_is_added(client, signup, params):
+    alice = await signup("alice")
+    await client.post("/posts/", json={"title": "first", "text": "x"}, headers=alice)
+
+    response = await client.get("/posts/", params=params)
+    etag = response.headers["ETag"]
+    response = await client.get("/posts/", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    other = {**params, "limit": 5}
+    assert (await client.get("/posts/", params=other, headers={"If-None-Match": etag})).status_code == 200
+
+    if params["sort"] == "new":
+        return  # stale-while-revalidate: the cache serves its old page once more
+    await client.post("/posts/", json={"title": "second", "text": "x"}, headers=alice)
+    response = await client.get("/posts/", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from redis.exceptions import ConnectionError
+
+from app.utils.live import RedisTransport
+
+pytestmark = pytest.mark.anyio
+
+
+async def eventually(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def test_redis_transport_resubscribes_after_an_error():
+    client = FakeAsyncRedis()
+    transport = RedisTransport(client=client, reconnect_base_seconds=0.01)
+    received = []
+    await transport.start(received.extend)
+    try:
+        await transport.send([("post:1", "1", {"points": 1})])
+        await eventually(lambda: len(received) == 1)
+
+        # The listener is waiting on a read; the one after the next
+        # message fails, as when Redis drops the connection.
+        async def broken(*args, **kwargs):
+            raise ConnectionError("connection lost")
+        transport._pubsub.parse_response = broken
+        await transport.send([("post:1", "1", {"points": 2})])
+        await eventually(lambda: transport.reconnects == 1)
+
+        await transport.send([("post:1", "1", {"points": 3})])
+        await eventually(lambda: len(received) == 3)
+        assert [event["points"] for _, _, event in received] == [1, 2, 3]
+        assert not transport._listener.done()
+    finally:
+        await transport.close()
+
+
+async def test_redis_transport_skips_malformed_batches():
+    client = FakeAsyncRedis()
+    transport = RedisTransport(client=client)
+    received = []
+    await transport.start(received.extend)
+    try:
+        await client.publish(RedisTransport.channel, b"not json")
+        await transport.send([("post:1", "1", {"points": 1})])
+        await eventually(lambda: len(received) == 1)
+        assert not transport._listener.done()
+    finally:
+        await transport.close()
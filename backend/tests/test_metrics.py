@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.metrics import current_db_usage, instrument_engine, RequestDbUsage
+
+
+def test_failed_statement_leaves_nothing_on_the_connection():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    usage = RequestDbUsage()
+    token = current_db_usage.set(usage)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+            conn.execute(text("SELECT 1"))
+            assert not conn.info
+    finally:
+        current_db_usage.reset(token)
+        engine.dispose()
+    # Only the statement that ran counts.
+    assert usage.queries == 1
@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import update
+
+from app.core.database import AsyncSessionLocal
+from app.models import Post
+
+pytestmark = pytest.mark.anyio
+
+
+async def walk(client, sort: str, limit: int) -> list[int]:
+    ids, cursor = [], None
+    for _ in range(10):
+        params = {"sort": sort, "limit": limit, "paginate": "cursor"}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/posts/", params=params)
+        assert response.status_code == 200, response.text
+        ids += [post["id"] for post in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+    raise AssertionError(f"cursor never ran out, got {ids}")
+
+
+@pytest.mark.parametrize("sort", ["new", "top", "best"])
+async def test_cursor_walks_every_post_once(client, signup, sort):
+    alice = await signup("alice")
+    post_ids = []
+    for i in range(5):
+        response = await client.post("/posts/", json={"title": f"post {i}", "text": "x"}, headers=alice)
+        post_ids.append(response.json()["id"])
+
+    # Ties on the sort key (posts created in the same second, equal points)
+    # are broken by id, newest first.
+    points = {post_ids[0]: 3, post_ids[1]: 1, post_ids[2]: 3, post_ids[3]: 0, post_ids[4]: 1}
+    async with AsyncSessionLocal() as db:
+        for post_id, value in points.items():
+            await db.execute(update(Post).where(Post.id == post_id).values(points=value, hot_score=value))
+        await db.commit()
+
+    if sort == "new":
+        expected = sorted(post_ids, reverse=True)
+    else:
+        expected = sorted(post_ids, key=lambda post_id: (points[post_id], post_id), reverse=True)
+    assert await walk(client, sort, limit=2) == expected
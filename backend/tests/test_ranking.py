@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models import Post, User
+from app.services.ranking import hot_score, refresh_hot_scores
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_refresh_decays_young_posts_and_zeroes_old_ones(client):
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as db:
+        user = User(username="alice", email="alice@example.com", password_hash="x")
+        db.add(user)
+        await db.flush()
+        # Scored when young, and not refreshed since.
+        viral = Post(title="viral", author_id=user.id, points=5000, hot_score=500.0,
+                     created_at=now - timedelta(hours=100))
+        fresh = Post(title="fresh", author_id=user.id, points=7, hot_score=0.0,
+                     created_at=now - timedelta(hours=1))
+        db.add_all([viral, fresh])
+        await db.commit()
+
+        assert await refresh_hot_scores(db) == 2
+        scores = dict((await db.execute(select(Post.title, Post.hot_score))).all())
+
+    assert scores["viral"] == 0
+    assert scores["fresh"] == pytest.approx(hot_score(7, now - timedelta(hours=1)), rel=1e-3)
+
+    async with AsyncSessionLocal() as db:
+        # Nothing left to zero on the next pass.
+        assert await refresh_hot_scores(db) == 1
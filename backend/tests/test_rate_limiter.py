@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from fastapi import HTTPException
+
+from app.utils.rate_limiter import RedisBackend, SlidingWindowRateLimiter
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def backend():
+    backend = RedisBackend(client=FakeAsyncRedis())
+    yield backend
+    await backend.close()
+
+
+async def test_allows_up_to_limit_then_rejects(backend):
+    for _ in range(3):
+        assert await backend.hit("login:1.2.3.4", 3, 60) == 0
+
+    retry_after = await backend.hit("login:1.2.3.4", 3, 60)
+    assert 0 < retry_after <= 60
+    # Other keys have their own window.
+    assert await backend.hit("login:5.6.7.8", 3, 60) == 0
+
+
+async def test_rejected_hits_are_not_recorded(backend):
+    for _ in range(5):
+        await backend.hit("k", 2, 60)
+
+    client = backend._client
+    assert await client.zcard(backend.prefix + "k") == 2
+    assert 0 < await client.ttl(backend.prefix + "k") <= 61
+
+
+async def test_window_slides(backend):
+    assert await backend.hit("k", 1, 1) == 0
+    assert await backend.hit("k", 1, 1) > 0
+    await asyncio.sleep(1.05)
+    assert await backend.hit("k", 1, 1) == 0
+
+
+async def test_concurrent_hits_never_exceed_limit(backend):
+    results = await asyncio.gather(*(backend.hit("k", 5, 60) for _ in range(50)))
+    assert sum(1 for retry_after in results if retry_after == 0) == 5
+
+
+async def test_limiter_raises_429_with_retry_after(backend):
+    limiter = SlidingWindowRateLimiter(backend)
+    await limiter.allow("k", 1, 30)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await limiter.allow("k", 1, 30)
+    assert exc_info.value.status_code == 429
+    assert 1 <= int(exc_info.value.headers["Retry-After"]) <= 30
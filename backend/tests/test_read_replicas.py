@@ -0,0 +1,105 @@
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, Base, engine, read_session, replicas
+from app.core.last_write import create_last_write_marker
+from app.core.limiter import set_rate_limiter
+from app.main import app
+from app.models import Post
+from app.utils.rate_limiter import InMemoryBackend, SlidingWindowRateLimiter
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def client():
+    # The primary and the replica are separate SQLite files that are never
+    # synced, so a row written through the API exists only on the primary:
+    # whichever database a read went to shows in its result.
+    for db_engine in (engine, replicas.replicas[0].engine):
+        async with db_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+    set_rate_limiter(SlidingWindowRateLimiter(InMemoryBackend()))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+    for replica in replicas.replicas:
+        replica.healthy = True
+    await replicas.dispose()
+    await engine.dispose()
+
+
+async def signup(client, username: str) -> dict:
+    response = await client.post(
+        "/auth/signup",
+        json={"username": username, "email": f"{username}@example.com", "password": "password123"},
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def create_post(client, headers: dict) -> tuple[int, str]:
+    response = await client.post("/posts/", json={"title": "hello", "text": "world"}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"], response.headers["X-Last-Write"]
+
+
+async def test_read_session_prefers_a_healthy_replica():
+    replica = replicas.replicas[0]
+    async with read_session() as db:
+        assert db.bind is replica.engine
+    async with read_session(primary=True) as db:
+        assert db.bind is engine
+
+    replica.healthy = False
+    try:
+        async with read_session() as db:
+            assert db.bind is engine
+    finally:
+        replica.healthy = True
+
+
+async def test_reads_go_to_the_replica(client):
+    alice = await signup(client, "alice")
+    post_id, _ = await create_post(client, alice)
+
+    # Anonymous reads use the replica, which never got the post.
+    assert (await client.get(f"/posts/{post_id}")).status_code == 404
+
+    async with AsyncSessionLocal() as db:
+        assert await db.get(Post, post_id) is not None
+
+
+async def test_writer_reads_own_writes_from_the_primary(client, monkeypatch):
+    alice = await signup(client, "alice")
+    bob = await signup(client, "bob")
+    post_id, last_write = await create_post(client, alice)
+
+    # Any worker honours the marker: it is the client that carries it.
+    response = await client.get(f"/posts/{post_id}", headers={**alice, "X-Last-Write": last_write})
+    assert response.status_code == 200
+    assert response.json()["title"] == "hello"
+
+    # Without it, or with someone else's, reads go to the replica.
+    assert (await client.get(f"/posts/{post_id}", headers=alice)).status_code == 404
+    bob_with_alices = {**bob, "X-Last-Write": last_write}
+    assert (await client.get(f"/posts/{post_id}", headers=bob_with_alices)).status_code == 404
+
+    # So does a forged or expired one.
+    user_id, until, signature = last_write.split(".")
+    forged = f"{user_id}.{int(until) + 60_000}.{signature}"
+    assert (await client.get(f"/posts/{post_id}", headers={**alice, "X-Last-Write": forged})).status_code == 404
+    monkeypatch.setattr(settings, "READ_YOUR_WRITES_SECONDS", -1)
+    expired = create_last_write_marker(int(user_id))
+    assert (await client.get(f"/posts/{post_id}", headers={**alice, "X-Last-Write": expired})).status_code == 404
+
+
+async def test_unhealthy_replica_falls_back_to_the_primary(client):
+    alice = await signup(client, "alice")
+    post_id, _ = await create_post(client, alice)
+
+    replicas.replicas[0].healthy = False
+    assert (await client.get(f"/posts/{post_id}")).status_code == 200
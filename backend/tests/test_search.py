@@ -0,0 +1,24 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_search_picks_up_new_posts(client, signup):
+    alice = await signup("alice")
+
+    async def create(title):
+        response = await client.post("/posts/", json={"title": title, "text": "x"}, headers=alice)
+        return response.json()["id"]
+
+    async def search(q):
+        response = await client.get("/posts/search", params={"q": q})
+        assert response.status_code == 200, response.text
+        return [post["id"] for post in response.json()]
+
+    first = await create("walrus facts")
+    await create("unrelated")
+    assert await search("walrus") == [first]
+
+    # Indexed by the next search, not by the write.
+    second = await create("more walrus facts")
+    assert sorted(await search("walrus")) == sorted([first, second])
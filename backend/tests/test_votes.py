@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models import Post
+from app.services.post import apply_vote
+from app.services.vote import _vote_delta
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("old_value", [-1, 0, 1])
+@pytest.mark.parametrize("new_value", [-1, 0, 1])
+def test_vote_delta_matches_apply_vote(old_value, new_value):
+    # _vote_delta drives the Postgres upsert; apply_vote the ORM fallback.
+    post = Post(points=10, upvotes=7, downvotes=3)
+    apply_vote(post, old_value, new_value)
+    assert _vote_delta(old_value, new_value) == (post.points - 10, post.upvotes - 7, post.downvotes - 3)
+
+
+async def counters(post_id: int) -> tuple[int, int, int]:
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(Post.points, Post.upvotes, Post.downvotes).where(Post.id == post_id)
+        )).one()
+    return tuple(row)
+
+
+async def test_vote_toggle_and_switch(client, signup):
+    alice = await signup("alice")
+    bob = await signup("bob")
+    post_id = (await client.post("/posts/", json={"title": "contested", "text": "x"}, headers=alice)).json()["id"]
+
+    async def vote(headers, value):
+        response = await client.post(f"/posts/{post_id}/vote", params={"value": value}, headers=headers)
+        assert response.status_code == 200, response.text
+        return response.json()["points"]
+
+    assert await vote(alice, 1) == 1
+    assert await vote(alice, 1) == 1          # the same vote again changes nothing
+    assert await counters(post_id) == (1, 1, 0)
+
+    assert await vote(bob, -1) == 0
+    assert await vote(alice, -1) == -2        # switching moves points by two
+    assert await counters(post_id) == (-2, 0, 2)
+
+    assert await vote(alice, 0) == -1         # withdrawing
+    assert await vote(alice, 0) == -1
+    assert await counters(post_id) == (-1, 0, 1)
+
+
+async def test_vote_on_missing_post(client, signup):
+    alice = await signup("alice")
+    response = await client.post("/posts/999/vote", params={"value": 1}, headers=alice)
+    assert response.status_code == 404
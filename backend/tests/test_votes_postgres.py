@@ -0,0 +1,68 @@
+import asyncio
+import os
+import random
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.models import Post, User, Vote
+from app.services.vote import cast_vote
+
+# The atomic vote path (INSERT ... ON CONFLICT and counter UPDATEs) only
+# runs on Postgres. Point this at a scratch database: its tables are dropped.
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"),
+]
+
+
+@pytest.fixture
+async def sessionmaker():
+    engine = create_async_engine(POSTGRES_URL, pool_size=20, max_overflow=20)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def test_concurrent_votes_keep_counters_exact(sessionmaker):
+    async with sessionmaker() as db:
+        users = [User(username=f"voter{i}", email=f"voter{i}@example.com", password_hash="x") for i in range(40)]
+        db.add_all(users)
+        await db.flush()
+        post = Post(title="contested", author_id=users[0].id)
+        db.add(post)
+        await db.commit()
+    user_ids = [user.id for user in users]
+
+    async def vote(user_id: int, value: int) -> None:
+        async with sessionmaker() as db:
+            await cast_vote(db, user_id, post.id, value)
+
+    # Every user votes several times (up, down, flip, withdraw, repeat), all
+    # at once, so the same rows are contended from many transactions.
+    rng = random.Random(0)
+    rounds = [[rng.choice((1, -1, 0)) for _ in user_ids] for _ in range(5)]
+    for values in rounds:
+        await asyncio.gather(*(vote(user_id, value) for user_id, value in zip(user_ids, values)))
+
+    async with sessionmaker() as db:
+        stored = (await db.execute(
+            select(Post.points, Post.upvotes, Post.downvotes).where(Post.id == post.id)
+        )).one()
+        total, up, down = (await db.execute(
+            select(
+                func.coalesce(func.sum(Vote.value), 0),
+                func.count().filter(Vote.value == 1),
+                func.count().filter(Vote.value == -1),
+            ).where(Vote.post_id == post.id)
+        )).one()
+
+    assert stored.points == total
+    assert (stored.upvotes, stored.downvotes) == (up, down)
+    assert total == sum(rounds[-1])
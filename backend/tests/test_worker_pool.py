@@ -0,0 +1,28 @@
+import pytest
+
+from app.core.security import password_pool
+from app.utils.worker_pool import BoundedWorkerPool, PoolSaturated
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_pool_sheds_past_max_pending():
+    pool = BoundedWorkerPool(name="test", max_workers=1, max_pending=1)
+    try:
+        assert await pool.run(sum, [1, 2]) == 3
+        pool.pending = 1  # as if a job were in flight
+        with pytest.raises(PoolSaturated):
+            await pool.run(sum, [1, 2])
+        assert pool.stats()["rejected"] == 1
+    finally:
+        pool.shutdown()
+
+
+async def test_saturated_password_pool_is_a_503(client, monkeypatch):
+    monkeypatch.setattr(password_pool, "max_pending", 0)
+    response = await client.post(
+        "/auth/signup",
+        json={"username": "alice", "email": "alice@example.com", "password": "password123"},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
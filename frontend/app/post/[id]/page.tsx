@@ -16,6 +16,8 @@ export default function PostDetailPage() {
 
     const [post, setPost] = useState<Post | null>(null);
     const [comments, setComments] = useState<Comment[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [loading, setLoading] = useState(true);
     const [voted, setVoted] = useState<number | null>(null);
     const [isVoting, setIsVoting] = useState(false);
@@ -28,22 +30,20 @@ export default function PostDetailPage() {
     const loadPostAndComments = async () => {
         setLoading(true);
         try {
-            // In a real app, you'd fetch a single post, but since the API only has list posts,
-            // we'll fetch all and find the one we need
-            const posts = await api.getPosts('new', 50, 0);
-            const foundPost = posts.find(p => p.id === postId);
+            // One request for the post and its first page of comments.
+            const found = await api.getPost(postId);
 
-            if (!foundPost) {
+            if (!found) {
                 alert('Post not found');
                 router.push('/');
                 return;
             }
 
-            setPost(foundPost);
-            setLocalPoints(foundPost.points);
-
-            const commentsData = await api.getComments(postId);
+            const { comments: commentsData, ...postData } = found.post;
+            setPost(postData);
+            setLocalPoints(postData.points);
             setComments(commentsData);
+            setNextCursor(found.nextCursor);
         } catch (error) {
             console.error('Failed to load post:', error);
             alert('Failed to load post');
@@ -52,6 +52,20 @@ export default function PostDetailPage() {
         }
     };
 
+    const loadMoreComments = async () => {
+        if (!nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        try {
+            const page = await api.getComments(postId, nextCursor);
+            setComments([...comments, ...page.comments]);
+            setNextCursor(page.nextCursor);
+        } catch (error) {
+            console.error('Failed to load comments:', error);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleVote = async (value: -1 | 1) => {
         if (!isAuthenticated) {
             alert('Please login to vote');
@@ -164,7 +178,7 @@ export default function PostDetailPage() {
             {/* Comments Section */}
             <div>
                 <h2 className="text-lg font-semibold mb-4">
-                    {comments.length} {comments.length === 1 ? 'Comment' : 'Comments'}
+                    {post.comment_count} {post.comment_count === 1 ? 'Comment' : 'Comments'}
                 </h2>
 
                 {isAuthenticated ? (
@@ -196,6 +210,18 @@ export default function PostDetailPage() {
                         ))}
                     </div>
                 )}
+
+                {nextCursor && (
+                    <div className="text-center mt-4">
+                        <button
+                            onClick={loadMoreComments}
+                            disabled={loadingMore}
+                            className="text-sm px-4 py-2 bg-gray-100 rounded hover:bg-gray-200"
+                        >
+                            {loadingMore ? 'Loading...' : 'Load more comments'}
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );
@@ -18,6 +18,10 @@ export default function CommentTree({ comment, postId, onCommentAdded }: Comment
     const [isEditing, setIsEditing] = useState(false);
     const [editContent, setEditContent] = useState(comment.content);
     const [localContent, setLocalContent] = useState(comment.content);
+    const [children, setChildren] = useState(comment.children);
+    const [moreReplies, setMoreReplies] = useState(comment.more_replies ?? false);
+    const [repliesCursor, setRepliesCursor] = useState<string | null>(null);
+    const [loadingReplies, setLoadingReplies] = useState(false);
 
     const timeAgo = (dateString: string) => {
         const date = new Date(dateString);
@@ -47,7 +51,25 @@ export default function CommentTree({ comment, postId, onCommentAdded }: Comment
         }
     };
 
+    // The tree only carries the first few replies (or none, at the depth
+    // cut-off). The first page from /replies replaces them; later pages append.
+    const loadMoreReplies = async () => {
+        if (loadingReplies) return;
+        setLoadingReplies(true);
+        try {
+            const page = await api.getReplies(comment.id, repliesCursor);
+            setChildren(repliesCursor ? [...children, ...page.comments] : page.comments);
+            setRepliesCursor(page.nextCursor);
+            setMoreReplies(page.nextCursor !== null);
+        } catch (error) {
+            console.error('Failed to load replies:', error);
+        } finally {
+            setLoadingReplies(false);
+        }
+    };
+
     const isOwnComment = user?.id === comment.author_id;
+    const hiddenReplies = (comment.reply_count ?? 0) - children.length;
 
     return (
         <div className="border-l-2 border-gray-200 pl-4 mb-4">
@@ -119,9 +141,9 @@ export default function CommentTree({ comment, postId, onCommentAdded }: Comment
                 </div>
             )}
 
-            {comment.children && comment.children.length > 0 && (
+            {children && children.length > 0 && (
                 <div className="mt-3 space-y-2">
-                    {comment.children.map((child) => (
+                    {children.map((child) => (
                         <CommentTree
                             key={child.id}
                             comment={child}
@@ -131,6 +153,20 @@ export default function CommentTree({ comment, postId, onCommentAdded }: Comment
                     ))}
                 </div>
             )}
+
+            {moreReplies && (
+                <button
+                    onClick={loadMoreReplies}
+                    disabled={loadingReplies}
+                    className="mt-1 text-xs text-orange-600 hover:underline"
+                >
+                    {loadingReplies
+                        ? 'loading...'
+                        : hiddenReplies > 0
+                            ? `load ${hiddenReplies} more ${hiddenReplies === 1 ? 'reply' : 'replies'}`
+                            : 'load more replies'}
+                </button>
+            )}
         </div>
     );
 }
\ No newline at end of file
@@ -1,7 +1,9 @@
 import type {
     Token,
     Post,
+    PostDetail,
     Comment,
+    CommentPage,
     PostCreate,
     CommentCreate,
     CommentUpdate,
@@ -16,7 +18,17 @@ const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 class ApiClient {
     private getAuthHeader(): HeadersInit {
         const token = localStorage.getItem('token');
-        return token ? { 'Authorization': `Bearer ${token}` } : {};
+        if (!token) return {};
+        // Sent back so our reads see our own writes for a few seconds.
+        const lastWrite = localStorage.getItem('lastWrite');
+        return lastWrite
+            ? { 'Authorization': `Bearer ${token}`, 'X-Last-Write': lastWrite }
+            : { 'Authorization': `Bearer ${token}` };
+    }
+
+    private rememberWrite(res: Response): void {
+        const lastWrite = res.headers.get('X-Last-Write');
+        if (lastWrite) localStorage.setItem('lastWrite', lastWrite);
     }
 
     // Auth endpoints
@@ -51,15 +63,27 @@ class ApiClient {
     // Post endpoints
     async getPosts(sort: SortType = 'new', limit = 20, offset = 0): Promise<Post[]> {
         const res = await fetch(
-            `${API_URL}/posts/?sort=${sort}&limit=${limit}&offset=${offset}`
+            `${API_URL}/posts/?sort=${sort}&limit=${limit}&offset=${offset}`,
+            { headers: this.getAuthHeader() }
         );
         if (!res.ok) throw new Error('Failed to fetch posts');
         return res.json();
     }
 
+    // The post with the first page of its comments; null if it doesn't exist.
+    async getPost(postId: number): Promise<{ post: PostDetail; nextCursor: string | null } | null> {
+        const res = await fetch(`${API_URL}/posts/${postId}`, {
+            headers: this.getAuthHeader(),
+        });
+        if (res.status === 404) return null;
+        if (!res.ok) throw new Error('Failed to fetch post');
+        return { post: await res.json(), nextCursor: res.headers.get('X-Next-Cursor') };
+    }
+
     async searchPosts(query: string, sort: string): Promise<Post[]> {
         const res = await fetch(
-            `${API_URL}/posts/search?q=${encodeURIComponent(query)}&sort=${sort}`
+            `${API_URL}/posts/search?q=${encodeURIComponent(query)}&sort=${sort}`,
+            { headers: this.getAuthHeader() }
         );
         if (!res.ok) {
             throw new Error('Search failed');
@@ -76,6 +100,7 @@ class ApiClient {
             },
             body: JSON.stringify(data),
         });
+        this.rememberWrite(res);
         if (!res.ok) throw new Error('Failed to create post');
         return res.json();
     }
@@ -85,15 +110,28 @@ class ApiClient {
             method: 'POST',
             headers: this.getAuthHeader(),
         });
+        this.rememberWrite(res);
         if (!res.ok) throw new Error('Failed to vote');
         return res.json()
     }
 
     // Comment endpoints
-    async getComments(postId: number): Promise<Comment[]> {
-        const res = await fetch(`${API_URL}/comments/posts/${postId}`);
+    async getComments(postId: number, cursor: string | null = null): Promise<CommentPage> {
+        const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        const res = await fetch(`${API_URL}/comments/posts/${postId}${query}`, {
+            headers: this.getAuthHeader(),
+        });
         if (!res.ok) throw new Error('Failed to fetch comments');
-        return res.json();
+        return { comments: await res.json(), nextCursor: res.headers.get('X-Next-Cursor') };
+    }
+
+    async getReplies(commentId: number, cursor: string | null = null): Promise<CommentPage> {
+        const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        const res = await fetch(`${API_URL}/comments/${commentId}/replies${query}`, {
+            headers: this.getAuthHeader(),
+        });
+        if (!res.ok) throw new Error('Failed to fetch replies');
+        return { comments: await res.json(), nextCursor: res.headers.get('X-Next-Cursor') };
     }
 
     async addComment(postId: number, data: CommentCreate): Promise<Comment> {
@@ -105,6 +143,7 @@ class ApiClient {
             },
             body: JSON.stringify(data),
         });
+        this.rememberWrite(res);
         if (!res.ok) throw new Error('Failed to add comment');
         return res.json();
     }
@@ -118,6 +157,7 @@ class ApiClient {
             },
             body: JSON.stringify(data),
         });
+        this.rememberWrite(res);
         if (!res.ok) throw new Error('Failed to update comment');
         return res.json();
     }
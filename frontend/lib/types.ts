@@ -28,6 +28,16 @@ export interface Post {
     created_at: string;
 }
 
+export interface PostDetail extends Post {
+    comments: Comment[];
+}
+
+// A page of comments; pass nextCursor back to get the next one.
+export interface CommentPage {
+    comments: Comment[];
+    nextCursor: string | null;
+}
+
 export interface Comment {
     id: number;
     content: string;
@@ -37,6 +47,8 @@ export interface Comment {
     parent_id: number | null;
     created_at: string;
     children: Comment[];
+    reply_count?: number;
+    more_replies?: boolean;
 }
 
 export interface PostCreate {